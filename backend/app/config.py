@@ -1,5 +1,5 @@
 from pydantic_settings import BaseSettings
-from typing import List
+from typing import List, Optional
 import os
 from dotenv import load_dotenv
 
@@ -20,12 +20,81 @@ class Settings(BaseSettings):
     # Database
     MONGODB_URL: str = os.getenv("MONGODB_URL", "")
     DATABASE_NAME: str = "distribution_management_system"
+    # Connection pool and timeouts (per worker process; unset values keep the driver defaults)
+    MONGODB_MAX_POOL_SIZE: int = 100
+    MONGODB_MIN_POOL_SIZE: int = 0
+    MONGODB_MAX_IDLE_TIME_MS: Optional[int] = None
+    MONGODB_WAIT_QUEUE_TIMEOUT_MS: Optional[int] = None
+    MONGODB_SERVER_SELECTION_TIMEOUT_MS: int = 30000
+    MONGODB_CONNECT_TIMEOUT_MS: int = 20000
+    MONGODB_SOCKET_TIMEOUT_MS: Optional[int] = None
+    # Comma-separated wire compressors in preference order, e.g. "zstd,snappy,zlib"
+    MONGODB_COMPRESSORS: str = ""
+    MONGODB_READ_PREFERENCE: str = "primary"
+    MONGODB_APP_NAME: str = "dms-backend"
+    # Report cache (per process with the default in-memory backend)
+    REPORT_CACHE_ENABLED: bool = True
+    REPORT_CACHE_SIZE: int = 256
+    REPORT_CACHE_TTL_SECONDS: int = 300
+    
+    # Analytics read routing for reports and dashboards. Turn off on single-node setups;
+    # tag sets are "key:value,key:value" separated by ";" (an empty set matches any member)
+    ANALYTICS_READS_ENABLED: bool = False
+    ANALYTICS_READ_PREFERENCE: str = "secondaryPreferred"
+    ANALYTICS_MAX_STALENESS_SECONDS: int = 120
+    ANALYTICS_TAG_SETS: str = ""
+    # Pool (CMAP) and command latency listeners behind /api/dashboard/metrics
+    MONGODB_METRICS_ENABLED: bool = True
+    # Multi-document transactions need a replica set or sharded cluster
+    MONGODB_TRANSACTIONS_ENABLED: bool = False
+    MONGODB_TRANSACTION_MAX_ATTEMPTS: int = 3
+    # Max concurrent queries one request fans out, and their per-query timeout
+    DB_CONCURRENCY_LIMIT: int = 8
+    DASHBOARD_QUERY_TIMEOUT_SECONDS: float = 10
+    # Log missing indexes and collection scans at startup (see app/index_audit.py)
+    INDEX_AUDIT_ON_STARTUP: bool = False
+    # Max approvals one POST /api/approvals/batch call may process
+    APPROVAL_BATCH_MAX_SIZE: int = 500
     
     # Security
     SECRET_KEY: str = os.getenv("SECRET_KEY", "dms-secret-key-2024")
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 1440  # 24 hours
     REFRESH_TOKEN_EXPIRE_DAYS: int = 7
+    # Stream-only tokens for GET /api/notifications/stream?token=; they end up in
+    # URLs (and so in proxy/access logs), so keep them short-lived
+    STREAM_TOKEN_EXPIRE_SECONDS: int = 60
+    
+    # Authenticated-user cache (per process). Writes only invalidate the cache of
+    # the worker that handled them, so other workers may keep serving a changed
+    # user (e.g. a deactivated account) for up to USER_CACHE_TTL_SECONDS
+    USER_CACHE_SIZE: int = 10000
+    USER_CACHE_TTL_SECONDS: int = 60
+    
+    # Verified-token cache (per process); entries never outlive the token's exp
+    TOKEN_CACHE_SIZE: int = 10000
+    TOKEN_CACHE_TTL_SECONDS: int = 300
+    
+    # Background notification delivery; when disabled, notifications are written inline
+    NOTIFICATION_QUEUE_ENABLED: bool = True
+    NOTIFICATION_QUEUE_SIZE: int = 10000
+    NOTIFICATION_BATCH_SIZE: int = 500
+    NOTIFICATION_FLUSH_INTERVAL_SECONDS: float = 0.05
+    
+    # Server-Sent Events notification stream (per process)
+    NOTIFICATION_STREAM_MAX_CONNECTIONS: int = 1000
+    NOTIFICATION_STREAM_QUEUE_SIZE: int = 100
+    NOTIFICATION_STREAM_HEARTBEAT_SECONDS: float = 15
+    
+    # Report exports: cursor batch size, gzip level, and the local file store for export jobs
+    EXPORT_BATCH_SIZE: int = 1000
+    EXPORT_GZIP_LEVEL: int = 6
+    EXPORT_DIR: str = "exports"
+    EXPORT_RETENTION_HOURS: int = 24
+    EXPORT_MAX_CONCURRENT_JOBS: int = 2
+    # Live jobs refresh heartbeat_at this often; pending/running jobs silent for
+    # three intervals are orphans of a restarted worker and are marked failed
+    EXPORT_HEARTBEAT_SECONDS: int = 30
     
     # CORS
     CORS_ORIGINS: str = "http://localhost:3000,http://localhost:3002,http://localhost:5173"
@@ -33,6 +102,24 @@ class Settings(BaseSettings):
     # API
     API_V1_PREFIX: str = "/api"
     
+    @property
+    def mongodb_client_options(self) -> dict:
+        """Keyword arguments for AsyncIOMotorClient"""
+        options = {
+            "maxPoolSize": self.MONGODB_MAX_POOL_SIZE,
+            "minPoolSize": self.MONGODB_MIN_POOL_SIZE,
+            "maxIdleTimeMS": self.MONGODB_MAX_IDLE_TIME_MS,
+            "waitQueueTimeoutMS": self.MONGODB_WAIT_QUEUE_TIMEOUT_MS,
+            "serverSelectionTimeoutMS": self.MONGODB_SERVER_SELECTION_TIMEOUT_MS,
+            "connectTimeoutMS": self.MONGODB_CONNECT_TIMEOUT_MS,
+            "socketTimeoutMS": self.MONGODB_SOCKET_TIMEOUT_MS,
+            "readPreference": self.MONGODB_READ_PREFERENCE,
+            "appname": self.MONGODB_APP_NAME
+        }
+        if self.MONGODB_COMPRESSORS:
+            options["compressors"] = self.MONGODB_COMPRESSORS
+        return {key: value for key, value in options.items() if value is not None}
+    
     @property
     def cors_origins_list(self) -> List[str]:
         return [origin.strip() for origin in self.CORS_ORIGINS.split(",")]
@@ -1,26 +1,40 @@
+import asyncio
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
 from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
-from typing import Optional
+from pymongo.read_preferences import Nearest, PrimaryPreferred, Secondary, SecondaryPreferred
+from typing import Iterator, Optional, List, Dict
 from app.config import settings
+from app.indexes import INDEXES, create_collection_indexes
+from app.utils.db_metrics import command_metrics, pool_metrics
 
 class Database:
     client: Optional[AsyncIOMotorClient] = None
     db: Optional[AsyncIOMotorDatabase] = None
+    analytics_db: Optional[AsyncIOMotorDatabase] = None
 
 
 database = Database()
 
+# Set while a read must see the latest writes (see read_from_primary)
+_primary_reads: ContextVar[bool] = ContextVar("primary_reads", default=False)
+
 
 async def connect_to_mongodb():
     """Connect to MongoDB Atlas"""
     try:
-        database.client = AsyncIOMotorClient(settings.MONGODB_URL)
+        listeners = [pool_metrics, command_metrics] if settings.MONGODB_METRICS_ENABLED else []
+        database.client = AsyncIOMotorClient(
+            settings.MONGODB_URL,
+            event_listeners=listeners,
+            **settings.mongodb_client_options
+        )
         database.db = database.client[settings.DATABASE_NAME]
+        database.analytics_db = None
         # Verify connection
         await database.client.admin.command('ping')
         print(f"✅ Connected to MongoDB: {settings.DATABASE_NAME}")
-        
-        # Create indexes
-        await create_indexes()
     except Exception as e:
         print(f"❌ Failed to connect to MongoDB: {e}")
         raise e
@@ -34,56 +48,76 @@ async def close_mongodb_connection():
 
 
 async def create_indexes():
-    """Create database indexes for performance"""
+    """Create the registered database indexes (see app/indexes.py), all collections in parallel"""
     db = database.db
     
-    # Users indexes
-    await db.users.create_index("email", unique=True)
-    await db.users.create_index("role")
-    
-    # Devices indexes
-    await db.devices.create_index("device_id", unique=True)
-    await db.devices.create_index("serial_number", unique=True)
-    await db.devices.create_index("status")
-    await db.devices.create_index("current_holder_id")
-    
-    # Distributions indexes
-    await db.distributions.create_index("distribution_id", unique=True)
-    await db.distributions.create_index("status")
-    await db.distributions.create_index("from_user_id")
-    await db.distributions.create_index("to_user_id")
-    
-    # Defects indexes
-    await db.defects.create_index("report_id", unique=True)
-    await db.defects.create_index("device_id")
-    await db.defects.create_index("status")
-    await db.defects.create_index("reported_by")
-    
-    # Returns indexes
-    await db.returns.create_index("return_id", unique=True)
-    await db.returns.create_index("device_id")
-    await db.returns.create_index("status")
-    
-    # Operators indexes
-    await db.operators.create_index("operator_id", unique=True)
-    await db.operators.create_index("assigned_to")
-    
-    # Notifications indexes
-    await db.notifications.create_index("user_id")
-    await db.notifications.create_index("is_read")
-    await db.notifications.create_index([("created_at", -1)])
-    
-    # Device history indexes
-    await db.device_history.create_index("device_id")
-    await db.device_history.create_index([("timestamp", -1)])
-    
-    # Approvals indexes
-    await db.approvals.create_index("entity_id")
-    await db.approvals.create_index("status")
+    await asyncio.gather(*(create_collection_indexes(db, collection) for collection in INDEXES))
     
     print("✅ Database indexes created")
 
 
+async def ping_database(timeout: float = 2.0) -> float:
+    """Ping MongoDB and return the round-trip latency in milliseconds"""
+    start = time.perf_counter()
+    await asyncio.wait_for(database.client.admin.command("ping"), timeout)
+    return (time.perf_counter() - start) * 1000
+
+
 def get_database() -> AsyncIOMotorDatabase:
     """Get database instance"""
     return database.db
+
+
+ANALYTICS_READ_PREFERENCES = {
+    "primaryPreferred": PrimaryPreferred,
+    "secondary": Secondary,
+    "secondaryPreferred": SecondaryPreferred,
+    "nearest": Nearest
+}
+
+
+def parse_tag_sets(value: str) -> Optional[List[Dict[str, str]]]:
+    """Parse "k:v,k:v;k:v;" into read preference tag sets"""
+    if not value.strip():
+        return None
+    tag_sets = []
+    for tag_set in value.split(";"):
+        pairs = [pair.split(":", 1) for pair in tag_set.split(",") if pair.strip()]
+        tag_sets.append({key.strip(): val.strip() for key, val in pairs})
+    return tag_sets
+
+
+def get_analytics_database() -> AsyncIOMotorDatabase:
+    """
+    Get a database handle for report and dashboard reads.
+    
+    When ANALYTICS_READS_ENABLED, reads are routed by ANALYTICS_READ_PREFERENCE
+    (secondaryPreferred by default) to members at most
+    ANALYTICS_MAX_STALENESS_SECONDS behind, optionally restricted to
+    ANALYTICS_TAG_SETS. Otherwise this is the regular database handle.
+    """
+    if not settings.ANALYTICS_READS_ENABLED or database.db is None or _primary_reads.get():
+        return database.db
+    
+    if database.analytics_db is None:
+        mode = ANALYTICS_READ_PREFERENCES.get(settings.ANALYTICS_READ_PREFERENCE)
+        if mode is None:
+            raise ValueError(f"Unsupported ANALYTICS_READ_PREFERENCE: {settings.ANALYTICS_READ_PREFERENCE}")
+        read_preference = mode(
+            tag_sets=parse_tag_sets(settings.ANALYTICS_TAG_SETS),
+            max_staleness=settings.ANALYTICS_MAX_STALENESS_SECONDS
+        )
+        database.analytics_db = database.db.client.get_database(
+            database.db.name, read_preference=read_preference
+        )
+    return database.analytics_db
+
+
+@contextmanager
+def read_from_primary() -> Iterator[None]:
+    """Route get_analytics_database() reads in this context to the primary"""
+    token = _primary_reads.set(True)
+    try:
+        yield
+    finally:
+        _primary_reads.reset(token)
@@ -0,0 +1,98 @@
+"""Audit database indexes against the registry in app/indexes.py.
+
+Diffs registered and live indexes per collection, then explains the
+canonical query of each service function and flags collection scans and
+in-memory sorts. Exits non-zero when an index is missing or a query scans
+the collection.
+
+Usage (from the backend directory):
+
+    python -m app.index_audit               # report only
+    python -m app.index_audit --apply       # also build missing indexes
+    python -m app.index_audit --drop-redundant
+"""
+import argparse
+import asyncio
+import sys
+from typing import Any, Dict
+
+from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
+
+from app.config import settings
+from app.indexes import INDEXES, create_collection_indexes, diff_indexes, explain_query_shapes
+
+
+async def run_audit(db: AsyncIOMotorDatabase) -> Dict[str, Any]:
+    """Diff the index registry and explain every canonical query"""
+    return {
+        "indexes": await diff_indexes(db),
+        "queries": await explain_query_shapes(db)
+    }
+
+
+def print_report(report: Dict[str, Any]) -> int:
+    """Print an audit report and return the number of problems found"""
+    problems = 0
+
+    print("Indexes")
+    for collection, diff in report["indexes"].items():
+        for kind in ("missing", "mismatched", "redundant", "extra"):
+            for name in diff[kind]:
+                print(f"  {kind:<11}{collection}.{name}")
+        problems += len(diff["missing"]) + len(diff["mismatched"])
+
+    print("\nQueries")
+    for query in report["queries"]:
+        if query["collscan"]:
+            flag = "COLLSCAN"
+            problems += 1
+        elif query["in_memory_sort"]:
+            flag = "SORT"
+        else:
+            flag = "ok"
+        print(f"  {flag:<9}{query['name']}  [{' > '.join(query['stages'])}]")
+
+    print(f"\n{problems} problem(s) found")
+    return problems
+
+
+async def log_audit(db: AsyncIOMotorDatabase) -> None:
+    """Startup mode: print only the problems of an audit"""
+    report = await run_audit(db)
+    for collection, diff in report["indexes"].items():
+        for name in diff["missing"] + diff["mismatched"]:
+            print(f"⚠️ Index {collection}.{name} is missing or differs from the registry")
+    for query in report["queries"]:
+        if query["collscan"]:
+            print(f"⚠️ {query['name']} scans the whole {query['collection']} collection")
+
+
+async def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--apply", action="store_true", help="build missing registered indexes first")
+    parser.add_argument("--drop-redundant", action="store_true",
+                        help="drop unregistered indexes that are a key prefix of a registered one")
+    args = parser.parse_args()
+
+    client = AsyncIOMotorClient(settings.MONGODB_URL)
+    db = client[settings.DATABASE_NAME]
+    try:
+        if args.apply:
+            for collection in INDEXES:
+                await create_collection_indexes(db, collection)
+            print("✅ Registered indexes built\n")
+
+        if args.drop_redundant:
+            for collection, diff in (await diff_indexes(db)).items():
+                for name in diff["redundant"]:
+                    await db[collection].drop_index(name)
+                    print(f"Dropped {collection}.{name}")
+            print()
+
+        return 1 if print_report(await run_audit(db)) else 0
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,250 @@
+"""
+Declarative index registry.
+
+Every index the services rely on is listed here, per collection, next to
+the canonical query shapes it serves. `database.create_indexes` builds the
+registry and `python -m app.index_audit` diffs it against the live indexes
+and explains each query shape to flag collection scans.
+"""
+from datetime import datetime
+from typing import Any, Dict, List, Tuple
+
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import ASCENDING, DESCENDING, IndexModel
+
+# Keyset pagination order used by every list endpoint (see helpers.LIST_SORT)
+LIST_KEYS = [("created_at", DESCENDING), ("_id", DESCENDING)]
+
+
+def _list_index(*fields: str) -> IndexModel:
+    """Equality fields followed by the list sort, for filtered list pages"""
+    return IndexModel([(field, ASCENDING) for field in fields] + LIST_KEYS)
+
+
+INDEXES: Dict[str, List[IndexModel]] = {
+    "users": [
+        IndexModel("email", unique=True),
+        IndexModel("search_tokens"),
+        IndexModel(LIST_KEYS),
+        _list_index("role"),
+        _list_index("status"),
+    ],
+    "devices": [
+        IndexModel("device_id", unique=True),
+        IndexModel("serial_number", unique=True),
+        # Named apart from the old non-unique mac_address_1, which the audit
+        # then reports as redundant instead of failing the build
+        IndexModel("mac_address", unique=True, name="mac_address_unique"),
+        IndexModel("search_tokens"),
+        IndexModel("reserved_by", partialFilterExpression={"reserved_by": {"$type": "string"}}),
+        IndexModel(LIST_KEYS),
+        _list_index("status"),
+        _list_index("device_type"),
+        _list_index("current_holder_id"),
+        IndexModel([("current_holder_id", ASCENDING), ("status", ASCENDING)]),
+    ],
+    "distributions": [
+        IndexModel("distribution_id", unique=True),
+        IndexModel("search_tokens"),
+        IndexModel(LIST_KEYS),
+        _list_index("status"),
+        _list_index("from_user_id"),
+        _list_index("to_user_id"),
+    ],
+    "defects": [
+        IndexModel("report_id", unique=True),
+        IndexModel("device_id"),
+        IndexModel("search_tokens"),
+        IndexModel(LIST_KEYS),
+        _list_index("status"),
+        _list_index("severity"),
+        _list_index("reported_by"),
+    ],
+    "returns": [
+        IndexModel("return_id", unique=True),
+        IndexModel("device_id"),
+        IndexModel("search_tokens"),
+        IndexModel(LIST_KEYS),
+        _list_index("status"),
+        _list_index("reason"),
+        _list_index("requested_by"),
+    ],
+    "operators": [
+        IndexModel("operator_id", unique=True),
+        IndexModel("search_tokens"),
+        IndexModel(LIST_KEYS),
+        _list_index("assigned_to"),
+        _list_index("status"),
+    ],
+    "notifications": [
+        IndexModel([("created_at", DESCENDING)]),
+        _list_index("user_id"),
+        _list_index("user_id", "is_read"),
+    ],
+    "device_history": [
+        IndexModel([("device_id", ASCENDING), ("timestamp", DESCENDING)]),
+        IndexModel([("timestamp", DESCENDING)]),
+        IndexModel([("performed_by", ASCENDING), ("timestamp", DESCENDING)]),
+        IndexModel([("from_user_id", ASCENDING), ("timestamp", DESCENDING)]),
+        IndexModel([("to_user_id", ASCENDING), ("timestamp", DESCENDING)]),
+    ],
+    "approvals": [
+        IndexModel([("entity_id", ASCENDING), ("approval_type", ASCENDING)]),
+        _list_index("status"),
+        _list_index("status", "approval_type"),
+    ],
+    "export_jobs": [
+        IndexModel("expires_at"),
+    ],
+}
+
+_ID = str(ObjectId())
+_LIST_SORT = dict(LIST_KEYS)
+_HISTORY_SORT = {"timestamp": DESCENDING}
+
+# Canonical query of each service function: (name, collection, filter, sort)
+QUERY_SHAPES: List[Tuple[str, str, Dict[str, Any], Dict[str, int]]] = [
+    ("auth_service.authenticate_user", "users", {"email": "user@dms.com"}, {}),
+    ("user_service.get_users(role)", "users", {"role": "operator"}, _LIST_SORT),
+    ("user_service.get_users_by_role", "users", {"role": "operator", "status": "active"}, {}),
+    ("defect_service.create_defect(admins)", "users", {"role": {"$in": ["admin", "manager"]}}, {}),
+    ("device_service.get_devices", "devices", {}, _LIST_SORT),
+    ("device_service.get_devices(status)", "devices", {"status": "available"}, _LIST_SORT),
+    ("device_service.get_devices(type)", "devices", {"device_type": "ONU"}, _LIST_SORT),
+    ("device_service.get_devices(holder)", "devices", {"current_holder_id": _ID}, _LIST_SORT),
+    ("device_service.get_devices(search)", "devices", {"search_tokens": {"$all": ["onu"]}}, _LIST_SORT),
+    ("device_service.create_device(serial)", "devices", {"serial_number": "SN0001"}, {}),
+    ("device_service.create_device(mac)", "devices", {"mac_address": "00:00:00:00:00:00"}, {}),
+    ("device_service.release_devices", "devices", {"reserved_by": _ID}, {}),
+    ("device_service.get_available_devices", "devices",
+     {"status": "available", "reserved_by": None, "current_holder_id": _ID}, {}),
+    ("dashboard_service.get_holder_device_counts", "devices", {"current_holder_id": _ID}, {}),
+    ("dashboard_service.get_system_alerts(stock)", "devices", {"status": "available"}, {}),
+    ("distribution_service.get_distributions(status)", "distributions", {"status": "pending"}, _LIST_SORT),
+    ("distribution_service.get_distributions(from)", "distributions", {"from_user_id": _ID}, _LIST_SORT),
+    ("distribution_service.get_distributions(to)", "distributions", {"to_user_id": _ID}, _LIST_SORT),
+    ("dashboard_service.get_dashboard_stats(pending)", "distributions",
+     {"from_user_id": _ID, "status": "pending"}, {}),
+    ("defect_service.get_defects(status)", "defects", {"status": "reported"}, _LIST_SORT),
+    ("defect_service.get_defects(severity)", "defects", {"severity": "critical"}, _LIST_SORT),
+    ("defect_service.get_defects(reported_by)", "defects", {"reported_by": _ID}, _LIST_SORT),
+    ("dashboard_service.get_distribution_chart_data", "distributions",
+     {"status": "delivered", "created_at": {"$gte": datetime(2000, 1, 1), "$lt": datetime(2001, 1, 1)}}, {}),
+    ("dashboard_service.get_defect_chart_data", "defects", {"$or": [
+        {"created_at": {"$gte": datetime(2000, 1, 1), "$lt": datetime(2001, 1, 1)}},
+        {"status": "resolved", "resolved_at": {"$gte": datetime(2000, 1, 1), "$lt": datetime(2001, 1, 1)}}
+    ]}, {}),
+    ("dashboard_service.get_system_alerts(critical)", "defects",
+     {"severity": "critical", "status": {"$ne": "resolved"}}, {}),
+    ("return_service.get_returns(status)", "returns", {"status": "pending"}, _LIST_SORT),
+    ("return_service.get_returns(reason)", "returns", {"reason": "defective"}, _LIST_SORT),
+    ("return_service.get_returns(requested_by)", "returns", {"requested_by": _ID}, _LIST_SORT),
+    ("operator_service.get_operators(assigned_to)", "operators", {"assigned_to": _ID}, _LIST_SORT),
+    ("operator_service.get_operators(status)", "operators", {"status": "active"}, _LIST_SORT),
+    ("notification_service.get_notifications", "notifications", {"user_id": _ID}, _LIST_SORT),
+    ("notification_service.get_unread_count", "notifications", {"user_id": _ID, "is_read": False}, {}),
+    ("notification_service.delete_old_notifications", "notifications",
+     {"created_at": {"$lt": datetime(2000, 1, 1)}}, {}),
+    ("device_service.get_device_history", "device_history", {"device_id": _ID}, _HISTORY_SORT),
+    ("dashboard_service.get_recent_activities(admin)", "device_history", {}, _HISTORY_SORT),
+    ("dashboard_service.get_recent_activities(user)", "device_history",
+     {"$or": [{"performed_by": _ID}, {"from_user_id": _ID}, {"to_user_id": _ID}]}, _HISTORY_SORT),
+    ("approval_service.get_approvals", "approvals", {"status": "pending"}, _LIST_SORT),
+    ("approval_service.get_approvals(type)", "approvals",
+     {"status": "pending", "approval_type": "distribution"}, _LIST_SORT),
+    ("distribution_service.update_distribution_status(approval)", "approvals",
+     {"entity_id": _ID, "approval_type": "distribution"}, {}),
+    ("export_service.stream_export(devices, status)", "devices", {"status": "available"}, _LIST_SORT),
+    ("export_service.stream_export(history)", "device_history", {}, _HISTORY_SORT),
+    ("export_service.delete_expired_exports", "export_jobs", {"expires_at": {"$lt": datetime(2000, 1, 1)}}, {}),
+]
+
+# Options that make two indexes on the same keys different
+_INDEX_OPTIONS = ("unique", "sparse", "partialFilterExpression", "expireAfterSeconds")
+
+
+def _spec(index: Dict[str, Any]) -> Dict[str, Any]:
+    """Normalize an IndexModel document or index_information() entry"""
+    keys = index["key"]
+    keys = list(keys.items()) if isinstance(keys, dict) else list(keys)
+    return {
+        "key": [(field, int(direction) if isinstance(direction, (int, float)) else direction)
+                for field, direction in keys],
+        **{option: index[option] for option in _INDEX_OPTIONS if index.get(option)}
+    }
+
+
+async def create_collection_indexes(db: AsyncIOMotorDatabase, collection: str) -> List[str]:
+    """Build every registered index of a collection in one createIndexes command"""
+    return await db[collection].create_indexes(INDEXES[collection])
+
+
+async def diff_indexes(db: AsyncIOMotorDatabase) -> Dict[str, Dict[str, List[str]]]:
+    """
+    Compare the registry with the live indexes of each collection.
+
+    - missing: registered but not built
+    - mismatched: built under the same name with different options
+    - redundant: not registered, and a key prefix of a registered index
+    - extra: not registered and not covered by a registered index
+    """
+    diff: Dict[str, Dict[str, List[str]]] = {}
+    for collection, models in INDEXES.items():
+        expected = {model.document["name"]: _spec(model.document) for model in models}
+        existing = {
+            name: _spec(info)
+            for name, info in (await db[collection].index_information()).items()
+            if name != "_id_"
+        }
+
+        result: Dict[str, List[str]] = {"missing": [], "mismatched": [], "redundant": [], "extra": []}
+        for name, spec in expected.items():
+            if name not in existing:
+                result["missing"].append(name)
+            elif existing[name] != spec:
+                result["mismatched"].append(name)
+        for name, spec in existing.items():
+            if name in expected:
+                continue
+            covered = any(
+                other["key"][:len(spec["key"])] == spec["key"] and len(spec) == 1
+                for other in expected.values()
+            )
+            result["redundant" if covered else "extra"].append(name)
+
+        diff[collection] = result
+    return diff
+
+
+def _plan_stages(plan: Any) -> List[str]:
+    """Collect every stage name in an explain() plan tree"""
+    stages: List[str] = []
+    if isinstance(plan, dict):
+        if "stage" in plan:
+            stages.append(plan["stage"])
+        for value in plan.values():
+            stages.extend(_plan_stages(value))
+    elif isinstance(plan, list):
+        for item in plan:
+            stages.extend(_plan_stages(item))
+    return stages
+
+
+async def explain_query_shapes(db: AsyncIOMotorDatabase) -> List[Dict[str, Any]]:
+    """Explain each canonical query shape and report the winning plan's stages"""
+    results = []
+    for name, collection, query, sort in QUERY_SHAPES:
+        find: Dict[str, Any] = {"find": collection, "filter": query, "limit": 20}
+        if sort:
+            find["sort"] = sort
+        explain = await db.command({"explain": find, "verbosity": "queryPlanner"})
+        stages = _plan_stages(explain.get("queryPlanner", {}).get("winningPlan", {}))
+        results.append({
+            "name": name,
+            "collection": collection,
+            "stages": stages,
+            "collscan": "COLLSCAN" in stages,
+            "in_memory_sort": "SORT" in stages
+        })
+    return results
@@ -7,24 +7,36 @@ from app.database import connect_to_mongodb, close_mongodb_connection
 from app.routes import (
     auth, users, devices, distributions, 
     defects, returns, approvals, operators,
-    notifications, reports, dashboard
+    notifications, reports, dashboard, health
 )
 from app.middleware.error_handler import add_exception_handlers
+from app.utils.responses import FastJSONResponse
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Lifespan context manager for startup and shutdown events"""
-    # Startup
+    # Startup: connect, then build indexes, seed data, counters and search
+    # tokens in the background (see /health/ready)
     await connect_to_mongodb()
     
-    # Seed initial data
-    from app.services.seed_service import seed_initial_data
-    await seed_initial_data()
+    from app.services import startup_service
+    startup_service.start_initialization()
+    
+    # Background notification delivery
+    from app.services.notification_service import dispatcher
+    if settings.NOTIFICATION_QUEUE_ENABLED:
+        dispatcher.start()
     
     yield
     
-    # Shutdown
+    # Shutdown: end live streams and deliver queued notifications before the connection closes
+    from app.services.notification_service import notification_pubsub
+    notification_pubsub.close()
+    await dispatcher.stop()
+    from app.services import export_service
+    await export_service.stop_export_jobs()
+    await startup_service.stop_initialization()
     await close_mongodb_connection()
 
 
@@ -35,6 +47,7 @@ app = FastAPI(
     description="Backend API for Distribution Management System",
     docs_url="/docs",
     redoc_url="/redoc",
+    default_response_class=FastJSONResponse,
     lifespan=lifespan
 )
 
@@ -62,6 +75,7 @@ app.include_router(operators.router, prefix=f"{settings.API_V1_PREFIX}/operators
 app.include_router(notifications.router, prefix=f"{settings.API_V1_PREFIX}/notifications", tags=["Notifications"])
 app.include_router(reports.router, prefix=f"{settings.API_V1_PREFIX}/reports", tags=["Reports"])
 app.include_router(dashboard.router, prefix=f"{settings.API_V1_PREFIX}/dashboard", tags=["Dashboard"])
+app.include_router(health.router, tags=["Health"])
 
 
 @app.get("/", tags=["Root"])
@@ -72,9 +86,3 @@ async def root():
         "version": settings.APP_VERSION,
         "docs": "/docs"
     }
-
-
-@app.get("/health", tags=["Health"])
-async def health_check():
-    """Health check endpoint"""
-    return {"status": "healthy"}
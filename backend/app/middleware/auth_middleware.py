@@ -1,4 +1,4 @@
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Query, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from typing import Optional, List
 
@@ -8,11 +8,9 @@ from app.utils.permissions import check_permission
 security = HTTPBearer()
 
 
-async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
-    """Get current authenticated user from JWT token"""
-    token = credentials.credentials
-    
-    user = await get_current_user_from_token(token)
+async def _authenticate(token: str, token_type: str = "access") -> dict:
+    """Resolve an active user from a JWT token"""
+    user = await get_current_user_from_token(token, token_type)
     
     if user is None:
         raise HTTPException(
@@ -30,6 +28,32 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
     return user
 
 
+async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
+    """Get current authenticated user from JWT token"""
+    return await _authenticate(credentials.credentials)
+
+
+async def get_current_user_for_stream(
+    token: Optional[str] = Query(None, description="Stream token from POST /notifications/stream-token (EventSource cannot set headers)"),
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(HTTPBearer(auto_error=False))
+):
+    """
+    Get current user from the Authorization header, or a stream token in the `token` query parameter.
+
+    Query strings end up in access logs, so the query parameter only accepts
+    short-lived stream tokens, never access tokens.
+    """
+    if credentials is not None:
+        return await _authenticate(credentials.credentials)
+    if token:
+        return await _authenticate(token, "stream")
+    raise HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Not authenticated",
+        headers={"WWW-Authenticate": "Bearer"}
+    )
+
+
 async def get_current_user_optional(
     credentials: Optional[HTTPAuthorizationCredentials] = Depends(HTTPBearer(auto_error=False))
 ):
@@ -4,6 +4,8 @@ from fastapi.exceptions import RequestValidationError
 from starlette.exceptions import HTTPException as StarletteHTTPException
 import traceback
 
+from app.utils.transactions import ConflictError
+
 
 def add_exception_handlers(app: FastAPI):
     """Add global exception handlers to the app"""
@@ -62,6 +64,21 @@ def add_exception_handlers(app: FastAPI):
             }
         )
     
+    @app.exception_handler(ConflictError)
+    async def conflict_error_handler(request: Request, exc: ConflictError):
+        """Handle conflicts (the record changed concurrently)"""
+        return JSONResponse(
+            status_code=409,
+            content={
+                "success": False,
+                "message": str(exc),
+                "error": {
+                    "code": "CONFLICT",
+                    "details": str(exc)
+                }
+            }
+        )
+    
     @app.exception_handler(ValueError)
     async def value_error_handler(request: Request, exc: ValueError):
         """Handle value errors (business logic errors)"""
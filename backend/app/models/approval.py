@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import Optional, List
 from datetime import datetime
 from enum import Enum
 
@@ -54,6 +54,7 @@ class Approval(BaseModel):
     approval_date: Optional[datetime] = None
     rejection_reason: Optional[str] = None
     notes: Optional[str] = None
+    version: int = 0  # incremented by every status change
     created_at: datetime
     updated_at: datetime
     
@@ -81,9 +82,20 @@ class ApprovalResponse(BaseModel):
     rejection_reason: Optional[str] = None
     notes: Optional[str] = None
     entity_details: Optional[dict] = None
+    version: int = 0
     created_at: datetime
 
 
 class ApprovalAction(BaseModel):
     rejection_reason: Optional[str] = None
     notes: Optional[str] = None
+
+
+class ApprovalBatchActionType(str, Enum):
+    APPROVE = "approve"
+    REJECT = "reject"
+
+
+class ApprovalBatchAction(ApprovalAction):
+    approval_ids: List[str] = Field(..., min_length=1)
+    action: ApprovalBatchActionType
@@ -13,6 +13,8 @@ class TokenData(BaseModel):
     email: Optional[str] = None
     role: Optional[str] = None
     name: Optional[str] = None
+    expires_at: Optional[int] = None
+    token_type: Optional[str] = None
 
 
 class LoginRequest(BaseModel):
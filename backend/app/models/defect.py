@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Optional, List
+from typing import Optional, List, Dict, Tuple
 from datetime import datetime
 from enum import Enum
 
@@ -28,6 +28,18 @@ class DefectStatus(str, Enum):
     RESOLVED = "resolved"
 
 
+# Target status -> statuses a defect report may move to it from
+DEFECT_TRANSITIONS: Dict[str, Tuple[str, ...]] = {
+    DefectStatus.REPORTED.value: (DefectStatus.UNDER_REVIEW.value,),
+    DefectStatus.UNDER_REVIEW.value: (DefectStatus.REPORTED.value,),
+    DefectStatus.APPROVED.value: (DefectStatus.REPORTED.value, DefectStatus.UNDER_REVIEW.value),
+    DefectStatus.REJECTED.value: (DefectStatus.REPORTED.value, DefectStatus.UNDER_REVIEW.value),
+    DefectStatus.RESOLVED.value: (
+        DefectStatus.REPORTED.value, DefectStatus.UNDER_REVIEW.value, DefectStatus.APPROVED.value
+    )
+}
+
+
 class DefectBase(BaseModel):
     device_id: str
     defect_type: DefectType
@@ -66,6 +78,7 @@ class DefectReport(BaseModel):
     resolved_by_name: Optional[str] = None
     resolved_at: Optional[datetime] = None
     images: Optional[List[str]] = None
+    version: int = 0  # incremented by every update
     created_at: datetime
     updated_at: datetime
     
@@ -92,13 +105,16 @@ class DefectResponse(BaseModel):
     resolved_by_name: Optional[str] = None
     resolved_at: Optional[datetime] = None
     images: Optional[List[str]] = None
+    version: int = 0
     created_at: datetime
 
 
 class DefectResolve(BaseModel):
     resolution: str = Field(..., min_length=10, max_length=1000)
+    version: Optional[int] = None  # expected current version; 409 if it changed
 
 
 class DefectStatusUpdate(BaseModel):
     status: DefectStatus
     notes: Optional[str] = None
+    version: Optional[int] = None  # expected current version; 409 if it changed
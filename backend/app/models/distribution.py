@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Optional, List
+from typing import Optional, List, Dict, Tuple
 from datetime import datetime
 from enum import Enum
 
@@ -13,6 +13,17 @@ class DistributionStatus(str, Enum):
     CANCELLED = "cancelled"
 
 
+# Target status -> statuses a distribution may move to it from
+DISTRIBUTION_TRANSITIONS: Dict[str, Tuple[str, ...]] = {
+    DistributionStatus.PENDING.value: (),
+    DistributionStatus.APPROVED.value: (DistributionStatus.PENDING.value,),
+    DistributionStatus.IN_TRANSIT.value: (DistributionStatus.APPROVED.value,),
+    DistributionStatus.DELIVERED.value: (DistributionStatus.APPROVED.value, DistributionStatus.IN_TRANSIT.value),
+    DistributionStatus.REJECTED.value: (DistributionStatus.PENDING.value,),
+    DistributionStatus.CANCELLED.value: (DistributionStatus.PENDING.value,)
+}
+
+
 class UserType(str, Enum):
     NOC = "noc"
     DISTRIBUTOR = "distributor"
@@ -54,6 +65,7 @@ class Distribution(BaseModel):
     approved_by: Optional[str] = None
     approved_by_name: Optional[str] = None
     created_by: str
+    version: int = 0  # incremented by every status change
     created_at: datetime
     updated_at: datetime
     
@@ -80,9 +92,11 @@ class DistributionResponse(BaseModel):
     notes: Optional[str] = None
     approved_by: Optional[str] = None
     approved_by_name: Optional[str] = None
+    version: int = 0
     created_at: datetime
 
 
 class DistributionStatusUpdate(BaseModel):
     status: DistributionStatus
     notes: Optional[str] = None
+    version: Optional[int] = None  # expected current version; 409 if it changed
@@ -0,0 +1,39 @@
+from pydantic import BaseModel
+from typing import Optional
+from datetime import datetime
+from enum import Enum
+
+
+class ExportType(str, Enum):
+    DEVICES = "devices"
+    DISTRIBUTIONS = "distributions"
+    DEFECTS = "defects"
+    RETURNS = "returns"
+    DEVICE_HISTORY = "device_history"
+
+
+class ExportFormat(str, Enum):
+    CSV = "csv"
+    NDJSON = "ndjson"
+
+
+class ExportMode(str, Enum):
+    STREAM = "stream"
+    JOB = "job"
+
+
+class ExportJobStatus(str, Enum):
+    PENDING = "pending"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+
+class ExportRequest(BaseModel):
+    report_type: ExportType = ExportType.DEVICES
+    format: ExportFormat = ExportFormat.CSV
+    compress: bool = False
+    mode: ExportMode = ExportMode.STREAM
+    status: Optional[str] = None
+    date_from: Optional[datetime] = None
+    date_to: Optional[datetime] = None
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import Optional, Dict, Tuple
 from datetime import datetime
 from enum import Enum
 
@@ -21,6 +21,17 @@ class ReturnStatus(str, Enum):
     CANCELLED = "cancelled"
 
 
+# Target status -> statuses a return request may move to it from
+RETURN_TRANSITIONS: Dict[str, Tuple[str, ...]] = {
+    ReturnStatus.PENDING.value: (),
+    ReturnStatus.APPROVED.value: (ReturnStatus.PENDING.value,),
+    ReturnStatus.IN_TRANSIT.value: (ReturnStatus.APPROVED.value,),
+    ReturnStatus.RECEIVED.value: (ReturnStatus.APPROVED.value, ReturnStatus.IN_TRANSIT.value),
+    ReturnStatus.REJECTED.value: (ReturnStatus.PENDING.value,),
+    ReturnStatus.CANCELLED.value: (ReturnStatus.PENDING.value,)
+}
+
+
 class ReturnBase(BaseModel):
     device_id: str
     reason: ReturnReason
@@ -55,6 +66,7 @@ class ReturnRequest(BaseModel):
     received_date: Optional[datetime] = None
     approved_by: Optional[str] = None
     approved_by_name: Optional[str] = None
+    version: int = 0  # incremented by every status change
     created_at: datetime
     updated_at: datetime
     
@@ -81,9 +93,11 @@ class ReturnResponse(BaseModel):
     received_date: Optional[datetime] = None
     approved_by: Optional[str] = None
     approved_by_name: Optional[str] = None
+    version: int = 0
     created_at: datetime
 
 
 class ReturnStatusUpdate(BaseModel):
     status: ReturnStatus
     notes: Optional[str] = None
+    version: Optional[int] = None  # expected current version; 409 if it changed
@@ -1,2 +1,2 @@
 # Routes package
-from app.routes import auth, users, devices, distributions, defects, returns, approvals, operators, notifications, reports, dashboard
+from app.routes import auth, users, devices, distributions, defects, returns, approvals, operators, notifications, reports, dashboard, health
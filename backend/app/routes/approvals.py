@@ -1,7 +1,8 @@
 from fastapi import APIRouter, HTTPException, status, Depends, Query
 from typing import Optional
-from app.models.approval import ApprovalAction
+from app.models.approval import ApprovalAction, ApprovalBatchAction
 from app.services import approval_service
+from app.utils.transactions import ConflictError
 from app.middleware.auth_middleware import get_current_user, require_management
 
 router = APIRouter()
@@ -14,6 +15,9 @@ async def get_approvals(
     status: Optional[str] = None,
     approval_type: Optional[str] = None,
     search: Optional[str] = None,
+    cursor: bool = False,
+    after: Optional[str] = None,
+    include_total: bool = False,
     current_user: dict = Depends(require_management)
 ):
     """Get all pending approvals with pagination"""
@@ -22,7 +26,10 @@ async def get_approvals(
         page_size=page_size,
         status=status,
         approval_type=approval_type,
-        search=search
+        search=search,
+        after=after,
+        cursor=cursor,
+        include_total=include_total
     )
     
     return {
@@ -33,6 +40,34 @@ async def get_approvals(
     }
 
 
+@router.post("/batch")
+async def process_batch(
+    batch: ApprovalBatchAction,
+    current_user: dict = Depends(require_management)
+):
+    """Approve or reject many pending requests, reporting the outcome per id"""
+    try:
+        result = await approval_service.process_batch(
+            approval_ids=batch.approval_ids,
+            action=batch.action.value,
+            approver=current_user,
+            notes=batch.notes,
+            rejection_reason=batch.rejection_reason
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    
+    processed = result["summary"].get("approved", 0) + result["summary"].get("rejected", 0)
+    return {
+        "success": True,
+        "message": f"{processed} of {len(result['results'])} requests {result['status']}",
+        "data": result
+    }
+
+
 @router.get("/{approval_id}")
 async def get_approval(
     approval_id: str,
@@ -81,6 +116,11 @@ async def approve_request(
             "message": "Request approved successfully",
             "data": approval
         }
+    except ConflictError as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=str(e)
+        )
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -114,6 +154,11 @@ async def reject_request(
             "message": "Request rejected successfully",
             "data": approval
         }
+    except ConflictError as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=str(e)
+        )
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
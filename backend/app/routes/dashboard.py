@@ -1,6 +1,9 @@
-from fastapi import APIRouter, Depends
-from app.services import dashboard_service
-from app.middleware.auth_middleware import get_current_user
+from datetime import datetime
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from app.services import dashboard_service, stats_counter_service
+from app.utils.db_metrics import get_db_metrics
+from app.middleware.auth_middleware import get_current_user, require_admin
 
 router = APIRouter()
 
@@ -19,6 +22,49 @@ async def get_dashboard_stats(
     }
 
 
+@router.post("/stats/reconcile")
+async def reconcile_dashboard_stats(
+    current_user: dict = Depends(require_admin)
+):
+    """Rebuild the materialized dashboard counters from scratch"""
+    await stats_counter_service.rebuild_counters()
+    
+    return {
+        "success": True,
+        "message": "Dashboard stats reconciled successfully"
+    }
+
+
+@router.get("/metrics")
+async def get_metrics(
+    current_user: dict = Depends(require_admin)
+):
+    """Get connection pool, command latency and cache metrics for this worker"""
+    from app.services.auth_service import user_cache
+    from app.services.notification_service import dispatcher, notification_pubsub
+    from app.utils.security import token_cache
+    
+    return {
+        "success": True,
+        "message": "Metrics retrieved successfully",
+        "data": {
+            "database": get_db_metrics(),
+            "caches": {
+                "users": user_cache.stats(),
+                "tokens": token_cache.stats()
+            },
+            "notifications": {
+                "stream": notification_pubsub.stats(),
+                "queue": {
+                    "running": dispatcher.running,
+                    "delivered": dispatcher.delivered,
+                    "failed": dispatcher.failed
+                }
+            }
+        }
+    }
+
+
 @router.get("/recent-activities")
 async def get_recent_activities(
     limit: int = 10,
@@ -36,10 +82,19 @@ async def get_recent_activities(
 
 @router.get("/charts/distributions")
 async def get_distribution_chart_data(
+    from_date: Optional[datetime] = Query(None, alias="from"),
+    to_date: Optional[datetime] = Query(None, alias="to"),
+    granularity: str = Query("month", pattern="^(day|week|month)$"),
     current_user: dict = Depends(get_current_user)
 ):
     """Get distribution chart data"""
-    data = await dashboard_service.get_distribution_chart_data()
+    try:
+        data = await dashboard_service.get_distribution_chart_data(from_date, to_date, granularity)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
     
     return {
         "success": True,
@@ -50,10 +105,19 @@ async def get_distribution_chart_data(
 
 @router.get("/charts/defects")
 async def get_defect_chart_data(
+    from_date: Optional[datetime] = Query(None, alias="from"),
+    to_date: Optional[datetime] = Query(None, alias="to"),
+    granularity: str = Query("month", pattern="^(day|week|month)$"),
     current_user: dict = Depends(get_current_user)
 ):
     """Get defect chart data"""
-    data = await dashboard_service.get_defect_chart_data()
+    try:
+        data = await dashboard_service.get_defect_chart_data(from_date, to_date, granularity)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
     
     return {
         "success": True,
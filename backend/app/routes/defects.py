@@ -2,6 +2,8 @@ from fastapi import APIRouter, HTTPException, status, Depends, Query
 from typing import Optional
 from app.models.defect import DefectCreate, DefectUpdate, DefectResolve, DefectStatusUpdate
 from app.services import defect_service
+from app.utils.helpers import parse_fields
+from app.utils.responses import api_response
 from app.middleware.auth_middleware import get_current_user, require_admin_or_manager
 
 router = APIRouter()
@@ -15,6 +17,10 @@ async def get_defects(
     severity: Optional[str] = None,
     defect_type: Optional[str] = None,
     search: Optional[str] = None,
+    cursor: bool = False,
+    after: Optional[str] = None,
+    include_total: bool = False,
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return"),
     current_user: dict = Depends(get_current_user)
 ):
     """Get all defect reports with pagination and filters"""
@@ -30,15 +36,14 @@ async def get_defects(
         severity=severity,
         defect_type=defect_type,
         reported_by=reported_by,
-        search=search
+        search=search,
+        after=after,
+        cursor=cursor,
+        include_total=include_total,
+        fields=parse_fields(fields)
     )
     
-    return {
-        "success": True,
-        "message": "Defect reports retrieved successfully",
-        "data": result["data"],
-        "pagination": result["pagination"]
-    }
+    return api_response(result["data"], "Defect reports retrieved successfully", result["pagination"])
 
 
 @router.get("/{defect_id}")
@@ -139,7 +144,8 @@ async def update_defect_status(
         defect_id=defect_id,
         status=status_update.status.value,
         user=current_user,
-        notes=status_update.notes
+        notes=status_update.notes,
+        expected_version=status_update.version
     )
     
     if not defect:
@@ -165,7 +171,8 @@ async def resolve_defect(
     defect = await defect_service.resolve_defect(
         defect_id=defect_id,
         resolution=resolve_data.resolution,
-        resolver=current_user
+        resolver=current_user,
+        expected_version=resolve_data.version
     )
     
     if not defect:
@@ -1,7 +1,9 @@
-from fastapi import APIRouter, HTTPException, status, Depends, Query
+from fastapi import APIRouter, HTTPException, status, Depends, Query, UploadFile, File
 from typing import Optional
 from app.models.device import DeviceCreate, DeviceUpdate
 from app.services import device_service
+from app.utils.helpers import iter_text_lines, parse_fields
+from app.utils.responses import api_response
 from app.middleware.auth_middleware import get_current_user, require_admin_or_manager
 
 router = APIRouter()
@@ -15,6 +17,10 @@ async def get_devices(
     device_type: Optional[str] = None,
     holder_id: Optional[str] = None,
     search: Optional[str] = None,
+    cursor: bool = False,
+    after: Optional[str] = None,
+    include_total: bool = False,
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return"),
     current_user: dict = Depends(get_current_user)
 ):
     """Get all devices with pagination and filters"""
@@ -28,15 +34,14 @@ async def get_devices(
         status=status,
         device_type=device_type,
         holder_id=holder_id,
-        search=search
+        search=search,
+        after=after,
+        cursor=cursor,
+        include_total=include_total,
+        fields=parse_fields(fields)
     )
     
-    return {
-        "success": True,
-        "message": "Devices retrieved successfully",
-        "data": result["data"],
-        "pagination": result["pagination"]
-    }
+    return api_response(result["data"], "Devices retrieved successfully", result["pagination"])
 
 
 @router.get("/available")
@@ -147,6 +152,43 @@ async def create_device(
         )
 
 
+@router.post("/import")
+async def import_devices(
+    file: UploadFile = File(...),
+    format: Optional[str] = Query(None, pattern="^(csv|ndjson)$"),
+    current_user: dict = Depends(require_admin_or_manager)
+):
+    """Bulk-register devices from a CSV or NDJSON file"""
+    if format is None:
+        filename = (file.filename or "").lower()
+        if filename.endswith((".ndjson", ".jsonl")) or file.content_type in ("application/x-ndjson", "application/jsonl"):
+            format = "ndjson"
+        else:
+            format = "csv"
+    
+    try:
+        report = await device_service.import_devices(
+            lines=iter_text_lines(file.read),
+            fmt=format,
+            created_by=current_user["id"],
+            created_by_name=current_user["name"]
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    
+    message = f"{report['inserted']} of {report['total_rows']} devices imported"
+    if report["decode_error"]:
+        message += f"; import stopped early: {report['decode_error']}"
+    return {
+        "success": True,
+        "message": message,
+        "data": report
+    }
+
+
 @router.put("/{device_id}")
 async def update_device(
     device_id: str,
@@ -2,6 +2,9 @@ from fastapi import APIRouter, HTTPException, status, Depends, Query
 from typing import Optional
 from app.models.distribution import DistributionCreate, DistributionStatusUpdate
 from app.services import distribution_service
+from app.utils.helpers import parse_fields
+from app.utils.responses import api_response
+from app.utils.transactions import ConflictError
 from app.middleware.auth_middleware import get_current_user, require_admin_or_manager, require_management
 
 router = APIRouter()
@@ -13,6 +16,10 @@ async def get_distributions(
     page_size: int = Query(20, ge=1, le=100),
     status: Optional[str] = None,
     search: Optional[str] = None,
+    cursor: bool = False,
+    after: Optional[str] = None,
+    include_total: bool = False,
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return"),
     current_user: dict = Depends(get_current_user)
 ):
     """Get all distributions with pagination and filters"""
@@ -26,15 +33,14 @@ async def get_distributions(
         page_size=page_size,
         status=status,
         user_id=user_id,
-        search=search
+        search=search,
+        after=after,
+        cursor=cursor,
+        include_total=include_total,
+        fields=parse_fields(fields)
     )
     
-    return {
-        "success": True,
-        "message": "Distributions retrieved successfully",
-        "data": result["data"],
-        "pagination": result["pagination"]
-    }
+    return api_response(result["data"], "Distributions retrieved successfully", result["pagination"])
 
 
 @router.get("/pending")
@@ -115,7 +121,8 @@ async def update_distribution_status(
             distribution_id=distribution_id,
             status=status_update.status.value,
             user=current_user,
-            notes=status_update.notes
+            notes=status_update.notes,
+            expected_version=status_update.version
         )
         
         if not distribution:
@@ -129,6 +136,11 @@ async def update_distribution_status(
             "message": "Distribution status updated successfully",
             "data": distribution
         }
+    except ConflictError as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=str(e)
+        )
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -158,6 +170,11 @@ async def cancel_distribution(
             "success": True,
             "message": "Distribution cancelled successfully"
         }
+    except ConflictError as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=str(e)
+        )
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -0,0 +1,47 @@
+import time
+from fastapi import APIRouter, status
+from fastapi.responses import JSONResponse
+
+from app.database import ping_database
+from app.services import startup_service
+
+router = APIRouter()
+
+STARTED_AT = time.monotonic()
+
+
+@router.get("/health")
+async def health_check():
+    """Health check endpoint"""
+    return {"status": "healthy"}
+
+
+@router.get("/health/live")
+async def liveness():
+    """Liveness: the process is up and serving requests"""
+    return {
+        "status": "alive",
+        "uptime_seconds": round(time.monotonic() - STARTED_AT, 1)
+    }
+
+
+@router.get("/health/ready")
+async def readiness():
+    """Readiness: the database answers and background initialization finished"""
+    database = {"ok": True, "latency_ms": None, "error": None}
+    try:
+        database["latency_ms"] = round(await ping_database(), 2)
+    except Exception as e:
+        database.update(ok=False, error=str(e) or e.__class__.__name__)
+
+    initialization = startup_service.get_initialization_state()
+    ready = database["ok"] and startup_service.is_initialized()
+
+    return JSONResponse(
+        status_code=status.HTTP_200_OK if ready else status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={
+            "status": "ready" if ready else "not_ready",
+            "database": database,
+            "initialization": initialization
+        }
+    )
@@ -1,7 +1,10 @@
 from fastapi import APIRouter, HTTPException, status, Depends, Query
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
 from typing import Optional
-from app.services import notification_service
-from app.middleware.auth_middleware import get_current_user
+from app.services import notification_service, auth_service
+from app.middleware.auth_middleware import get_current_user, get_current_user_for_stream
+from app.utils.pubsub import SubscriberLimitError
 
 router = APIRouter()
 
@@ -11,6 +14,9 @@ async def get_notifications(
     page: int = Query(1, ge=1),
     page_size: int = Query(20, ge=1, le=100),
     is_read: Optional[bool] = None,
+    cursor: bool = False,
+    after: Optional[str] = None,
+    include_total: bool = False,
     current_user: dict = Depends(get_current_user)
 ):
     """Get user notifications with pagination"""
@@ -18,7 +24,10 @@ async def get_notifications(
         user_id=current_user["id"],
         page=page,
         page_size=page_size,
-        is_read=is_read
+        is_read=is_read,
+        after=after,
+        cursor=cursor,
+        include_total=include_total
     )
     
     return {
@@ -43,6 +52,46 @@ async def get_unread_count(
     }
 
 
+@router.post("/stream-token")
+async def create_stream_token(
+    current_user: dict = Depends(get_current_user)
+):
+    """Issue a short-lived token that only authenticates GET /stream"""
+    return {
+        "success": True,
+        "message": "Stream token created",
+        "data": auth_service.create_user_stream_token(current_user)
+    }
+
+
+@router.get("/stream")
+async def stream_notifications(
+    current_user: dict = Depends(get_current_user_for_stream)
+):
+    """
+    Stream new notifications and unread-count changes as Server-Sent Events.
+
+    Browsers' EventSource cannot send an Authorization header, so a stream
+    token from POST /stream-token may be passed as `?token=` instead. Events
+    are published in-process: each worker only streams notifications created
+    by that worker.
+    """
+    try:
+        subscription = notification_service.subscribe(current_user["id"])
+    except SubscriberLimitError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e)
+        )
+    
+    return StreamingResponse(
+        notification_service.stream_notifications(subscription),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        background=BackgroundTask(notification_service.unsubscribe, subscription)
+    )
+
+
 @router.patch("/{notification_id}/read")
 async def mark_as_read(
     notification_id: str,
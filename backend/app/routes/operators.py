@@ -13,6 +13,9 @@ async def get_operators(
     page_size: int = Query(20, ge=1, le=100),
     status: Optional[str] = None,
     search: Optional[str] = None,
+    cursor: bool = False,
+    after: Optional[str] = None,
+    include_total: bool = False,
     current_user: dict = Depends(get_current_user)
 ):
     """Get all operators with pagination and filters"""
@@ -26,7 +29,10 @@ async def get_operators(
         page_size=page_size,
         assigned_to=assigned_to,
         status=status,
-        search=search
+        search=search,
+        after=after,
+        cursor=cursor,
+        include_total=include_total
     )
     
     return {
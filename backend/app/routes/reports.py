@@ -1,112 +1,224 @@
-from fastapi import APIRouter, HTTPException, status, Depends
-from app.services import report_service
+import os
+from typing import Any, Awaitable, Callable, Dict
+from fastapi import APIRouter, HTTPException, status, Depends, Request, Response
+from fastapi.responses import StreamingResponse, FileResponse
+from app.config import settings
+from app.models.export import ExportRequest, ExportMode, ExportJobStatus
+from app.services import report_service, report_cache_service, export_service
+from app.utils.helpers import serialize_doc
+from app.utils.responses import FastJSONResponse
 from app.middleware.auth_middleware import require_admin_or_manager
 
 router = APIRouter()
 
 
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    """Whether an If-None-Match header matches an ETag (weak comparison)"""
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+async def _report_response(
+    request: Request,
+    name: str,
+    builder: Callable[[], Awaitable[Dict[str, Any]]],
+    message: str
+) -> Response:
+    """Serve a cached report, or 304 when the client already has this version"""
+    report, etag = await report_cache_service.get_report(name, builder)
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and _etag_matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    
+    return FastJSONResponse(
+        content={
+            "success": True,
+            "message": message,
+            "data": report
+        },
+        headers=headers
+    )
+
+
 @router.get("/inventory")
 async def get_inventory_report(
+    request: Request,
     current_user: dict = Depends(require_admin_or_manager)
 ):
     """Get device inventory report"""
-    report = await report_service.get_inventory_report()
-    
-    return {
-        "success": True,
-        "message": "Inventory report generated successfully",
-        "data": report
-    }
+    return await _report_response(
+        request,
+        "inventory",
+        report_service.get_inventory_report,
+        "Inventory report generated successfully"
+    )
 
 
 @router.get("/distribution-summary")
 async def get_distribution_summary(
+    request: Request,
     current_user: dict = Depends(require_admin_or_manager)
 ):
     """Get distribution summary report"""
-    report = await report_service.get_distribution_summary()
-    
-    return {
-        "success": True,
-        "message": "Distribution summary generated successfully",
-        "data": report
-    }
+    return await _report_response(
+        request,
+        "distribution_summary",
+        report_service.get_distribution_summary,
+        "Distribution summary generated successfully"
+    )
 
 
 @router.get("/defect-summary")
 async def get_defect_summary(
+    request: Request,
     current_user: dict = Depends(require_admin_or_manager)
 ):
     """Get defect summary report"""
-    report = await report_service.get_defect_summary()
-    
-    return {
-        "success": True,
-        "message": "Defect summary generated successfully",
-        "data": report
-    }
+    return await _report_response(
+        request,
+        "defect_summary",
+        report_service.get_defect_summary,
+        "Defect summary generated successfully"
+    )
 
 
 @router.get("/return-summary")
 async def get_return_summary(
+    request: Request,
     current_user: dict = Depends(require_admin_or_manager)
 ):
     """Get return summary report"""
-    report = await report_service.get_return_summary()
-    
-    return {
-        "success": True,
-        "message": "Return summary generated successfully",
-        "data": report
-    }
+    return await _report_response(
+        request,
+        "return_summary",
+        report_service.get_return_summary,
+        "Return summary generated successfully"
+    )
 
 
 @router.get("/user-activity")
 async def get_user_activity_report(
+    request: Request,
     current_user: dict = Depends(require_admin_or_manager)
 ):
     """Get user activity report"""
-    report = await report_service.get_user_activity_report()
-    
-    return {
-        "success": True,
-        "message": "User activity report generated successfully",
-        "data": report
-    }
+    return await _report_response(
+        request,
+        "user_activity",
+        report_service.get_user_activity_report,
+        "User activity report generated successfully"
+    )
 
 
 @router.get("/device-utilization")
 async def get_device_utilization_report(
+    request: Request,
     current_user: dict = Depends(require_admin_or_manager)
 ):
     """Get device utilization report"""
-    report = await report_service.get_device_utilization_report()
-    
-    return {
-        "success": True,
-        "message": "Device utilization report generated successfully",
-        "data": report
-    }
+    return await _report_response(
+        request,
+        "device_utilization",
+        report_service.get_device_utilization_report,
+        "Device utilization report generated successfully"
+    )
 
 
 @router.post("/export")
 async def export_report(
-    export_data: dict,
+    export_request: ExportRequest,
+    current_user: dict = Depends(require_admin_or_manager)
+):
+    """Export a collection as CSV or NDJSON, streamed or as a background job"""
+    if export_request.mode == ExportMode.JOB:
+        try:
+            job = await export_service.create_export_job(export_request, current_user)
+        except ValueError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(e)
+            )
+        
+        return FastJSONResponse(
+            status_code=status.HTTP_202_ACCEPTED,
+            content={
+                "success": True,
+                "message": "Export job queued",
+                "data": {
+                    **job,
+                    "status_url": f"{settings.API_V1_PREFIX}/reports/exports/{job['id']}",
+                    "download_url": f"{settings.API_V1_PREFIX}/reports/exports/{job['id']}/download"
+                }
+            }
+        )
+    
+    try:
+        export_service.build_export_query(export_request)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    
+    filename = export_service.export_filename(export_request)
+    return StreamingResponse(
+        export_service.stream_export(export_request),
+        media_type=export_service.export_media_type(export_request),
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+
+@router.get("/exports/{job_id}")
+async def get_export_job(
+    job_id: str,
     current_user: dict = Depends(require_admin_or_manager)
 ):
-    """Export report (placeholder for actual export functionality)"""
-    report_type = export_data.get("report_type", "inventory")
-    format_type = export_data.get("format", "csv")
+    """Get the status of an export job"""
+    job = await export_service.get_export_job(job_id, current_user)
     
-    # In a real implementation, this would generate and return a file
-    # For now, just return a success message
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Export job not found"
+        )
     
     return {
         "success": True,
-        "message": f"{report_type} report exported as {format_type}",
-        "data": {
-            "report_type": report_type,
-            "format": format_type,
-            "download_url": f"/api/reports/download/{report_type}.{format_type}"
-        }
+        "message": "Export job retrieved successfully",
+        "data": serialize_doc(job)
     }
+
+
+@router.get("/exports/{job_id}/download")
+async def download_export(
+    job_id: str,
+    current_user: dict = Depends(require_admin_or_manager)
+):
+    """Download the file of a completed export job"""
+    job = await export_service.get_export_job(job_id, current_user)
+    
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Export job not found"
+        )
+    
+    if job["status"] != ExportJobStatus.COMPLETED.value:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Export job is {job['status']}"
+        )
+    
+    path = export_service.export_file_path(job)
+    if not os.path.exists(path):
+        raise HTTPException(
+            status_code=status.HTTP_410_GONE,
+            detail="Export file is no longer available"
+        )
+    
+    return FileResponse(path, media_type=job["media_type"], filename=job["filename"])
@@ -2,6 +2,9 @@ from fastapi import APIRouter, HTTPException, status, Depends, Query
 from typing import Optional
 from app.models.return_device import ReturnCreate, ReturnStatusUpdate
 from app.services import return_service
+from app.utils.helpers import parse_fields
+from app.utils.responses import api_response
+from app.utils.transactions import ConflictError
 from app.middleware.auth_middleware import get_current_user, require_admin_or_manager
 
 router = APIRouter()
@@ -14,6 +17,10 @@ async def get_returns(
     status: Optional[str] = None,
     reason: Optional[str] = None,
     search: Optional[str] = None,
+    cursor: bool = False,
+    after: Optional[str] = None,
+    include_total: bool = False,
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return"),
     current_user: dict = Depends(get_current_user)
 ):
     """Get all return requests with pagination and filters"""
@@ -28,15 +35,14 @@ async def get_returns(
         status=status,
         reason=reason,
         requested_by=requested_by,
-        search=search
+        search=search,
+        after=after,
+        cursor=cursor,
+        include_total=include_total,
+        fields=parse_fields(fields)
     )
     
-    return {
-        "success": True,
-        "message": "Return requests retrieved successfully",
-        "data": result["data"],
-        "pagination": result["pagination"]
-    }
+    return api_response(result["data"], "Return requests retrieved successfully", result["pagination"])
 
 
 @router.get("/{return_id}")
@@ -96,7 +102,8 @@ async def update_return_status(
             return_id=return_id,
             status=status_update.status.value,
             user=current_user,
-            notes=status_update.notes
+            notes=status_update.notes,
+            expected_version=status_update.version
         )
         
         if not return_req:
@@ -110,6 +117,11 @@ async def update_return_status(
             "message": "Return status updated successfully",
             "data": return_req
         }
+    except ConflictError as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=str(e)
+        )
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -139,6 +151,11 @@ async def cancel_return(
             "success": True,
             "message": "Return request cancelled successfully"
         }
+    except ConflictError as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=str(e)
+        )
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
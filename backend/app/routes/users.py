@@ -14,6 +14,9 @@ async def get_users(
     role: Optional[str] = None,
     status: Optional[str] = None,
     search: Optional[str] = None,
+    cursor: bool = False,
+    after: Optional[str] = None,
+    include_total: bool = False,
     current_user: dict = Depends(require_admin_or_manager)
 ):
     """Get all users with pagination and filters"""
@@ -22,7 +25,10 @@ async def get_users(
         page_size=page_size,
         role=role,
         status=status,
-        search=search
+        search=search,
+        after=after,
+        cursor=cursor,
+        include_total=include_total
     )
     
     return {
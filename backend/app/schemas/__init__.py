@@ -3,5 +3,6 @@ from app.schemas.responses import (
     StandardResponse, 
     PaginatedResponse, 
     ErrorResponse,
-    Pagination
+    Pagination,
+    CursorPagination
 )
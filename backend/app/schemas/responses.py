@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Optional, Any, List, Generic, TypeVar
+from typing import Optional, Any, List, Generic, TypeVar, Union
 from datetime import datetime
 
 T = TypeVar('T')
@@ -12,6 +12,14 @@ class Pagination(BaseModel):
     total_pages: int
 
 
+class CursorPagination(BaseModel):
+    page_size: int
+    has_more: bool
+    next_cursor: Optional[str] = None
+    total: Optional[int] = None
+    total_is_estimate: bool = False
+
+
 class StandardResponse(BaseModel):
     success: bool = True
     message: str = "Operation successful"
@@ -22,7 +30,7 @@ class PaginatedResponse(BaseModel):
     success: bool = True
     message: str = "Operation successful"
     data: List[Any] = []
-    pagination: Pagination
+    pagination: Union[Pagination, CursorPagination]
 
 
 class ErrorResponse(BaseModel):
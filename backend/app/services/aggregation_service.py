@@ -0,0 +1,96 @@
+import asyncio
+from datetime import datetime
+from typing import Optional, List, Dict, Any
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+from app.database import get_analytics_database
+from app.services.timeseries_service import (
+    bucket_start, bucket_starts, default_start, fill_series, next_bucket, series_facet
+)
+
+
+def fill_counts(keys: List[str], counts: Dict[str, int]) -> Dict[str, int]:
+    """Return counts for a fixed list of keys, zero-filling missing ones"""
+    return {key: counts.get(key, 0) for key in keys}
+
+
+async def collection_breakdowns(
+    collection: str,
+    group_by: Optional[Dict[str, str]] = None,
+    conditions: Optional[Dict[str, Dict[str, Any]]] = None,
+    pipelines: Optional[Dict[str, List[Dict[str, Any]]]] = None,
+    match: Optional[Dict[str, Any]] = None,
+    month_field: Optional[str] = None,
+    months: int = 6,
+    db: Optional[AsyncIOMotorDatabase] = None
+) -> Dict[str, Any]:
+    """
+    Compute every breakdown for a collection in a single $facet pipeline.
+
+    - group_by: output name -> field, returned as {value: count}
+    - conditions: output name -> match filter, returned as a single count
+    - pipelines: output name -> raw sub-pipeline, returned as a list
+    - month_field: when set, adds "by_month" with zero-filled calendar months;
+      it runs as its own pipeline (concurrently) so its date range can use
+      the month_field index, which a filter inside $facet cannot
+    - db: database handle; defaults to the analytics (read-routed) handle
+    """
+    if db is None:
+        db = get_analytics_database()
+
+    facets: Dict[str, List[Dict[str, Any]]] = {"total": [{"$count": "count"}]}
+
+    for name, field in (group_by or {}).items():
+        facets[name] = [{"$group": {"_id": f"${field}", "count": {"$sum": 1}}}]
+
+    for name, condition in (conditions or {}).items():
+        facets[name] = [{"$match": condition}, {"$count": "count"}]
+
+    for name, sub_pipeline in (pipelines or {}).items():
+        facets[name] = sub_pipeline
+
+    pipeline = []
+    if match:
+        pipeline.append({"$match": match})
+    pipeline.append({"$facet": facets})
+    breakdowns = db[collection].aggregate(pipeline).to_list(length=1)
+
+    if month_field:
+        now = datetime.utcnow()
+        start = default_start("month", now, months)
+        end = next_bucket(bucket_start(now, "month"), "month")
+        buckets = bucket_starts(start, end, "month")
+        by_month = db[collection].aggregate(series_facet(month_field, start, end, "month", match)).to_list(length=None)
+        results, month_rows = await asyncio.gather(breakdowns, by_month)
+    else:
+        results = await breakdowns
+    facet_doc = results[0] if results else {}
+
+    def single_count(name: str) -> int:
+        rows = facet_doc.get(name) or []
+        return rows[0]["count"] if rows else 0
+
+    output: Dict[str, Any] = {"total": single_count("total")}
+
+    for name in (group_by or {}):
+        output[name] = {
+            row["_id"]: row["count"]
+            for row in facet_doc.get(name, [])
+            if row["_id"] is not None
+        }
+
+    for name in (conditions or {}):
+        output[name] = single_count(name)
+
+    for name in (pipelines or {}):
+        output[name] = facet_doc.get(name, [])
+
+    if month_field:
+        counts = fill_series(month_rows, buckets)
+        output["by_month"] = [
+            {"month": start.strftime("%B %Y"), "count": count}
+            for start, count in zip(buckets, counts)
+        ]
+
+    return output
@@ -1,11 +1,170 @@
 from datetime import datetime
 from typing import Optional, List, Dict, Any
 from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorClientSession
+from pymongo import UpdateOne
 
+from app.config import settings
 from app.database import get_database
 from app.models.approval import ApprovalStatus, ApprovalType
-from app.services import notification_service
-from app.utils.helpers import serialize_doc, serialize_docs, get_pagination
+from app.models.defect import DEFECT_TRANSITIONS
+from app.models.distribution import DISTRIBUTION_TRANSITIONS
+from app.models.return_device import RETURN_TRANSITIONS
+from app.services import device_service, notification_service, report_cache_service, stats_counter_service
+from app.services.stats_counter_service import COUNTED_DIMENSIONS
+from app.utils.concurrency import gather_bounded
+from app.utils.helpers import serialize_doc, serialize_docs, paginate, to_object_id
+from app.utils.transactions import ConflictError, UnitOfWork, next_version, run_in_transaction, transition_status, version_filter
+
+# approval_type -> (entity collection, fields shown in the approvals list)
+ENTITY_DETAIL_FIELDS: Dict[str, tuple] = {
+    "distribution": ("distributions", ["distribution_id", "device_count", "from_user_name", "to_user_name"]),
+    "return": ("returns", ["return_id", "device_serial", "reason", "requested_by_name"]),
+    "defect": ("defects", ["report_id", "device_serial", "defect_type", "severity"])
+}
+
+# Schema version of approval.entity_snapshot; bump it when the snapshot fields
+# change so backfill_entity_snapshots rebuilds older snapshots
+ENTITY_SNAPSHOT_VERSION = 1
+
+
+def build_entity_snapshot(approval_type: str, entity: Dict[str, Any]) -> Dict[str, Any]:
+    """Compact copy of an entity's list details and status, stored on its approvals"""
+    fields = ENTITY_DETAIL_FIELDS[approval_type][1]
+    return {
+        "version": ENTITY_SNAPSHOT_VERSION,
+        **{field: entity.get(field) for field in fields},
+        "status": entity.get("status")
+    }
+
+
+def snapshot_details(approval: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """entity_details from an approval's snapshot, or None if it has no current snapshot"""
+    snapshot = approval.get("entity_snapshot")
+    if not snapshot or snapshot.get("version") != ENTITY_SNAPSHOT_VERSION:
+        return None
+    fields = ENTITY_DETAIL_FIELDS[approval["approval_type"]][1]
+    return {field: snapshot.get(field) for field in fields}
+
+
+async def sync_entity_snapshot(
+    approval_type: str,
+    entity: Dict[str, Any],
+    uow: Optional[UnitOfWork] = None
+) -> None:
+    """Refresh the snapshot on an entity's approvals after the entity changed"""
+    db = get_database()
+    
+    await db.approvals.update_many(
+        {"entity_id": str(entity["_id"]), "approval_type": approval_type},
+        {"$set": {"entity_snapshot": build_entity_snapshot(approval_type, entity)}},
+        session=uow.session if uow else None
+    )
+
+
+async def backfill_entity_snapshots(batch_size: int = 1000) -> int:
+    """Write entity snapshots on approvals created before they existed (or with an older version)"""
+    db = get_database()
+    updated = 0
+    
+    for approval_type in ENTITY_DETAIL_FIELDS:
+        cursor = db.approvals.find(
+            {"approval_type": approval_type, "entity_snapshot.version": {"$ne": ENTITY_SNAPSHOT_VERSION}},
+            {"entity_id": 1}
+        ).batch_size(batch_size)
+        
+        batch = []
+        async for approval in cursor:
+            batch.append(approval)
+            if len(batch) >= batch_size:
+                updated += await _write_snapshots(approval_type, batch)
+                batch = []
+        if batch:
+            updated += await _write_snapshots(approval_type, batch)
+    
+    if updated:
+        print(f"✅ Entity snapshots backfilled for {updated} approvals")
+    return updated
+
+
+async def _write_snapshots(approval_type: str, approvals: List[Dict[str, Any]]) -> int:
+    db = get_database()
+    collection, fields = ENTITY_DETAIL_FIELDS[approval_type]
+    
+    entity_ids = [oid for oid in (to_object_id(a.get("entity_id")) for a in approvals) if oid is not None]
+    entities = await db[collection].find(
+        {"_id": {"$in": entity_ids}},
+        {field: 1 for field in fields + ["status"]}
+    ).to_list(length=None)
+    by_id = {str(entity["_id"]): entity for entity in entities}
+    
+    operations = [
+        UpdateOne(
+            {"_id": approval["_id"]},
+            {"$set": {"entity_snapshot": build_entity_snapshot(approval_type, by_id[approval["entity_id"]])}}
+        )
+        for approval in approvals if approval.get("entity_id") in by_id
+    ]
+    if operations:
+        await db.approvals.bulk_write(operations, ordered=False)
+    return len(operations)
+
+
+async def fetch_entity_details(approvals: List[Dict[str, Any]]) -> Dict[tuple, Dict[str, Any]]:
+    """
+    Fetch the list details of each approval's entity.
+
+    Entity ids are grouped by approval type and fetched with one projected
+    $in query per type, run concurrently, instead of one find_one per row.
+    Returns {(approval_type, entity_id): entity_details}.
+    """
+    db = get_database()
+    
+    ids_by_type: Dict[str, set] = {}
+    for approval in approvals:
+        if approval.get("approval_type") in ENTITY_DETAIL_FIELDS:
+            entity_oid = to_object_id(approval.get("entity_id"))
+            if entity_oid is not None:
+                ids_by_type.setdefault(approval["approval_type"], set()).add(entity_oid)
+    
+    calls = {}
+    for approval_type, entity_ids in ids_by_type.items():
+        collection, fields = ENTITY_DETAIL_FIELDS[approval_type]
+        calls[approval_type] = db[collection].find(
+            {"_id": {"$in": list(entity_ids)}},
+            {field: 1 for field in fields}
+        ).to_list(length=None)
+    results = await gather_bounded(calls)
+    
+    details = {}
+    for approval_type, entities in results.items():
+        fields = ENTITY_DETAIL_FIELDS[approval_type][1]
+        for entity in entities:
+            details[(approval_type, str(entity["_id"]))] = {field: entity.get(field) for field in fields}
+    return details
+
+
+async def enrich_approvals(approvals: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Serialize approvals with the entity_details of their entity.
+
+    Details come from each approval's entity_snapshot; only approvals without
+    a current snapshot (not yet backfilled) are looked up in the entity
+    collections.
+    """
+    snapshots = [snapshot_details(approval) for approval in approvals]
+    stale = [approval for approval, details in zip(approvals, snapshots) if details is None]
+    details = await fetch_entity_details(stale) if stale else {}
+    
+    enriched_approvals = []
+    for approval, entity_details in zip(approvals, snapshots):
+        approval_data = serialize_doc(approval)
+        if entity_details is None:
+            entity_details = details.get((approval.get("approval_type"), approval.get("entity_id")))
+        if entity_details is not None:
+            approval_data["entity_details"] = entity_details
+        enriched_approvals.append(approval_data)
+    return enriched_approvals
 
 
 async def get_approvals(
@@ -13,7 +172,10 @@ async def get_approvals(
     page_size: int = 20,
     status: Optional[str] = None,
     approval_type: Optional[str] = None,
-    search: Optional[str] = None
+    search: Optional[str] = None,
+    after: Optional[str] = None,
+    cursor: bool = False,
+    include_total: bool = False
 ) -> Dict[str, Any]:
     """Get all pending approvals with pagination"""
     db = get_database()
@@ -31,53 +193,15 @@ async def get_approvals(
             {"requested_by_name": {"$regex": search, "$options": "i"}}
         ]
     
-    # Get total count
-    total = await db.approvals.count_documents(query)
-    
     # Get paginated results
-    skip = (page - 1) * page_size
-    cursor = db.approvals.find(query).skip(skip).limit(page_size).sort("created_at", -1)
-    approvals = await cursor.to_list(length=page_size)
-    
-    # Enrich with entity details
-    enriched_approvals = []
-    for approval in approvals:
-        approval_data = serialize_doc(approval)
-        
-        # Get entity details based on type
-        if approval["approval_type"] == "distribution":
-            entity = await db.distributions.find_one({"_id": ObjectId(approval["entity_id"])})
-            if entity:
-                approval_data["entity_details"] = {
-                    "distribution_id": entity.get("distribution_id"),
-                    "device_count": entity.get("device_count"),
-                    "from_user_name": entity.get("from_user_name"),
-                    "to_user_name": entity.get("to_user_name")
-                }
-        elif approval["approval_type"] == "return":
-            entity = await db.returns.find_one({"_id": ObjectId(approval["entity_id"])})
-            if entity:
-                approval_data["entity_details"] = {
-                    "return_id": entity.get("return_id"),
-                    "device_serial": entity.get("device_serial"),
-                    "reason": entity.get("reason"),
-                    "requested_by_name": entity.get("requested_by_name")
-                }
-        elif approval["approval_type"] == "defect":
-            entity = await db.defects.find_one({"_id": ObjectId(approval["entity_id"])})
-            if entity:
-                approval_data["entity_details"] = {
-                    "report_id": entity.get("report_id"),
-                    "device_serial": entity.get("device_serial"),
-                    "defect_type": entity.get("defect_type"),
-                    "severity": entity.get("severity")
-                }
-        
-        enriched_approvals.append(approval_data)
+    approvals, pagination = await paginate(
+        db.approvals, query, page, page_size,
+        after=after, cursor=cursor, include_total=include_total
+    )
     
     return {
-        "data": enriched_approvals,
-        "pagination": get_pagination(page, page_size, total)
+        "data": await enrich_approvals(approvals),
+        "pagination": pagination
     }
 
 
@@ -111,86 +235,146 @@ async def get_approval_by_id(approval_id: str) -> Optional[Dict[str, Any]]:
         return None
 
 
-async def approve_request(
+# approval_type -> collection of the entity an approval decides on
+ENTITY_COLLECTIONS = {
+    "distribution": "distributions",
+    "return": "returns",
+    "defect": "defects"
+}
+
+# approval_type -> status transitions of its entity
+ENTITY_TRANSITIONS = {
+    "distribution": DISTRIBUTION_TRANSITIONS,
+    "return": RETURN_TRANSITIONS,
+    "defect": DEFECT_TRANSITIONS
+}
+
+
+def _entity_changes(
+    approval_type: str,
+    status: str,
+    approver: Dict[str, Any],
+    now: datetime,
+    rejection_reason: Optional[str] = None
+) -> Dict[str, Any]:
+    """Fields set on an entity when its approval is approved or rejected"""
+    changes = {"status": status, "updated_at": now}
+    if status == ApprovalStatus.APPROVED.value and approval_type in ("distribution", "return"):
+        changes.update(
+            approval_date=now,
+            approved_by=str(approver["_id"]),
+            approved_by_name=approver["name"]
+        )
+    elif status == ApprovalStatus.REJECTED.value and approval_type == "distribution":
+        changes["notes"] = rejection_reason
+    return changes
+
+
+async def _decide_request(
     approval_id: str,
     approver: Dict[str, Any],
-    notes: Optional[str] = None
+    status: str,
+    notes: Optional[str] = None,
+    rejection_reason: Optional[str] = None
 ) -> Optional[Dict[str, Any]]:
-    """Approve a pending request"""
+    """
+    Approve or reject a pending request and its entity as one transition.
+
+    The approval is claimed with one conditional update on status=pending,
+    so when two approvers act at once exactly one wins and the other gets
+    ConflictError; the entity is likewise only moved from a prior status
+    its transitions allow, and if it cannot move the claim is undone and
+    ConflictError raised. The approval and entity writes (and released
+    reservations) run in one transaction when transactions are enabled;
+    counters and the requester notification are applied once, after it
+    commits.
+    """
     db = get_database()
     
-    approval = await db.approvals.find_one({"_id": ObjectId(approval_id)})
-    if not approval:
-        return None
-    
-    if approval["status"] != ApprovalStatus.PENDING.value:
-        raise ValueError("This request has already been processed")
-    
-    now = datetime.utcnow()
-    update_data = {
-        "status": ApprovalStatus.APPROVED.value,
-        "approved_by": str(approver["_id"]),
-        "approved_by_name": approver["name"],
-        "approval_date": now,
-        "notes": notes,
-        "updated_at": now
-    }
-    
-    await db.approvals.update_one(
-        {"_id": ObjectId(approval_id)},
-        {"$set": update_data}
-    )
-    
-    # Update the related entity
-    if approval["approval_type"] == "distribution":
-        await db.distributions.update_one(
-            {"_id": ObjectId(approval["entity_id"])},
-            {
-                "$set": {
-                    "status": "approved",
-                    "approval_date": now,
-                    "approved_by": str(approver["_id"]),
-                    "approved_by_name": approver["name"],
-                    "updated_at": now
-                }
-            }
-        )
-    elif approval["approval_type"] == "return":
-        await db.returns.update_one(
-            {"_id": ObjectId(approval["entity_id"])},
-            {
-                "$set": {
-                    "status": "approved",
-                    "approval_date": now,
-                    "approved_by": str(approver["_id"]),
-                    "approved_by_name": approver["name"],
-                    "updated_at": now
-                }
-            }
-        )
-    elif approval["approval_type"] == "defect":
-        await db.defects.update_one(
-            {"_id": ObjectId(approval["entity_id"])},
-            {
-                "$set": {
-                    "status": "approved",
-                    "updated_at": now
-                }
-            }
+    async def transition(uow: UnitOfWork) -> Optional[Dict[str, Any]]:
+        session = uow.session
+        now = datetime.utcnow()
+        update_data = {
+            "status": status,
+            "approved_by": str(approver["_id"]),
+            "approved_by_name": approver["name"],
+            "approval_date": now,
+            "notes": notes,
+            "updated_at": now
+        }
+        if status == ApprovalStatus.REJECTED.value:
+            update_data["rejection_reason"] = rejection_reason
+        
+        # Snapshots without a version are rebuilt by backfill_entity_snapshots
+        claim = {**update_data, "entity_snapshot.status": status}
+        approval = await transition_status(
+            db.approvals,
+            approval_id,
+            (ApprovalStatus.PENDING.value,),
+            claim,
+            conflict_message="This request has already been processed",
+            session=session
         )
+        if not approval:
+            return None
+        uow.after_commit(stats_counter_service.record_update, "approvals", approval, update_data)
+        
+        # Update the related entity
+        collection = ENTITY_COLLECTIONS.get(approval["approval_type"])
+        if collection:
+            try:
+                entity = await transition_status(
+                    db[collection],
+                    approval["entity_id"],
+                    ENTITY_TRANSITIONS[approval["approval_type"]][status],
+                    _entity_changes(approval["approval_type"], status, approver, now, rejection_reason),
+                    session=session
+                )
+            except ConflictError:
+                # A transaction would roll the claim back; without one, undo it
+                if session is None:
+                    await _unclaim([approval], claim)
+                raise
+            uow.after_commit(stats_counter_service.record_update, collection, entity, {"status": status})
+            uow.after_commit(report_cache_service.invalidate, collection)
+            if approval["approval_type"] == "distribution" and status == ApprovalStatus.REJECTED.value:
+                await device_service.release_reservations([approval["entity_id"]], uow=uow)
+        
+        # Notify requester
+        if status == ApprovalStatus.APPROVED.value:
+            uow.after_commit(
+                notification_service.create_notification,
+                user_id=approval["requested_by"],
+                title="Request Approved",
+                message=f"Your {approval['approval_type']} request has been approved by {approver['name']}",
+                notification_type="success",
+                category="approval"
+            )
+        else:
+            uow.after_commit(
+                notification_service.create_notification,
+                user_id=approval["requested_by"],
+                title="Request Rejected",
+                message=f"Your {approval['approval_type']} request has been rejected by {approver['name']}. Reason: {rejection_reason or 'No reason provided'}",
+                notification_type="error",
+                category="approval"
+            )
+        return approval
     
-    # Notify requester
-    await notification_service.create_notification(
-        user_id=approval["requested_by"],
-        title="Request Approved",
-        message=f"Your {approval['approval_type']} request has been approved by {approver['name']}",
-        notification_type="success",
-        category="approval"
-    )
-    
+    if await run_in_transaction(transition) is None:
+        return None
     return await get_approval_by_id(approval_id)
 
 
+async def approve_request(
+    approval_id: str,
+    approver: Dict[str, Any],
+    notes: Optional[str] = None
+) -> Optional[Dict[str, Any]]:
+    """Approve a pending request"""
+    return await _decide_request(approval_id, approver, ApprovalStatus.APPROVED.value, notes=notes)
+
+
 async def reject_request(
     approval_id: str,
     approver: Dict[str, Any],
@@ -198,74 +382,263 @@ async def reject_request(
     notes: Optional[str] = None
 ) -> Optional[Dict[str, Any]]:
     """Reject a pending request"""
+    return await _decide_request(
+        approval_id, approver, ApprovalStatus.REJECTED.value,
+        notes=notes, rejection_reason=rejection_reason
+    )
+
+
+async def _unclaim(
+    approvals: List[Dict[str, Any]],
+    claim: Dict[str, Any],
+    session: Optional[AsyncIOMotorClientSession] = None
+) -> None:
+    """
+    Put claimed approvals back to pending after their entities could not move.
+
+    Each approval is given the `claim` fields it had before (as read before
+    the claim) and only if nothing changed it since, so a later decision is
+    never undone.
+    """
     db = get_database()
     
-    approval = await db.approvals.find_one({"_id": ObjectId(approval_id)})
-    if not approval:
-        return None
+    def previous(approval: Dict[str, Any], field: str) -> Any:
+        value: Any = approval
+        for part in field.split("."):
+            value = value.get(part) if isinstance(value, dict) else None
+        return value
+    
+    await db.approvals.bulk_write(
+        [
+            UpdateOne(
+                {"_id": approval["_id"], **version_filter(next_version(approval))},
+                {
+                    "$set": {field: previous(approval, field) for field in claim},
+                    "$unset": {"batch_id": ""},
+                    "$inc": {"version": 1}
+                }
+            )
+            for approval in approvals
+        ],
+        ordered=False,
+        session=session
+    )
+
+
+async def process_batch(
+    approval_ids: List[str],
+    action: str,
+    approver: Dict[str, Any],
+    notes: Optional[str] = None,
+    rejection_reason: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Approve or reject many pending approvals at once.
+
+    Entities are checked before any approval is claimed; approvals whose
+    entity can no longer move are reported as conflict and left pending.
+    The rest are claimed with one update_many guarded on status=pending and
+    tagged with a batch_id, so concurrent batches or single approvals never
+    process the same approval twice. Entity updates are grouped into one
+    bulk_write per collection, guarded on the status and version read; an
+    approval whose entity changed in between is put back to pending and
+    reported as conflict. The writes run in one transaction when
+    transactions are enabled; counters, released reservations and
+    notifications cover only the entities that moved.
+    Returns the outcome of every requested id: approved/rejected, conflict,
+    already_processed, not_found or invalid_id.
+    """
+    db = get_database()
     
-    if approval["status"] != ApprovalStatus.PENDING.value:
-        raise ValueError("This request has already been processed")
+    if len(approval_ids) > settings.APPROVAL_BATCH_MAX_SIZE:
+        raise ValueError(f"At most {settings.APPROVAL_BATCH_MAX_SIZE} approvals can be processed at once")
     
-    now = datetime.utcnow()
-    update_data = {
-        "status": ApprovalStatus.REJECTED.value,
-        "approved_by": str(approver["_id"]),
-        "approved_by_name": approver["name"],
-        "approval_date": now,
-        "rejection_reason": rejection_reason,
-        "notes": notes,
-        "updated_at": now
-    }
+    status = ApprovalStatus.APPROVED.value if action == "approve" else ApprovalStatus.REJECTED.value
+    requested = list(dict.fromkeys(approval_ids))
+    oids = []
+    invalid = {}
+    for approval_id in requested:
+        oid = to_object_id(approval_id)
+        if oid is None:
+            invalid[approval_id] = "invalid_id"
+        else:
+            oids.append(oid)
     
-    await db.approvals.update_one(
-        {"_id": ObjectId(approval_id)},
-        {"$set": update_data}
-    )
+    batch_id = str(ObjectId())
     
-    # Update the related entity
-    if approval["approval_type"] == "distribution":
-        await db.distributions.update_one(
-            {"_id": ObjectId(approval["entity_id"])},
-            {
-                "$set": {
-                    "status": "rejected",
-                    "notes": rejection_reason,
-                    "updated_at": now
-                }
-            }
-        )
-    elif approval["approval_type"] == "return":
-        await db.returns.update_one(
-            {"_id": ObjectId(approval["entity_id"])},
-            {
-                "$set": {
-                    "status": "rejected",
-                    "updated_at": now
-                }
-            }
+    async def decide(uow: UnitOfWork) -> Dict[str, str]:
+        session = uow.session
+        now = datetime.utcnow()
+        outcomes = dict(invalid)
+        if not oids:
+            return outcomes
+        
+        update_data = {
+            "status": status,
+            "approved_by": str(approver["_id"]),
+            "approved_by_name": approver["name"],
+            "approval_date": now,
+            "notes": notes,
+            "updated_at": now
+        }
+        if status == ApprovalStatus.REJECTED.value:
+            update_data["rejection_reason"] = rejection_reason
+        # Snapshots without a version are rebuilt by backfill_entity_snapshots
+        claim = {**update_data, "entity_snapshot.status": status}
+        
+        approvals = await db.approvals.find({"_id": {"$in": oids}}, session=session).to_list(length=None)
+        pending = []
+        for approval in approvals:
+            if approval.get("status") == ApprovalStatus.PENDING.value:
+                pending.append(approval)
+            else:
+                outcomes[str(approval["_id"])] = "already_processed"
+        
+        # Check every entity before claiming its approval
+        by_type: Dict[str, List[Dict[str, Any]]] = {}
+        for approval in pending:
+            if to_object_id(approval.get("entity_id")) is not None and approval.get("approval_type") in ENTITY_COLLECTIONS:
+                by_type.setdefault(approval["approval_type"], []).append(approval)
+        
+        entities: Dict[str, Dict[str, Any]] = {}
+        for approval_type, group in by_type.items():
+            collection = ENTITY_COLLECTIONS[approval_type]
+            projection = {field: 1 for fields in COUNTED_DIMENSIONS[collection].values() for field in fields}
+            found = await db[collection].find(
+                {"_id": {"$in": [ObjectId(approval["entity_id"]) for approval in group]}},
+                {**projection, "version": 1},
+                session=session
+            ).to_list(length=None)
+            entities.update((str(entity["_id"]), entity) for entity in found)
+        
+        eligible = []
+        for approval in pending:
+            entity = entities.get(approval.get("entity_id"))
+            allowed_from = ENTITY_TRANSITIONS.get(approval.get("approval_type"), {}).get(status, ())
+            if entity is not None and entity.get("status") not in allowed_from:
+                outcomes[str(approval["_id"])] = "conflict"
+            else:
+                eligible.append(approval)
+        if not eligible:
+            return outcomes
+        
+        await db.approvals.update_many(
+            {"_id": {"$in": [approval["_id"] for approval in eligible]}, "status": ApprovalStatus.PENDING.value},
+            {"$set": {**claim, "batch_id": batch_id}, "$inc": {"version": 1}},
+            session=session
         )
-    elif approval["approval_type"] == "defect":
-        await db.defects.update_one(
-            {"_id": ObjectId(approval["entity_id"])},
-            {
-                "$set": {
-                    "status": "rejected",
-                    "updated_at": now
+        claimed_ids = {
+            approval["_id"] async for approval in db.approvals.find(
+                {"_id": {"$in": [approval["_id"] for approval in eligible]}, "batch_id": batch_id},
+                {"_id": 1},
+                session=session
+            )
+        }
+        claimed = []
+        for approval in eligible:
+            if approval["_id"] in claimed_ids:
+                claimed.append(approval)
+            else:
+                outcomes[str(approval["_id"])] = "already_processed"
+        
+        # Move the entities; the status and version in each filter keep a
+        # concurrent change made after the check from being overwritten
+        lost = []
+        for approval_type, group in by_type.items():
+            collection = ENTITY_COLLECTIONS[approval_type]
+            targets = [
+                (approval, entities[approval["entity_id"]]) for approval in group
+                if approval["_id"] in claimed_ids and approval["entity_id"] in entities
+            ]
+            if not targets:
+                continue
+            
+            result = await db[collection].bulk_write(
+                [
+                    UpdateOne(
+                        {"_id": entity["_id"], "status": entity["status"], **version_filter(entity.get("version", 0))},
+                        {
+                            "$set": _entity_changes(approval_type, status, approver, now, rejection_reason),
+                            "$inc": {"version": 1}
+                        }
+                    )
+                    for _, entity in targets
+                ],
+                ordered=False,
+                session=session
+            )
+            if result.modified_count < len(targets):
+                # Some entities changed since the check: keep only the ones this batch moved
+                expected = {entity["_id"]: entity.get("version", 0) + 1 for _, entity in targets}
+                moved_ids = {
+                    entity["_id"] async for entity in db[collection].find(
+                        {"_id": {"$in": list(expected)}},
+                        {"status": 1, "version": 1},
+                        session=session
+                    )
+                    if entity.get("status") == status and entity.get("version") == expected[entity["_id"]]
                 }
-            }
-        )
+                lost.extend(approval for approval, entity in targets if entity["_id"] not in moved_ids)
+                targets = [(approval, entity) for approval, entity in targets if entity["_id"] in moved_ids]
+                if not targets:
+                    continue
+            
+            moved = [entity for _, entity in targets]
+            uow.after_commit(
+                stats_counter_service.record_updates, collection, [(entity, {"status": status}) for entity in moved]
+            )
+            uow.after_commit(report_cache_service.invalidate, collection)
+            if approval_type == "distribution" and status == ApprovalStatus.REJECTED.value:
+                await device_service.release_reservations([str(entity["_id"]) for entity in moved], uow=uow)
+        
+        if lost:
+            await _unclaim(lost, claim, session=session)
+            lost_ids = {approval["_id"] for approval in lost}
+            for approval in lost:
+                outcomes[str(approval["_id"])] = "conflict"
+            claimed = [approval for approval in claimed if approval["_id"] not in lost_ids]
+        
+        for approval in claimed:
+            outcomes[str(approval["_id"])] = status
+        if not claimed:
+            return outcomes
+        
+        uow.after_commit(stats_counter_service.record_updates, "approvals", [
+            (approval, {"status": status}) for approval in claimed
+        ])
+        
+        # Notify requesters with a single write
+        if status == ApprovalStatus.APPROVED.value:
+            title, notification_type = "Request Approved", "success"
+        else:
+            title, notification_type = "Request Rejected", "error"
+        reason = f". Reason: {rejection_reason or 'No reason provided'}" if status == ApprovalStatus.REJECTED.value else ""
+        uow.after_commit(notification_service.insert_notifications, [
+            notification_service.build_notification(
+                user_id=approval["requested_by"],
+                title=title,
+                message=f"Your {approval['approval_type']} request has been {status} by {approver['name']}{reason}",
+                notification_type=notification_type,
+                category="approval",
+                now=now
+            )
+            for approval in claimed if approval.get("requested_by")
+        ])
+        return outcomes
     
-    # Notify requester
-    await notification_service.create_notification(
-        user_id=approval["requested_by"],
-        title="Request Rejected",
-        message=f"Your {approval['approval_type']} request has been rejected by {approver['name']}. Reason: {rejection_reason or 'No reason provided'}",
-        notification_type="error",
-        category="approval"
-    )
+    outcomes = await run_in_transaction(decide)
+    results = [{"id": approval_id, "outcome": outcomes.get(approval_id, "not_found")} for approval_id in requested]
+    summary: Dict[str, int] = {}
+    for result in results:
+        summary[result["outcome"]] = summary.get(result["outcome"], 0) + 1
     
-    return await get_approval_by_id(approval_id)
+    return {
+        "batch_id": batch_id,
+        "action": action,
+        "status": status,
+        "results": results,
+        "summary": summary
+    }
 
 
 async def get_approval_stats() -> Dict[str, int]:
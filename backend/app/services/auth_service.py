@@ -1,12 +1,27 @@
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Dict, Optional
 from bson import ObjectId
 
 from app.database import get_database
 from app.models.user import UserInDB, UserRole
 from app.models.auth import TokenData
-from app.utils.security import verify_password, get_password_hash, create_access_token, decode_token
+from app.utils.security import verify_password, get_password_hash, create_access_token, create_stream_token, decode_token
 from app.config import settings
+from app.services import report_cache_service
+from app.utils.cache import TTLCache
+
+# Authenticated users by id, so steady-state requests skip the users lookup
+user_cache = TTLCache(settings.USER_CACHE_SIZE, settings.USER_CACHE_TTL_SECONDS)
+# Per-user invalidation count; a lookup only fills the cache if no
+# invalidation happened while it was reading the user
+_user_generations: Dict[str, int] = {}
+
+
+def invalidate_cached_user(user_id: str) -> None:
+    """Drop a user from the auth cache after it changed"""
+    user_id = str(user_id)
+    _user_generations[user_id] = _user_generations.get(user_id, 0) + 1
+    user_cache.invalidate(user_id)
 
 
 async def authenticate_user(email: str, password: str) -> Optional[dict]:
@@ -25,6 +40,8 @@ async def authenticate_user(email: str, password: str) -> Optional[dict]:
         {"_id": user["_id"]},
         {"$set": {"last_login": datetime.utcnow()}}
     )
+    invalidate_cached_user(user["_id"])
+    await report_cache_service.invalidate("users")
     
     return user
 
@@ -56,24 +73,43 @@ async def create_user_token(user: dict) -> dict:
     }
 
 
-async def get_current_user_from_token(token: str) -> Optional[dict]:
-    """Get current user from JWT token"""
+def create_user_stream_token(user: dict) -> dict:
+    """Create a short-lived token that only opens the notification stream"""
+    stream_token = create_stream_token({"sub": str(user["id"])})
+    
+    return {
+        "token": stream_token,
+        "expires_in": settings.STREAM_TOKEN_EXPIRE_SECONDS
+    }
+
+
+async def get_current_user_from_token(token: str, token_type: str = "access") -> Optional[dict]:
+    """Get current user from a JWT token of the given type"""
     token_data = decode_token(token)
     
     if token_data is None or token_data.user_id is None:
         return None
     
+    if token_data.token_type != token_type:
+        return None
+    
+    cached = user_cache.get(token_data.user_id)
+    if cached is not None:
+        return dict(cached)
+    
+    generation = _user_generations.get(token_data.user_id, 0)
     db = get_database()
-    user = await db.users.find_one({"_id": ObjectId(token_data.user_id)})
+    user = await db.users.find_one({"_id": ObjectId(token_data.user_id)}, {"password_hash": 0})
     
     if user is None:
         return None
     
-    # Don't return password hash
     user["id"] = str(user["_id"])
-    del user["password_hash"]
+    if _user_generations.get(token_data.user_id, 0) == generation:
+        # Otherwise the user changed during the read and this copy may be stale
+        user_cache.set(token_data.user_id, user)
     
-    return user
+    return dict(user)
 
 
 async def change_user_password(user_id: str, current_password: str, new_password: str) -> bool:
@@ -99,4 +135,6 @@ async def change_user_password(user_id: str, current_password: str, new_password
         }
     )
     
+    invalidate_cached_user(user_id)
+    
     return result.modified_count > 0
@@ -1,82 +1,151 @@
 from datetime import datetime
 from typing import Dict, Any, Optional
 
-from app.database import get_database
-from app.services import device_service, distribution_service, defect_service, return_service, user_service, approval_service, operator_service
-from app.utils.helpers import serialize_docs
+from app.config import settings
+from app.database import get_analytics_database
+from app.models.user import UserRole
+from app.services import operator_service, stats_counter_service, timeseries_service
+from app.services.stats_counter_service import get_count
+from app.utils.concurrency import gather_bounded
+
+
+def _stats_from_counters(counters: Dict[str, Any]) -> Dict[str, Any]:
+    """Build admin/manager dashboard stats from the materialized counters"""
+    def count(path: str) -> int:
+        return get_count(counters, path)
+    
+    return {
+        "devices": {
+            "total": count("devices.total"),
+            "available": count("devices.status.available"),
+            "distributed": count("devices.status.distributed"),
+            "in_use": count("devices.status.in_use"),
+            "defective": count("devices.status.defective"),
+            "returned": count("devices.status.returned")
+        },
+        "distributions": {
+            "total": count("distributions.total"),
+            "pending": count("distributions.status.pending"),
+            "approved": count("distributions.status.approved"),
+            "delivered": count("distributions.status.delivered"),
+            "rejected": count("distributions.status.rejected")
+        },
+        "defects": {
+            "total": count("defects.total"),
+            "by_status": {
+                "reported": count("defects.status.reported"),
+                "under_review": count("defects.status.under_review"),
+                "resolved": count("defects.status.resolved")
+            },
+            "by_severity": {
+                "critical": count("defects.severity.critical"),
+                "high": count("defects.severity.high"),
+                "medium": count("defects.severity.medium"),
+                "low": count("defects.severity.low")
+            }
+        },
+        "returns": {
+            "total": count("returns.total"),
+            "by_status": {
+                "pending": count("returns.status.pending"),
+                "approved": count("returns.status.approved"),
+                "received": count("returns.status.received"),
+                "rejected": count("returns.status.rejected")
+            },
+            "by_reason": {
+                "defective": count("returns.reason.defective"),
+                "unused": count("returns.reason.unused"),
+                "end_of_contract": count("returns.reason.end_of_contract")
+            }
+        },
+        "users": {
+            "total": count("users.total"),
+            "active": count("users.status.active"),
+            "by_role": {role.value: count(f"users.role.{role.value}") for role in UserRole}
+        },
+        "approvals": {
+            "total_pending": count("approvals.status.pending"),
+            "approved": count("approvals.status.approved"),
+            "rejected": count("approvals.status.rejected"),
+            "by_type": {
+                "distributions": count("approvals.type_status.distribution.pending"),
+                "returns": count("approvals.type_status.return.pending"),
+                "defects": count("approvals.type_status.defect.pending")
+            }
+        }
+    }
+
+
+async def get_holder_device_counts(holder_id: str) -> Dict[str, int]:
+    """Count a holder's devices, total and available, on the (holder, status) index"""
+    db = get_analytics_database()
+    
+    rows = await db.devices.aggregate([
+        {"$match": {"current_holder_id": holder_id}},
+        {"$group": {"_id": "$status", "count": {"$sum": 1}}}
+    ]).to_list(length=None)
+    counts = {row["_id"]: row["count"] for row in rows}
+    return {"total": sum(counts.values()), "available": counts.get("available", 0)}
 
 
 async def get_dashboard_stats(user: Dict[str, Any]) -> Dict[str, Any]:
     """Get dashboard statistics based on user role"""
-    db = get_database()
+    db = get_analytics_database()
     role = user.get("role")
     user_id = str(user.get("_id"))
     
     stats = {}
     
     if role in ["admin", "manager"]:
-        # Full stats for admin/manager
-        device_stats = await device_service.get_device_stats()
-        dist_stats = await distribution_service.get_distribution_stats()
-        defect_stats = await defect_service.get_defect_stats()
-        return_stats = await return_service.get_return_stats()
-        user_stats = await user_service.get_user_stats()
-        approval_stats = await approval_service.get_approval_stats()
-        
-        stats = {
-            "devices": device_stats,
-            "distributions": dist_stats,
-            "defects": defect_stats,
-            "returns": return_stats,
-            "users": user_stats,
-            "approvals": approval_stats
-        }
+        # Full stats for admin/manager, read from the materialized counters
+        counters = await stats_counter_service.get_counters()
+        stats = _stats_from_counters(counters)
     
     elif role == "distributor":
-        # Stats for distributor
-        # Devices they have
-        my_devices = await db.devices.count_documents({"current_holder_id": user_id})
-        available_devices = await db.devices.count_documents({"current_holder_id": user_id, "status": "available"})
-        
-        # Distributions
-        sent = await db.distributions.count_documents({"from_user_id": user_id})
-        received = await db.distributions.count_documents({"to_user_id": user_id})
-        pending = await db.distributions.count_documents({"from_user_id": user_id, "status": "pending"})
+        # Stats for distributor: device and distribution counts run concurrently
+        results = await gather_bounded({
+            "devices": get_holder_device_counts(user_id),
+            "sent": db.distributions.count_documents({"from_user_id": user_id}),
+            "received": db.distributions.count_documents({"to_user_id": user_id}),
+            "pending": db.distributions.count_documents({"from_user_id": user_id, "status": "pending"})
+        }, timeout=settings.DASHBOARD_QUERY_TIMEOUT_SECONDS)
         
         stats = {
-            "my_devices": my_devices,
-            "available_devices": available_devices,
-            "distributions_sent": sent,
-            "distributions_received": received,
-            "pending_distributions": pending
+            "my_devices": results["devices"]["total"],
+            "available_devices": results["devices"]["available"],
+            "distributions_sent": results["sent"],
+            "distributions_received": results["received"],
+            "pending_distributions": results["pending"]
         }
     
     elif role == "sub_distributor":
         # Stats for sub-distributor
-        my_devices = await db.devices.count_documents({"current_holder_id": user_id})
-        operator_stats = await operator_service.get_operator_stats(user_id)
-        
-        # Distributions
-        sent = await db.distributions.count_documents({"from_user_id": user_id})
-        received = await db.distributions.count_documents({"to_user_id": user_id})
+        results = await gather_bounded({
+            "devices": get_holder_device_counts(user_id),
+            "operators": operator_service.get_operator_stats(user_id),
+            "sent": db.distributions.count_documents({"from_user_id": user_id}),
+            "received": db.distributions.count_documents({"to_user_id": user_id})
+        }, timeout=settings.DASHBOARD_QUERY_TIMEOUT_SECONDS)
         
         stats = {
-            "my_devices": my_devices,
-            "operators": operator_stats,
-            "distributions_sent": sent,
-            "distributions_received": received
+            "my_devices": results["devices"]["total"],
+            "operators": results["operators"],
+            "distributions_sent": results["sent"],
+            "distributions_received": results["received"]
         }
     
     elif role == "operator":
         # Stats for operator
-        my_devices = await db.devices.count_documents({"current_holder_id": user_id})
-        my_defects = await db.defects.count_documents({"reported_by": user_id})
-        my_returns = await db.returns.count_documents({"requested_by": user_id})
+        results = await gather_bounded({
+            "devices": get_holder_device_counts(user_id),
+            "defects": db.defects.count_documents({"reported_by": user_id}),
+            "returns": db.returns.count_documents({"requested_by": user_id})
+        }, timeout=settings.DASHBOARD_QUERY_TIMEOUT_SECONDS)
         
         stats = {
-            "my_devices": my_devices,
-            "my_defects": my_defects,
-            "my_returns": my_returns
+            "my_devices": results["devices"]["total"],
+            "my_defects": results["defects"],
+            "my_returns": results["returns"]
         }
     
     return stats
@@ -84,7 +153,7 @@ async def get_dashboard_stats(user: Dict[str, Any]) -> Dict[str, Any]:
 
 async def get_recent_activities(user: Dict[str, Any], limit: int = 10) -> list:
     """Get recent activities based on user role"""
-    db = get_database()
+    db = get_analytics_database()
     role = user.get("role")
     user_id = str(user.get("_id"))
     
@@ -130,76 +199,73 @@ async def get_recent_activities(user: Dict[str, Any], limit: int = 10) -> list:
     return activities
 
 
-async def get_distribution_chart_data() -> list:
-    """Get distribution data for charts"""
-    db = get_database()
-    
-    from datetime import timedelta
-    
-    data = []
-    now = datetime.utcnow()
-    
-    for i in range(11, -1, -1):
-        month_start = datetime(now.year, now.month, 1) - timedelta(days=i*30)
-        month_end = month_start + timedelta(days=30)
-        
-        count = await db.distributions.count_documents({
-            "status": "delivered",
-            "created_at": {"$gte": month_start, "$lt": month_end}
-        })
-        
-        data.append({
-            "month": month_start.strftime("%b"),
-            "distributions": count
-        })
-    
-    return data
+# Chart labels per granularity; rows keep the "month" key the charts plot on
+CHART_LABEL_FORMATS = {"day": "%Y-%m-%d", "week": "%Y-%m-%d", "month": "%b"}
 
 
-async def get_defect_chart_data() -> list:
-    """Get defect data for charts"""
-    db = get_database()
-    
-    from datetime import timedelta
-    
-    data = []
-    now = datetime.utcnow()
-    
-    for i in range(11, -1, -1):
-        month_start = datetime(now.year, now.month, 1) - timedelta(days=i*30)
-        month_end = month_start + timedelta(days=30)
-        
-        reported = await db.defects.count_documents({
-            "created_at": {"$gte": month_start, "$lt": month_end}
-        })
-        resolved = await db.defects.count_documents({
-            "status": "resolved",
-            "resolved_at": {"$gte": month_start, "$lt": month_end}
-        })
-        
-        data.append({
-            "month": month_start.strftime("%b"),
-            "reported": reported,
-            "resolved": resolved
-        })
-    
-    return data
+async def get_distribution_chart_data(
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    granularity: str = "month"
+) -> list:
+    """Get delivered distributions per calendar bucket for charts"""
+    return await timeseries_service.build_series(
+        "distributions",
+        {"distributions": ("created_at", {"status": "delivered"})},
+        start=start,
+        end=end,
+        granularity=granularity,
+        label_key="month",
+        label_format=CHART_LABEL_FORMATS.get(granularity, "%Y-%m-%d")
+    )
+
+
+async def get_defect_chart_data(
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    granularity: str = "month"
+) -> list:
+    """Get reported and resolved defects per calendar bucket for charts"""
+    return await timeseries_service.build_series(
+        "defects",
+        {
+            "reported": ("created_at", None),
+            "resolved": ("resolved_at", {"status": "resolved"})
+        },
+        start=start,
+        end=end,
+        granularity=granularity,
+        label_key="month",
+        label_format=CHART_LABEL_FORMATS.get(granularity, "%Y-%m-%d")
+    )
 
 
 async def get_system_alerts(user: Dict[str, Any]) -> list:
     """Get system alerts for dashboard"""
-    db = get_database()
+    db = get_analytics_database()
     role = user.get("role")
     
     alerts = []
     
     if role in ["admin", "manager"]:
+        # Independent checks run concurrently; a check that fails or times
+        # out is skipped rather than failing the whole alert list
+        counts = await gather_bounded(
+            {
+                "critical_defects": db.defects.count_documents({
+                    "severity": "critical",
+                    "status": {"$ne": "resolved"}
+                }),
+                "pending_approvals": db.approvals.count_documents({"status": "pending"}),
+                "available_devices": db.devices.count_documents({"status": "available"})
+            },
+            timeout=settings.DASHBOARD_QUERY_TIMEOUT_SECONDS,
+            defaults={"critical_defects": None, "pending_approvals": None, "available_devices": None}
+        )
+        
         # Critical defects
-        critical_defects = await db.defects.count_documents({
-            "severity": "critical",
-            "status": {"$ne": "resolved"}
-        })
-        if critical_defects > 0:
+        critical_defects = counts["critical_defects"]
+        if critical_defects:
             alerts.append({
                 "type": "error",
                 "title": "Critical Defects",
@@ -208,8 +274,8 @@ async def get_system_alerts(user: Dict[str, Any]) -> list:
             })
         
         # Pending approvals
-        pending_approvals = await db.approvals.count_documents({"status": "pending"})
-        if pending_approvals > 0:
+        pending_approvals = counts["pending_approvals"]
+        if pending_approvals:
             alerts.append({
                 "type": "warning",
                 "title": "Pending Approvals",
@@ -218,8 +284,8 @@ async def get_system_alerts(user: Dict[str, Any]) -> list:
             })
         
         # Low device stock
-        available_devices = await db.devices.count_documents({"status": "available"})
-        if available_devices < 10:
+        available_devices = counts["available_devices"]
+        if available_devices is not None and available_devices < 10:
             alerts.append({
                 "type": "warning",
                 "title": "Low Device Stock",
@@ -1,12 +1,15 @@
 from datetime import datetime
 from typing import Optional, List, Dict, Any
 from bson import ObjectId
+from pymongo import ReturnDocument
 
 from app.database import get_database
-from app.models.defect import DefectCreate, DefectUpdate, DefectStatus, DefectSeverity
+from app.models.defect import DefectCreate, DefectUpdate, DefectStatus, DefectSeverity, DEFECT_TRANSITIONS
 from app.models.device import DeviceStatus
-from app.services import device_service, notification_service
-from app.utils.helpers import serialize_doc, serialize_docs, get_pagination, generate_defect_id
+from app.services import device_service, notification_service, report_cache_service, stats_counter_service
+from app.services.search_service import add_search_filter, search_fields, refresh_search_tokens
+from app.utils.helpers import serialize_doc, prepare_docs, paginate, generate_defect_id
+from app.utils.transactions import UnitOfWork, run_in_transaction, transition_status
 
 
 async def get_defects(
@@ -16,7 +19,11 @@ async def get_defects(
     severity: Optional[str] = None,
     defect_type: Optional[str] = None,
     reported_by: Optional[str] = None,
-    search: Optional[str] = None
+    search: Optional[str] = None,
+    after: Optional[str] = None,
+    cursor: bool = False,
+    include_total: bool = False,
+    fields: Optional[List[str]] = None
 ) -> Dict[str, Any]:
     """Get all defect reports with pagination and filters"""
     db = get_database()
@@ -32,23 +39,17 @@ async def get_defects(
     if reported_by:
         query["reported_by"] = reported_by
     if search:
-        query["$or"] = [
-            {"report_id": {"$regex": search, "$options": "i"}},
-            {"device_serial": {"$regex": search, "$options": "i"}},
-            {"description": {"$regex": search, "$options": "i"}}
-        ]
-    
-    # Get total count
-    total = await db.defects.count_documents(query)
+        add_search_filter(query, "defects", search)
     
     # Get paginated results
-    skip = (page - 1) * page_size
-    cursor = db.defects.find(query).skip(skip).limit(page_size).sort("created_at", -1)
-    defects = await cursor.to_list(length=page_size)
+    defects, pagination = await paginate(
+        db.defects, query, page, page_size,
+        after=after, cursor=cursor, include_total=include_total, fields=fields
+    )
     
     return {
-        "data": serialize_docs(defects),
-        "pagination": get_pagination(page, page_size, total)
+        "data": prepare_docs(defects),
+        "pagination": pagination
     }
 
 
@@ -90,12 +91,16 @@ async def create_defect(defect_data: DefectCreate, reporter: Dict[str, Any]) ->
         "resolved_by_name": None,
         "resolved_at": None,
         "images": defect_data.images or [],
+        "version": 0,
         "created_at": now,
         "updated_at": now
     }
     
+    defect_doc.update(search_fields("defects", defect_doc))
     result = await db.defects.insert_one(defect_doc)
     defect_doc["_id"] = result.inserted_id
+    await stats_counter_service.record_insert("defects", defect_doc)
+    await report_cache_service.invalidate("defects")
     
     # Update device status to defective
     await device_service.update_device_status(
@@ -119,16 +124,17 @@ async def create_defect(defect_data: DefectCreate, reporter: Dict[str, Any]) ->
     )
     
     # Notify admins/managers
-    admin_users = await db.users.find({"role": {"$in": ["admin", "manager"]}}).to_list(length=100)
-    for admin in admin_users:
-        await notification_service.create_notification(
-            user_id=str(admin["_id"]),
-            title="New Defect Report",
-            message=f"A new {defect_data.severity.value} severity defect has been reported for device {device['device_id']}",
-            notification_type="warning" if defect_data.severity.value in ["critical", "high"] else "info",
-            category="defect",
-            link=f"/defects/{str(result.inserted_id)}"
-        )
+    admin_users = await db.users.find(
+        {"role": {"$in": ["admin", "manager"]}}, {"_id": 1}
+    ).to_list(length=None)
+    await notification_service.dispatch_notifications(
+        user_ids=[str(admin["_id"]) for admin in admin_users],
+        title="New Defect Report",
+        message=f"A new {defect_data.severity.value} severity defect has been reported for device {device['device_id']}",
+        notification_type="warning" if defect_data.severity.value in ["critical", "high"] else "info",
+        category="defect",
+        link=f"/defects/{str(result.inserted_id)}"
+    )
     
     return serialize_doc(defect_doc)
 
@@ -152,12 +158,23 @@ async def update_defect(defect_id: str, defect_data: DefectUpdate) -> Optional[D
     
     update_dict["updated_at"] = datetime.utcnow()
     
-    result = await db.defects.update_one(
-        {"_id": ObjectId(defect_id)},
-        {"$set": update_dict}
-    )
+    if "status" in update_dict:
+        # Status edits follow DEFECT_TRANSITIONS; keeping the current status is allowed
+        status = update_dict["status"]
+        before = await transition_status(
+            db.defects, defect_id, (status, *DEFECT_TRANSITIONS[status]), update_dict
+        )
+    else:
+        before = await db.defects.find_one_and_update(
+            {"_id": ObjectId(defect_id)},
+            {"$set": update_dict, "$inc": {"version": 1}},
+            return_document=ReturnDocument.BEFORE
+        )
     
-    if result.modified_count > 0 or result.matched_count > 0:
+    if before:
+        await stats_counter_service.record_update("defects", before, update_dict)
+        await report_cache_service.invalidate("defects")
+        await refresh_search_tokens("defects", before, update_dict)
         return await get_defect_by_id(defect_id)
     return None
 
@@ -166,34 +183,41 @@ async def delete_defect(defect_id: str) -> bool:
     """Delete defect report"""
     db = get_database()
     
-    result = await db.defects.delete_one({"_id": ObjectId(defect_id)})
-    return result.deleted_count > 0
+    deleted = await db.defects.find_one_and_delete({"_id": ObjectId(defect_id)})
+    if deleted:
+        await stats_counter_service.record_delete("defects", deleted)
+        await report_cache_service.invalidate("defects")
+        return True
+    return False
 
 
 async def update_defect_status(
     defect_id: str,
     status: str,
     user: Dict[str, Any],
-    notes: Optional[str] = None
+    notes: Optional[str] = None,
+    expected_version: Optional[int] = None
 ) -> Optional[Dict[str, Any]]:
-    """Update defect status"""
+    """Update defect status (from a prior status allowed by DEFECT_TRANSITIONS, else ConflictError)"""
     db = get_database()
     
-    defect = await db.defects.find_one({"_id": ObjectId(defect_id)})
-    if not defect:
-        return None
-    
     update_data = {
         "status": status,
         "updated_at": datetime.utcnow()
     }
     
-    result = await db.defects.update_one(
-        {"_id": ObjectId(defect_id)},
-        {"$set": update_data}
+    defect = await transition_status(
+        db.defects,
+        defect_id,
+        DEFECT_TRANSITIONS[status],
+        update_data,
+        expected_version=expected_version
     )
     
-    if result.modified_count > 0:
+    if defect:
+        await stats_counter_service.record_update("defects", defect, update_data)
+        await report_cache_service.invalidate("defects")
+        
         # Notify reporter
         await notification_service.create_notification(
             user_id=defect["reported_by"],
@@ -211,42 +235,51 @@ async def update_defect_status(
 async def resolve_defect(
     defect_id: str,
     resolution: str,
-    resolver: Dict[str, Any]
+    resolver: Dict[str, Any],
+    expected_version: Optional[int] = None
 ) -> Optional[Dict[str, Any]]:
-    """Resolve a defect report"""
+    """Resolve a defect report and move its device to maintenance in one transaction"""
     db = get_database()
     
-    defect = await db.defects.find_one({"_id": ObjectId(defect_id)})
-    if not defect:
-        return None
-    
-    now = datetime.utcnow()
-    update_data = {
-        "status": DefectStatus.RESOLVED.value,
-        "resolution": resolution,
-        "resolved_by": str(resolver["_id"]),
-        "resolved_by_name": resolver["name"],
-        "resolved_at": now,
-        "updated_at": now
-    }
-    
-    result = await db.defects.update_one(
-        {"_id": ObjectId(defect_id)},
-        {"$set": update_data}
-    )
-    
-    if result.modified_count > 0:
+    async def transition(uow: UnitOfWork) -> bool:
+        session = uow.session
+        now = datetime.utcnow()
+        update_data = {
+            "status": DefectStatus.RESOLVED.value,
+            "resolution": resolution,
+            "resolved_by": str(resolver["_id"]),
+            "resolved_by_name": resolver["name"],
+            "resolved_at": now,
+            "updated_at": now
+        }
+        
+        defect = await transition_status(
+            db.defects,
+            defect_id,
+            DEFECT_TRANSITIONS[DefectStatus.RESOLVED.value],
+            update_data,
+            expected_version=expected_version,
+            session=session
+        )
+        if not defect:
+            return False
+        
+        uow.after_commit(stats_counter_service.record_update, "defects", defect, update_data)
+        uow.after_commit(report_cache_service.invalidate, "defects")
+        
         # Update device status back to available/maintenance
         await device_service.update_device_status(
             device_id=defect["device_id"],
             status=DeviceStatus.MAINTENANCE.value,
             performed_by=str(resolver["_id"]),
             performed_by_name=resolver["name"],
-            notes=f"Defect resolved: {defect['report_id']}"
+            notes=f"Defect resolved: {defect['report_id']}",
+            uow=uow
         )
         
         # Notify reporter
-        await notification_service.create_notification(
+        uow.after_commit(
+            notification_service.create_notification,
             user_id=defect["reported_by"],
             title="Defect Resolved",
             message=f"Your defect report {defect['report_id']} has been resolved",
@@ -254,7 +287,9 @@ async def resolve_defect(
             category="defect",
             link=f"/defects/{defect_id}"
         )
-        
+        return True
+    
+    if await run_in_transaction(transition):
         return await get_defect_by_id(defect_id)
     return None
 
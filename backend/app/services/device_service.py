@@ -1,13 +1,21 @@
+import csv
+import json
 from datetime import datetime
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, AsyncIterator, Tuple
 from bson import ObjectId
+from pydantic import ValidationError
+from pymongo import ReturnDocument
+from pymongo.errors import BulkWriteError, DuplicateKeyError
 
 from app.database import get_database
 from app.models.device import DeviceCreate, DeviceUpdate, DeviceStatus, HolderType, DeviceHistoryCreate
+from app.services import report_cache_service, stats_counter_service
+from app.services.search_service import add_search_filter, search_fields, refresh_search_tokens
 from app.utils.helpers import (
-    serialize_doc, serialize_docs, get_pagination, 
+    serialize_doc, serialize_docs, prepare_docs, paginate, 
     generate_device_id, to_object_id
 )
+from app.utils.transactions import UnitOfWork, after_commit, run_in_transaction
 
 
 async def get_devices(
@@ -16,7 +24,11 @@ async def get_devices(
     status: Optional[str] = None,
     device_type: Optional[str] = None,
     holder_id: Optional[str] = None,
-    search: Optional[str] = None
+    search: Optional[str] = None,
+    after: Optional[str] = None,
+    cursor: bool = False,
+    include_total: bool = False,
+    fields: Optional[List[str]] = None
 ) -> Dict[str, Any]:
     """Get all devices with pagination and filters"""
     db = get_database()
@@ -30,24 +42,17 @@ async def get_devices(
     if holder_id:
         query["current_holder_id"] = holder_id
     if search:
-        query["$or"] = [
-            {"device_id": {"$regex": search, "$options": "i"}},
-            {"serial_number": {"$regex": search, "$options": "i"}},
-            {"mac_address": {"$regex": search, "$options": "i"}},
-            {"model": {"$regex": search, "$options": "i"}}
-        ]
-    
-    # Get total count
-    total = await db.devices.count_documents(query)
+        add_search_filter(query, "devices", search)
     
     # Get paginated results
-    skip = (page - 1) * page_size
-    cursor = db.devices.find(query).skip(skip).limit(page_size).sort("created_at", -1)
-    devices = await cursor.to_list(length=page_size)
+    devices, pagination = await paginate(
+        db.devices, query, page, page_size,
+        after=after, cursor=cursor, include_total=include_total, fields=fields
+    )
     
     return {
-        "data": serialize_docs(devices),
-        "pagination": get_pagination(page, page_size, total)
+        "data": prepare_docs(devices),
+        "pagination": pagination
     }
 
 
@@ -69,23 +74,25 @@ async def get_device_by_serial(serial_number: str) -> Optional[Dict[str, Any]]:
     return serialize_doc(device) if device else None
 
 
-async def create_device(device_data: DeviceCreate, created_by: str, created_by_name: str) -> Dict[str, Any]:
-    """Create a new device"""
-    db = get_database()
-    
-    # Check if serial number exists
-    existing = await db.devices.find_one({"serial_number": device_data.serial_number})
-    if existing:
-        raise ValueError("Serial number already exists")
-    
-    # Check if MAC address exists
-    existing_mac = await db.devices.find_one({"mac_address": device_data.mac_address})
-    if existing_mac:
-        raise ValueError("MAC address already exists")
-    
-    now = datetime.utcnow()
+IMPORT_BATCH_SIZE = 500
+IMPORT_MAX_ERRORS = 1000
+IMPORT_DEVICE_ID_LENGTH = 6
+IMPORT_ID_RETRIES = 3
+IMPORT_FIELDS = [
+    "device_type", "model", "serial_number", "mac_address", "manufacturer",
+    "purchase_date", "warranty_expiry", "metadata"
+]
+
+
+def build_device_document(
+    device_data: DeviceCreate,
+    now: Optional[datetime] = None,
+    device_id_length: int = 4
+) -> Dict[str, Any]:
+    """Build the document for a newly registered device"""
+    now = now or datetime.utcnow()
     device_doc = {
-        "device_id": generate_device_id(device_data.device_type.value),
+        "device_id": generate_device_id(device_data.device_type.value, device_id_length),
         "device_type": device_data.device_type.value,
         "model": device_data.model,
         "serial_number": device_data.serial_number,
@@ -102,9 +109,51 @@ async def create_device(device_data: DeviceCreate, created_by: str, created_by_n
         "updated_at": now,
         "metadata": device_data.metadata
     }
+    device_doc.update(search_fields("devices", device_doc))
+    return device_doc
+
+
+# Unique device fields -> error reported when an insert collides on them
+DUPLICATE_FIELD_ERRORS = {
+    "serial_number": "Serial number already exists",
+    "mac_address": "MAC address already exists"
+}
+
+
+def _duplicate_field_error(error: Dict[str, Any]) -> Optional[str]:
+    """Message for a duplicate-key write error on a unique device field, if it is one"""
+    for field in error.get("keyPattern") or {}:
+        if field in DUPLICATE_FIELD_ERRORS:
+            return DUPLICATE_FIELD_ERRORS[field]
+    return None
+
+
+async def create_device(device_data: DeviceCreate, created_by: str, created_by_name: str) -> Dict[str, Any]:
+    """Create a new device"""
+    db = get_database()
+    
+    # Check if serial number exists
+    existing = await db.devices.find_one({"serial_number": device_data.serial_number})
+    if existing:
+        raise ValueError("Serial number already exists")
+    
+    # Check if MAC address exists
+    existing_mac = await db.devices.find_one({"mac_address": device_data.mac_address})
+    if existing_mac:
+        raise ValueError("MAC address already exists")
     
-    result = await db.devices.insert_one(device_doc)
+    device_doc = build_device_document(device_data)
+    try:
+        result = await db.devices.insert_one(device_doc)
+    except DuplicateKeyError as e:
+        # A concurrent create or import took the serial number or MAC first
+        message = _duplicate_field_error(e.details or {})
+        if message is None:
+            raise
+        raise ValueError(message)
     device_doc["_id"] = result.inserted_id
+    await stats_counter_service.record_insert("devices", device_doc)
+    await report_cache_service.invalidate("devices")
     
     # Add to history
     await add_device_history(
@@ -120,6 +169,181 @@ async def create_device(device_data: DeviceCreate, created_by: str, created_by_n
     return serialize_doc(device_doc)
 
 
+def _parse_import_row(fmt: str, line: str, header: Optional[List[str]]) -> Dict[str, Any]:
+    """Parse one CSV or NDJSON line into a raw device dict"""
+    if fmt == "ndjson":
+        row = json.loads(line)
+        if not isinstance(row, dict):
+            raise ValueError("Expected a JSON object")
+        return row
+    
+    values = next(csv.reader([line]))
+    if len(values) != len(header):
+        raise ValueError(f"Expected {len(header)} columns, got {len(values)}")
+    row = {key: value.strip() or None for key, value in zip(header, values)}
+    if row.get("metadata"):
+        row["metadata"] = json.loads(row["metadata"])
+    return row
+
+
+def _add_import_error(report: Dict[str, Any], row_number: int, error: Any) -> None:
+    """Record a failed import row, keeping at most IMPORT_MAX_ERRORS details"""
+    report["failed"] += 1
+    if len(report["errors"]) < IMPORT_MAX_ERRORS:
+        report["errors"].append({"row": row_number, "error": error})
+    else:
+        report["errors_truncated"] = True
+
+
+async def _import_batch(
+    batch: List[Dict[str, Any]],
+    created_by: str,
+    created_by_name: str,
+    report: Dict[str, Any]
+) -> None:
+    """Check uniqueness for a batch with one query, then insert it in bulk"""
+    db = get_database()
+    
+    serials = [item["data"].serial_number for item in batch]
+    macs = [item["data"].mac_address for item in batch]
+    existing = await db.devices.find(
+        {"$or": [{"serial_number": {"$in": serials}}, {"mac_address": {"$in": macs}}]},
+        {"serial_number": 1, "mac_address": 1}
+    ).to_list(length=None)
+    taken_serials = {doc.get("serial_number") for doc in existing}
+    taken_macs = {doc.get("mac_address") for doc in existing}
+    
+    pending = []
+    now = datetime.utcnow()
+    for item in batch:
+        data = item["data"]
+        if data.serial_number in taken_serials:
+            _add_import_error(report, item["row"], "Serial number already exists")
+        elif data.mac_address in taken_macs:
+            _add_import_error(report, item["row"], "MAC address already exists")
+        else:
+            # Also catches duplicates within the batch itself
+            taken_serials.add(data.serial_number)
+            taken_macs.add(data.mac_address)
+            pending.append((item, build_device_document(data, now, IMPORT_DEVICE_ID_LENGTH)))
+    
+    inserted = []
+    for attempt in range(IMPORT_ID_RETRIES + 1):
+        if not pending:
+            break
+        try:
+            await db.devices.insert_many([doc for _, doc in pending], ordered=False)
+            inserted.extend(doc for _, doc in pending)
+            pending = []
+        except BulkWriteError as e:
+            failed = {err["index"]: err for err in e.details.get("writeErrors", [])}
+            retry = []
+            for index, (item, doc) in enumerate(pending):
+                err = failed.get(index)
+                if err is None:
+                    inserted.append(doc)
+                elif "device_id" in (err.get("keyPattern") or {}) and attempt < IMPORT_ID_RETRIES:
+                    # Generated device_id collided, retry with a fresh one
+                    doc.pop("_id", None)
+                    doc["device_id"] = generate_device_id(doc["device_type"], IMPORT_DEVICE_ID_LENGTH)
+                    retry.append((item, doc))
+                elif _duplicate_field_error(err):
+                    _add_import_error(report, item["row"], _duplicate_field_error(err))
+                else:
+                    _add_import_error(report, item["row"], err.get("errmsg", "Insert failed"))
+            pending = retry
+    
+    if not inserted:
+        return
+    
+    await db.device_history.insert_many([
+        build_device_history(
+            device_id=str(doc["_id"]),
+            action="registered",
+            status_after=DeviceStatus.AVAILABLE.value,
+            location="NOC",
+            notes="Device registered in system (bulk import)",
+            performed_by=created_by,
+            performed_by_name=created_by_name,
+            timestamp=now
+        )
+        for doc in inserted
+    ])
+    await stats_counter_service.record_inserts("devices", inserted)
+    await report_cache_service.invalidate("devices", "device_history")
+    report["inserted"] += len(inserted)
+
+
+async def import_devices(
+    lines: AsyncIterator[str],
+    fmt: str,
+    created_by: str,
+    created_by_name: str,
+    batch_size: int = IMPORT_BATCH_SIZE
+) -> Dict[str, Any]:
+    """
+    Bulk-register devices from a stream of CSV or NDJSON lines.
+    
+    Rows are validated against DeviceCreate and written in batches, so memory
+    stays bounded by the batch size. CSV input needs a header row naming the
+    DeviceCreate fields; quoted values may not span lines. If the input
+    stops decoding partway, the rows read so far are still imported and
+    the report carries the decode error.
+    """
+    if fmt not in ("csv", "ndjson"):
+        raise ValueError("Unsupported import format, expected csv or ndjson")
+    
+    report: Dict[str, Any] = {
+        "total_rows": 0,
+        "inserted": 0,
+        "failed": 0,
+        "errors": [],
+        "errors_truncated": False,
+        "decode_error": None
+    }
+    header: Optional[List[str]] = None
+    batch: List[Dict[str, Any]] = []
+    line_number = 0
+    
+    try:
+        async for line in lines:
+            line_number += 1
+            if not line.strip():
+                continue
+            
+            if fmt == "csv" and header is None:
+                header = [column.strip() for column in next(csv.reader([line]))]
+                unknown = set(header) - set(IMPORT_FIELDS)
+                if unknown:
+                    raise ValueError(f"Unknown CSV columns: {', '.join(sorted(unknown))}")
+                continue
+            
+            report["total_rows"] += 1
+            try:
+                row = _parse_import_row(fmt, line, header)
+                batch.append({"row": line_number, "data": DeviceCreate(**row)})
+            except ValidationError as e:
+                _add_import_error(report, line_number, [
+                    {"field": ".".join(str(loc) for loc in err["loc"]), "message": err["msg"]}
+                    for err in e.errors()
+                ])
+            except (ValueError, TypeError) as e:
+                _add_import_error(report, line_number, str(e))
+            
+            if len(batch) >= batch_size:
+                await _import_batch(batch, created_by, created_by_name, report)
+                batch = []
+    except UnicodeDecodeError as e:
+        # Earlier batches are already written; keep their report
+        report["decode_error"] = f"Input is not valid text after line {line_number}: {e}"
+    
+    if batch:
+        await _import_batch(batch, created_by, created_by_name, report)
+    
+    report["errors"].sort(key=lambda error: error["row"])
+    return report
+
+
 async def update_device(device_id: str, device_data: DeviceUpdate) -> Optional[Dict[str, Any]]:
     """Update device"""
     db = get_database()
@@ -137,12 +361,16 @@ async def update_device(device_id: str, device_data: DeviceUpdate) -> Optional[D
     
     update_dict["updated_at"] = datetime.utcnow()
     
-    result = await db.devices.update_one(
+    before = await db.devices.find_one_and_update(
         {"_id": ObjectId(device_id)},
-        {"$set": update_dict}
+        {"$set": update_dict},
+        return_document=ReturnDocument.BEFORE
     )
     
-    if result.modified_count > 0 or result.matched_count > 0:
+    if before:
+        await stats_counter_service.record_update("devices", before, update_dict)
+        await report_cache_service.invalidate("devices")
+        await refresh_search_tokens("devices", before, update_dict)
         return await get_device_by_id(device_id)
     return None
 
@@ -151,11 +379,14 @@ async def delete_device(device_id: str) -> bool:
     """Delete device"""
     db = get_database()
     
-    result = await db.devices.delete_one({"_id": ObjectId(device_id)})
+    deleted = await db.devices.find_one_and_delete({"_id": ObjectId(device_id)})
     
-    if result.deleted_count > 0:
+    if deleted:
+        await stats_counter_service.record_delete("devices", deleted)
+        
         # Also delete history
         await db.device_history.delete_many({"device_id": device_id})
+        await report_cache_service.invalidate("devices", "device_history")
         return True
     return False
 
@@ -165,29 +396,36 @@ async def update_device_status(
     status: str, 
     performed_by: str,
     performed_by_name: str,
-    notes: Optional[str] = None
+    notes: Optional[str] = None,
+    uow: Optional[UnitOfWork] = None
 ) -> Optional[Dict[str, Any]]:
-    """Update device status"""
+    """Update device status (inside the caller's unit of work if given)"""
     db = get_database()
+    session = uow.session if uow else None
     
     # Get current device
-    device = await db.devices.find_one({"_id": ObjectId(device_id)})
+    device = await db.devices.find_one({"_id": ObjectId(device_id)}, session=session)
     if not device:
         return None
     
     old_status = device.get("status")
+    now = datetime.utcnow()
     
     result = await db.devices.update_one(
         {"_id": ObjectId(device_id)},
         {
             "$set": {
                 "status": status,
-                "updated_at": datetime.utcnow()
+                "updated_at": now
             }
-        }
+        },
+        session=session
     )
     
     if result.modified_count > 0:
+        await after_commit(uow, stats_counter_service.record_update, "devices", device, {"status": status})
+        await after_commit(uow, report_cache_service.invalidate, "devices")
+        
         # Add to history
         await add_device_history(
             device_id=device_id,
@@ -197,8 +435,11 @@ async def update_device_status(
             location=device.get("current_location"),
             notes=notes or f"Status changed from {old_status} to {status}",
             performed_by=performed_by,
-            performed_by_name=performed_by_name
+            performed_by_name=performed_by_name,
+            uow=uow
         )
+        if uow:
+            return serialize_doc({**device, "status": status, "updated_at": now})
         return await get_device_by_id(device_id)
     return None
 
@@ -214,33 +455,41 @@ async def update_device_holder(
     performed_by_name: str,
     from_user_id: Optional[str] = None,
     from_user_name: Optional[str] = None,
-    notes: Optional[str] = None
+    notes: Optional[str] = None,
+    uow: Optional[UnitOfWork] = None
 ) -> Optional[Dict[str, Any]]:
-    """Update device holder (for distributions)"""
+    """Update device holder (inside the caller's unit of work if given)"""
     db = get_database()
+    session = uow.session if uow else None
     
     # Get current device
-    device = await db.devices.find_one({"_id": ObjectId(device_id)})
+    device = await db.devices.find_one({"_id": ObjectId(device_id)}, session=session)
     if not device:
         return None
     
     old_status = device.get("status")
+    changes = {
+        "current_holder_id": holder_id,
+        "current_holder_name": holder_name,
+        "current_holder_type": holder_type,
+        "current_location": location,
+        "status": status,
+        "updated_at": datetime.utcnow()
+    }
     
     result = await db.devices.update_one(
         {"_id": ObjectId(device_id)},
-        {
-            "$set": {
-                "current_holder_id": holder_id,
-                "current_holder_name": holder_name,
-                "current_holder_type": holder_type,
-                "current_location": location,
-                "status": status,
-                "updated_at": datetime.utcnow()
-            }
-        }
+        {"$set": changes},
+        session=session
     )
     
     if result.modified_count > 0:
+        await after_commit(uow, stats_counter_service.record_update, "devices", device, {
+            "current_holder_id": holder_id,
+            "status": status
+        })
+        await after_commit(uow, report_cache_service.invalidate, "devices")
+        
         # Add to history
         await add_device_history(
             device_id=device_id,
@@ -254,17 +503,180 @@ async def update_device_holder(
             location=location,
             notes=notes,
             performed_by=performed_by,
-            performed_by_name=performed_by_name
+            performed_by_name=performed_by_name,
+            uow=uow
         )
+        if uow:
+            return serialize_doc({**device, **changes})
         return await get_device_by_id(device_id)
     return None
 
 
+async def transfer_devices(
+    device_ids: List[str],
+    holder_id: Optional[str],
+    holder_name: Optional[str],
+    holder_type: str,
+    location: str,
+    status: str,
+    performed_by: str,
+    performed_by_name: str,
+    from_user_id: Optional[str] = None,
+    from_user_name: Optional[str] = None,
+    notes: Optional[str] = None,
+    uow: Optional[UnitOfWork] = None,
+    use_transaction: Optional[bool] = None
+) -> int:
+    """
+    Move many devices to a new holder in bulk (for distributions).
+    
+    Reads all before-states with one query, updates with one update_many and
+    writes history with one insert_many. Runs inside the caller's unit of
+    work if given, otherwise in its own (when transactions are enabled).
+    """
+    db = get_database()
+    
+    object_ids = [oid for oid in (to_object_id(device_id) for device_id in device_ids) if oid]
+    if not object_ids:
+        return 0
+    
+    changes = {
+        "current_holder_id": holder_id,
+        "current_holder_name": holder_name,
+        "current_holder_type": holder_type,
+        "current_location": location,
+        "status": status,
+        "reserved_by": None
+    }
+    
+    async def transfer(uow: UnitOfWork) -> int:
+        session = uow.session
+        devices = await db.devices.find(
+            {"_id": {"$in": object_ids}},
+            {"status": 1, "device_type": 1, "current_holder_id": 1},
+            session=session
+        ).to_list(length=None)
+        if not devices:
+            return 0
+        
+        now = datetime.utcnow()
+        await db.devices.update_many(
+            {"_id": {"$in": [device["_id"] for device in devices]}},
+            {"$set": {**changes, "updated_at": now}},
+            session=session
+        )
+        await db.device_history.insert_many([
+            build_device_history(
+                device_id=str(device["_id"]),
+                action="distributed",
+                from_user_id=from_user_id,
+                from_user_name=from_user_name,
+                to_user_id=holder_id,
+                to_user_name=holder_name,
+                status_before=device.get("status"),
+                status_after=status,
+                location=location,
+                notes=notes,
+                performed_by=performed_by,
+                performed_by_name=performed_by_name,
+                timestamp=now
+            )
+            for device in devices
+        ], session=session)
+        
+        # Counters are a single hot document, so they are applied after the commit
+        uow.after_commit(stats_counter_service.record_updates, "devices", [(device, changes) for device in devices])
+        uow.after_commit(report_cache_service.invalidate, "devices", "device_history")
+        return len(devices)
+    
+    if uow is not None:
+        return await transfer(uow)
+    return await run_in_transaction(transfer, use_transaction=use_transaction)
+
+
+async def _unavailable_devices(requested: List[str]) -> Tuple[List[Dict[str, Any]], List[str]]:
+    """Fetch requested devices with one $in query and describe every missing or unavailable one"""
+    db = get_database()
+    
+    object_ids = {device_id: to_object_id(device_id) for device_id in requested}
+    devices = await db.devices.find(
+        {"_id": {"$in": [oid for oid in object_ids.values() if oid]}},
+        {"status": 1, "device_id": 1, "reserved_by": 1}
+    ).to_list(length=None)
+    found = {str(device["_id"]): device for device in devices}
+    
+    missing = [device_id for device_id in requested if device_id not in found]
+    unavailable = [
+        device["device_id"] for device in devices
+        if device["status"] != DeviceStatus.AVAILABLE.value or device.get("reserved_by")
+    ]
+    
+    errors = []
+    if missing:
+        errors.append(f"Devices not found: {', '.join(missing)}")
+    if unavailable:
+        errors.append(f"Devices not available: {', '.join(unavailable)}")
+    return devices, errors
+
+
+async def reserve_devices(device_ids: List[str], reservation_id: str) -> None:
+    """
+    Validate and atomically reserve devices for a distribution.
+    
+    Fetches all devices with one $in query and reports every missing or
+    unavailable device at once. The reservation itself is a single guarded
+    update_many, so two concurrent distributions cannot claim the same unit.
+    """
+    db = get_database()
+    
+    requested = list(dict.fromkeys(device_ids))
+    devices, errors = await _unavailable_devices(requested)
+    if errors:
+        raise ValueError("; ".join(errors))
+    
+    result = await db.devices.update_many(
+        {
+            "_id": {"$in": [device["_id"] for device in devices]},
+            "status": DeviceStatus.AVAILABLE.value,
+            "reserved_by": None
+        },
+        {"$set": {"reserved_by": reservation_id, "updated_at": datetime.utcnow()}}
+    )
+    if result.modified_count:
+        await report_cache_service.invalidate("devices")
+    
+    if result.modified_count != len(devices):
+        # Lost a race with another write: undo our partial reservation and
+        # report the devices that changed since validation
+        await release_devices(reservation_id)
+        _, errors = await _unavailable_devices(requested)
+        raise ValueError("; ".join(errors) or "Devices changed during reservation, please retry")
+
+
+async def release_devices(reservation_id: str) -> int:
+    """Release devices reserved by a distribution that will not be delivered"""
+    return await release_reservations([reservation_id])
+
+
+async def release_reservations(reservation_ids: List[str], uow: Optional[UnitOfWork] = None) -> int:
+    """Release devices reserved by any of several distributions in one write"""
+    db = get_database()
+    
+    result = await db.devices.update_many(
+        {"reserved_by": {"$in": reservation_ids}},
+        {"$set": {"reserved_by": None, "updated_at": datetime.utcnow()}},
+        session=uow.session if uow else None
+    )
+    if result.modified_count:
+        await after_commit(uow, report_cache_service.invalidate, "devices")
+    return result.modified_count
+
+
 async def get_available_devices(holder_id: Optional[str] = None) -> List[Dict[str, Any]]:
     """Get available devices for distribution"""
     db = get_database()
     
-    query = {"status": DeviceStatus.AVAILABLE.value}
+    query = {"status": DeviceStatus.AVAILABLE.value, "reserved_by": None}
     if holder_id:
         query["current_holder_id"] = holder_id
     
@@ -284,7 +696,7 @@ async def get_device_history(device_id: str) -> List[Dict[str, Any]]:
     return serialize_docs(history)
 
 
-async def add_device_history(
+def build_device_history(
     device_id: str,
     action: str,
     performed_by: str,
@@ -296,12 +708,11 @@ async def add_device_history(
     status_before: Optional[str] = None,
     status_after: Optional[str] = None,
     location: Optional[str] = None,
-    notes: Optional[str] = None
+    notes: Optional[str] = None,
+    timestamp: Optional[datetime] = None
 ) -> Dict[str, Any]:
-    """Add device history entry"""
-    db = get_database()
-    
-    history_doc = {
+    """Build a device history document"""
+    return {
         "device_id": device_id,
         "action": action,
         "from_user_id": from_user_id,
@@ -314,11 +725,46 @@ async def add_device_history(
         "notes": notes,
         "performed_by": performed_by,
         "performed_by_name": performed_by_name,
-        "timestamp": datetime.utcnow()
+        "timestamp": timestamp or datetime.utcnow()
     }
+
+
+async def add_device_history(
+    device_id: str,
+    action: str,
+    performed_by: str,
+    performed_by_name: str,
+    from_user_id: Optional[str] = None,
+    from_user_name: Optional[str] = None,
+    to_user_id: Optional[str] = None,
+    to_user_name: Optional[str] = None,
+    status_before: Optional[str] = None,
+    status_after: Optional[str] = None,
+    location: Optional[str] = None,
+    notes: Optional[str] = None,
+    uow: Optional[UnitOfWork] = None
+) -> Dict[str, Any]:
+    """Add device history entry"""
+    db = get_database()
+    
+    history_doc = build_device_history(
+        device_id=device_id,
+        action=action,
+        performed_by=performed_by,
+        performed_by_name=performed_by_name,
+        from_user_id=from_user_id,
+        from_user_name=from_user_name,
+        to_user_id=to_user_id,
+        to_user_name=to_user_name,
+        status_before=status_before,
+        status_after=status_after,
+        location=location,
+        notes=notes
+    )
     
-    result = await db.device_history.insert_one(history_doc)
+    result = await db.device_history.insert_one(history_doc, session=uow.session if uow else None)
     history_doc["_id"] = result.inserted_id
+    await after_commit(uow, report_cache_service.invalidate, "device_history")
     
     return serialize_doc(history_doc)
 
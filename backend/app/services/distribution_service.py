@@ -1,12 +1,15 @@
 from datetime import datetime
 from typing import Optional, List, Dict, Any
 from bson import ObjectId
+from pymongo import ReturnDocument
 
 from app.database import get_database
-from app.models.distribution import DistributionCreate, DistributionUpdate, DistributionStatus, UserType
-from app.models.device import DeviceStatus, HolderType
-from app.services import device_service, notification_service
-from app.utils.helpers import serialize_doc, serialize_docs, get_pagination, generate_distribution_id
+from app.models.distribution import DistributionCreate, DistributionStatus, DISTRIBUTION_TRANSITIONS
+from app.models.device import DeviceStatus
+from app.services import approval_service, device_service, notification_service, report_cache_service, stats_counter_service
+from app.services.search_service import add_search_filter, search_fields
+from app.utils.helpers import serialize_doc, serialize_docs, prepare_docs, paginate, generate_distribution_id
+from app.utils.transactions import ConflictError, UnitOfWork, run_in_transaction, transition_status
 
 
 async def get_distributions(
@@ -16,7 +19,11 @@ async def get_distributions(
     from_user_id: Optional[str] = None,
     to_user_id: Optional[str] = None,
     user_id: Optional[str] = None,
-    search: Optional[str] = None
+    search: Optional[str] = None,
+    after: Optional[str] = None,
+    cursor: bool = False,
+    include_total: bool = False,
+    fields: Optional[List[str]] = None
 ) -> Dict[str, Any]:
     """Get all distributions with pagination and filters"""
     db = get_database()
@@ -36,23 +43,17 @@ async def get_distributions(
             {"to_user_id": user_id}
         ]
     if search:
-        query["$or"] = [
-            {"distribution_id": {"$regex": search, "$options": "i"}},
-            {"from_user_name": {"$regex": search, "$options": "i"}},
-            {"to_user_name": {"$regex": search, "$options": "i"}}
-        ]
-    
-    # Get total count
-    total = await db.distributions.count_documents(query)
+        add_search_filter(query, "distributions", search)
     
     # Get paginated results
-    skip = (page - 1) * page_size
-    cursor = db.distributions.find(query).skip(skip).limit(page_size).sort("created_at", -1)
-    distributions = await cursor.to_list(length=page_size)
+    distributions, pagination = await paginate(
+        db.distributions, query, page, page_size,
+        after=after, cursor=cursor, include_total=include_total, fields=fields
+    )
     
     return {
-        "data": serialize_docs(distributions),
-        "pagination": get_pagination(page, page_size, total)
+        "data": prepare_docs(distributions),
+        "pagination": pagination
     }
 
 
@@ -79,13 +80,9 @@ async def create_distribution(
     if not to_user:
         raise ValueError("Recipient user not found")
     
-    # Validate devices exist and are available
-    for device_id in dist_data.device_ids:
-        device = await db.devices.find_one({"_id": ObjectId(device_id)})
-        if not device:
-            raise ValueError(f"Device {device_id} not found")
-        if device["status"] != DeviceStatus.AVAILABLE.value:
-            raise ValueError(f"Device {device['device_id']} is not available")
+    # Validate and reserve all devices for this distribution up front
+    distribution_oid = ObjectId()
+    await device_service.reserve_devices(dist_data.device_ids, str(distribution_oid))
     
     # Determine user types based on roles
     role_to_type = {
@@ -98,6 +95,7 @@ async def create_distribution(
     
     now = datetime.utcnow()
     dist_doc = {
+        "_id": distribution_oid,
         "distribution_id": generate_distribution_id(),
         "device_ids": dist_data.device_ids,
         "device_count": len(dist_data.device_ids),
@@ -115,12 +113,19 @@ async def create_distribution(
         "approved_by": None,
         "approved_by_name": None,
         "created_by": str(from_user["_id"]),
+        "version": 0,
         "created_at": now,
         "updated_at": now
     }
     
-    result = await db.distributions.insert_one(dist_doc)
-    dist_doc["_id"] = result.inserted_id
+    dist_doc.update(search_fields("distributions", dist_doc))
+    try:
+        result = await db.distributions.insert_one(dist_doc)
+    except Exception:
+        await device_service.release_devices(str(distribution_oid))
+        raise
+    await stats_counter_service.record_insert("distributions", dist_doc)
+    await report_cache_service.invalidate("distributions")
     
     # Create approval entry
     approval_doc = {
@@ -137,10 +142,13 @@ async def create_distribution(
         "approval_date": None,
         "rejection_reason": None,
         "notes": dist_data.notes,
+        "entity_snapshot": approval_service.build_entity_snapshot("distribution", dist_doc),
+        "version": 0,
         "created_at": now,
         "updated_at": now
     }
     await db.approvals.insert_one(approval_doc)
+    await stats_counter_service.record_insert("approvals", approval_doc)
     
     # Send notification to recipient
     await notification_service.create_notification(
@@ -159,46 +167,76 @@ async def update_distribution_status(
     distribution_id: str,
     status: str,
     user: Dict[str, Any],
-    notes: Optional[str] = None
+    notes: Optional[str] = None,
+    expected_version: Optional[int] = None
 ) -> Optional[Dict[str, Any]]:
-    """Update distribution status"""
+    """
+    Update distribution status.
+
+    The change only applies from the prior statuses allowed by
+    DISTRIBUTION_TRANSITIONS (and at expected_version, if given); otherwise
+    ConflictError is raised. The distribution, its approval, device
+    transfers and released reservations are written as one transaction when
+    transactions are enabled; counters and the notification follow the commit.
+    """
     db = get_database()
     
-    distribution = await db.distributions.find_one({"_id": ObjectId(distribution_id)})
-    if not distribution:
-        return None
-    
-    update_data = {
-        "status": status,
-        "updated_at": datetime.utcnow()
-    }
-    
-    if status == DistributionStatus.APPROVED.value:
-        update_data["approval_date"] = datetime.utcnow()
-        update_data["approved_by"] = str(user["_id"])
-        update_data["approved_by_name"] = user["name"]
+    async def transition(uow: UnitOfWork) -> bool:
+        session = uow.session
+        now = datetime.utcnow()
+        update_data = {
+            "status": status,
+            "updated_at": now
+        }
         
-        # Update approval record
-        await db.approvals.update_one(
-            {"entity_id": distribution_id, "approval_type": "distribution"},
-            {
-                "$set": {
-                    "status": "approved",
-                    "approved_by": str(user["_id"]),
-                    "approved_by_name": user["name"],
-                    "approval_date": datetime.utcnow(),
-                    "updated_at": datetime.utcnow()
-                }
-            }
+        if status == DistributionStatus.APPROVED.value:
+            update_data["approval_date"] = now
+            update_data["approved_by"] = str(user["_id"])
+            update_data["approved_by_name"] = user["name"]
+        elif status == DistributionStatus.DELIVERED.value:
+            update_data["delivery_date"] = now
+        
+        if notes:
+            update_data["notes"] = notes
+        
+        distribution = await transition_status(
+            db.distributions,
+            distribution_id,
+            DISTRIBUTION_TRANSITIONS[status],
+            update_data,
+            expected_version=expected_version,
+            session=session
         )
-    
-    elif status == DistributionStatus.DELIVERED.value:
-        update_data["delivery_date"] = datetime.utcnow()
+        if not distribution:
+            return False
+        
+        uow.after_commit(stats_counter_service.record_update, "distributions", distribution, update_data)
+        uow.after_commit(report_cache_service.invalidate, "distributions")
+        
+        if status in [DistributionStatus.APPROVED.value, DistributionStatus.REJECTED.value]:
+            # Decide the pending approval record with it
+            approval_update = {
+                "status": status,
+                "approved_by": str(user["_id"]),
+                "approved_by_name": user["name"],
+                "approval_date": now,
+                "updated_at": now
+            }
+            if status == DistributionStatus.REJECTED.value:
+                approval_update["rejection_reason"] = notes
+            
+            approval = await db.approvals.find_one_and_update(
+                {"entity_id": distribution_id, "approval_type": "distribution", "status": "pending"},
+                {"$set": approval_update, "$inc": {"version": 1}},
+                return_document=ReturnDocument.BEFORE,
+                session=session
+            )
+            uow.after_commit(stats_counter_service.record_update, "approvals", approval, {"status": status})
         
-        # Update device holders
-        for device_id in distribution["device_ids"]:
-            await device_service.update_device_holder(
-                device_id=device_id,
+        elif status == DistributionStatus.DELIVERED.value:
+            # Update device holders
+            await device_service.transfer_devices(
+                device_ids=distribution["device_ids"],
                 holder_id=distribution["to_user_id"],
                 holder_name=distribution["to_user_name"],
                 holder_type=distribution["to_user_type"],
@@ -208,36 +246,18 @@ async def update_distribution_status(
                 performed_by_name=user["name"],
                 from_user_id=distribution["from_user_id"],
                 from_user_name=distribution["from_user_name"],
-                notes=f"Distributed via {distribution['distribution_id']}"
+                notes=f"Distributed via {distribution['distribution_id']}",
+                uow=uow
             )
-    
-    elif status == DistributionStatus.REJECTED.value:
-        # Update approval record
-        await db.approvals.update_one(
-            {"entity_id": distribution_id, "approval_type": "distribution"},
-            {
-                "$set": {
-                    "status": "rejected",
-                    "approved_by": str(user["_id"]),
-                    "approved_by_name": user["name"],
-                    "approval_date": datetime.utcnow(),
-                    "rejection_reason": notes,
-                    "updated_at": datetime.utcnow()
-                }
-            }
-        )
-    
-    if notes:
-        update_data["notes"] = notes
-    
-    result = await db.distributions.update_one(
-        {"_id": ObjectId(distribution_id)},
-        {"$set": update_data}
-    )
-    
-    if result.modified_count > 0:
+        
+        await approval_service.sync_entity_snapshot("distribution", {**distribution, **update_data}, uow=uow)
+        
+        if status in [DistributionStatus.REJECTED.value, DistributionStatus.CANCELLED.value]:
+            await device_service.release_reservations([distribution_id], uow=uow)
+        
         # Send notification
-        await notification_service.create_notification(
+        uow.after_commit(
+            notification_service.create_notification,
             user_id=distribution["from_user_id"],
             title=f"Distribution {status.capitalize()}",
             message=f"Your distribution request {distribution['distribution_id']} has been {status}",
@@ -245,42 +265,55 @@ async def update_distribution_status(
             category="distribution",
             link=f"/distributions/{distribution_id}"
         )
-        
+        return True
+    
+    if await run_in_transaction(transition):
         return await get_distribution_by_id(distribution_id)
     return None
 
 
 async def cancel_distribution(distribution_id: str, user_id: str) -> bool:
-    """Cancel a distribution (only by creator)"""
+    """Cancel a distribution (only by creator, only while pending)"""
     db = get_database()
     
-    distribution = await db.distributions.find_one({"_id": ObjectId(distribution_id)})
-    if not distribution:
-        return False
-    
-    # Check if user is the creator
-    if distribution["created_by"] != user_id:
-        raise ValueError("Only the creator can cancel this distribution")
-    
-    # Check if distribution is still pending
-    if distribution["status"] != DistributionStatus.PENDING.value:
-        raise ValueError("Only pending distributions can be cancelled")
-    
-    result = await db.distributions.update_one(
-        {"_id": ObjectId(distribution_id)},
-        {
-            "$set": {
-                "status": DistributionStatus.CANCELLED.value,
-                "updated_at": datetime.utcnow()
-            }
+    async def transition(uow: UnitOfWork) -> bool:
+        session = uow.session
+        changes = {
+            "status": DistributionStatus.CANCELLED.value,
+            "updated_at": datetime.utcnow()
         }
-    )
-    
-    if result.modified_count > 0:
+        
+        try:
+            distribution = await transition_status(
+                db.distributions,
+                distribution_id,
+                DISTRIBUTION_TRANSITIONS[DistributionStatus.CANCELLED.value],
+                changes,
+                guard={"created_by": user_id},
+                conflict_message="Only pending distributions can be cancelled",
+                session=session
+            )
+        except ConflictError as e:
+            # Check if user is the creator
+            if e.current.get("created_by") != user_id:
+                raise ValueError("Only the creator can cancel this distribution")
+            raise
+        if not distribution:
+            return False
+        
+        uow.after_commit(stats_counter_service.record_update, "distributions", distribution, changes)
+        uow.after_commit(report_cache_service.invalidate, "distributions")
+        await device_service.release_reservations([distribution_id], uow=uow)
+        
         # Update approval record
-        await db.approvals.delete_one({"entity_id": distribution_id, "approval_type": "distribution"})
+        approval = await db.approvals.find_one_and_delete(
+            {"entity_id": distribution_id, "approval_type": "distribution"},
+            session=session
+        )
+        uow.after_commit(stats_counter_service.record_delete, "approvals", approval)
         return True
-    return False
+    
+    return await run_in_transaction(transition)
 
 
 async def get_pending_distributions() -> List[Dict[str, Any]]:
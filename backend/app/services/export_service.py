@@ -0,0 +1,388 @@
+import asyncio
+import csv
+import io
+import json
+import os
+import zlib
+from datetime import datetime, timedelta
+from typing import Optional, List, Dict, Any, AsyncIterator, Set
+from bson import ObjectId
+
+from app.config import settings
+from app.database import get_database, get_analytics_database
+from app.models.export import ExportRequest, ExportJobStatus
+from app.utils.helpers import serialize_doc
+
+# Per export type: source collection, exported fields (column order), the field
+# the status and date filters apply to, and an index-backed sort
+EXPORT_SPECS: Dict[str, Dict[str, Any]] = {
+    "devices": {
+        "collection": "devices",
+        "fields": [
+            "device_id", "device_type", "model", "serial_number", "mac_address",
+            "manufacturer", "status", "current_holder_name", "current_holder_type",
+            "current_location", "purchase_date", "warranty_expiry", "created_at", "updated_at"
+        ],
+        "status_field": "status",
+        "date_field": "created_at",
+        "sort": [("created_at", -1), ("_id", -1)]
+    },
+    "distributions": {
+        "collection": "distributions",
+        "fields": [
+            "distribution_id", "device_count", "from_user_name", "from_user_type",
+            "to_user_name", "to_user_type", "status", "request_date", "approval_date",
+            "delivery_date", "approved_by_name", "notes", "created_at", "updated_at"
+        ],
+        "status_field": "status",
+        "date_field": "created_at",
+        "sort": [("created_at", -1), ("_id", -1)]
+    },
+    "defects": {
+        "collection": "defects",
+        "fields": [
+            "report_id", "device_id", "device_serial", "device_type", "reported_by_name",
+            "defect_type", "severity", "description", "status", "resolution",
+            "resolved_by_name", "resolved_at", "created_at", "updated_at"
+        ],
+        "status_field": "status",
+        "date_field": "created_at",
+        "sort": [("created_at", -1), ("_id", -1)]
+    },
+    "returns": {
+        "collection": "returns",
+        "fields": [
+            "return_id", "device_id", "device_serial", "device_type", "requested_by_name",
+            "return_to_name", "reason", "description", "status", "request_date",
+            "approval_date", "received_date", "approved_by_name", "created_at", "updated_at"
+        ],
+        "status_field": "status",
+        "date_field": "created_at",
+        "sort": [("created_at", -1), ("_id", -1)]
+    },
+    "device_history": {
+        "collection": "device_history",
+        "fields": [
+            "device_id", "action", "from_user_name", "to_user_name", "status_before",
+            "status_after", "location", "notes", "performed_by_name", "timestamp"
+        ],
+        "status_field": "action",
+        "date_field": "timestamp",
+        "sort": [("timestamp", -1)]
+    }
+}
+
+CONTENT_TYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson"
+}
+GZIP_CONTENT_TYPE = "application/gzip"
+
+# Encoded output is flushed in chunks of about this size
+CHUNK_SIZE = 64 * 1024
+
+_jobs: Set[asyncio.Task] = set()
+_job_slots: Optional[asyncio.Semaphore] = None
+
+
+def build_export_query(request: ExportRequest) -> Dict[str, Any]:
+    """Build the MongoDB filter of an export"""
+    spec = EXPORT_SPECS[request.report_type.value]
+    query: Dict[str, Any] = {}
+
+    if request.status:
+        query[spec["status_field"]] = request.status
+
+    if request.date_from or request.date_to:
+        if request.date_from and request.date_to and request.date_from > request.date_to:
+            raise ValueError("date_from must not be after date_to")
+        date_range = {}
+        if request.date_from:
+            date_range["$gte"] = request.date_from
+        if request.date_to:
+            date_range["$lte"] = request.date_to
+        query[spec["date_field"]] = date_range
+
+    return query
+
+
+def export_filename(request: ExportRequest) -> str:
+    """File name of an export, e.g. devices-20240101-120000.csv.gz"""
+    stamp = datetime.utcnow().strftime("%Y%m%d-%H%M%S")
+    name = f"{request.report_type.value}-{stamp}.{request.format.value}"
+    return f"{name}.gz" if request.compress else name
+
+
+def export_media_type(request: ExportRequest) -> str:
+    return GZIP_CONTENT_TYPE if request.compress else CONTENT_TYPES[request.format.value]
+
+
+def _cell(value: Any) -> str:
+    """Flatten a field value into a CSV cell"""
+    if value is None:
+        return ""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, (list, dict)):
+        return json.dumps(value, default=str)
+    return str(value)
+
+
+async def _encode(
+    cursor,
+    fields: List[str],
+    format: str,
+    progress: Dict[str, int]
+) -> AsyncIterator[str]:
+    """Encode documents from a cursor as CSV or NDJSON text chunks"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer) if format == "csv" else None
+    if writer:
+        writer.writerow(fields)
+
+    async for doc in cursor:
+        if writer:
+            writer.writerow([_cell(doc.get(field)) for field in fields])
+        else:
+            row = serialize_doc({field: doc.get(field) for field in fields})
+            buffer.write(json.dumps(row, default=str))
+            buffer.write("\n")
+        progress["rows"] += 1
+
+        if buffer.tell() >= CHUNK_SIZE:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+async def stream_export(
+    request: ExportRequest,
+    progress: Optional[Dict[str, int]] = None
+) -> AsyncIterator[bytes]:
+    """
+    Stream an export as encoded (and optionally gzip-compressed) bytes.
+
+    Documents are read in batches of EXPORT_BATCH_SIZE with a projection of
+    the exported fields only, so memory stays constant whatever the export
+    size. Reads go to the analytics handle.
+    """
+    spec = EXPORT_SPECS[request.report_type.value]
+    query = build_export_query(request)
+    progress = progress if progress is not None else {}
+    progress.setdefault("rows", 0)
+
+    db = get_analytics_database()
+    projection = {"_id": 0, **{field: 1 for field in spec["fields"]}}
+    cursor = db[spec["collection"]].find(query, projection).sort(spec["sort"]).batch_size(
+        settings.EXPORT_BATCH_SIZE
+    )
+    compressor = zlib.compressobj(settings.EXPORT_GZIP_LEVEL, zlib.DEFLATED, 31) if request.compress else None
+
+    try:
+        async for text in _encode(cursor, spec["fields"], request.format.value, progress):
+            data = text.encode("utf-8")
+            if compressor:
+                data = compressor.compress(data)
+            if data:
+                yield data
+        if compressor:
+            yield compressor.flush()
+    finally:
+        await cursor.close()
+
+
+# ==================== EXPORT JOBS ====================
+
+def _export_dir() -> str:
+    os.makedirs(settings.EXPORT_DIR, exist_ok=True)
+    return settings.EXPORT_DIR
+
+
+def export_file_path(job: Dict[str, Any]) -> str:
+    """Local path of a job's export file"""
+    return os.path.join(_export_dir(), f"{job['_id']}-{job['filename']}")
+
+
+async def create_export_job(request: ExportRequest, user: dict) -> Dict[str, Any]:
+    """Queue an export to be written to the file store in the background"""
+    db = get_database()
+    build_export_query(request)  # validate before queueing
+
+    await cleanup_exports()
+
+    now = datetime.utcnow()
+    job = {
+        "report_type": request.report_type.value,
+        "format": request.format.value,
+        "compress": request.compress,
+        "request": request.model_dump(mode="json"),
+        "filename": export_filename(request),
+        "media_type": export_media_type(request),
+        "status": ExportJobStatus.PENDING.value,
+        "rows": 0,
+        "size_bytes": None,
+        "error": None,
+        "created_by": user["id"],
+        "created_by_name": user["name"],
+        "created_at": now,
+        "started_at": None,
+        "completed_at": None,
+        "heartbeat_at": now,
+        "expires_at": now + timedelta(hours=settings.EXPORT_RETENTION_HOURS)
+    }
+    result = await db.export_jobs.insert_one(job)
+    job["_id"] = result.inserted_id
+
+    task = asyncio.create_task(_run_export_job(job, request))
+    _jobs.add(task)
+    task.add_done_callback(_jobs.discard)
+
+    return serialize_doc(job)
+
+
+async def _heartbeat(job_id: ObjectId) -> None:
+    """Mark a job as alive until cancelled, so fail_orphaned_exports leaves it alone"""
+    db = get_database()
+    while True:
+        await asyncio.sleep(settings.EXPORT_HEARTBEAT_SECONDS)
+        await db.export_jobs.update_one({"_id": job_id}, {"$set": {"heartbeat_at": datetime.utcnow()}})
+
+
+async def _run_export_job(job: Dict[str, Any], request: ExportRequest) -> None:
+    """Write an export to its file, recording progress on the job"""
+    heartbeat = asyncio.create_task(_heartbeat(job["_id"]))
+    try:
+        await _write_export_job(job, request)
+    finally:
+        heartbeat.cancel()
+
+
+async def _write_export_job(job: Dict[str, Any], request: ExportRequest) -> None:
+    """Wait for a job slot, then stream the export into the job's file"""
+    global _job_slots
+    if _job_slots is None:
+        _job_slots = asyncio.Semaphore(settings.EXPORT_MAX_CONCURRENT_JOBS)
+
+    db = get_database()
+    path = export_file_path(job)
+    partial = f"{path}.part"
+    progress = {"rows": 0}
+
+    async with _job_slots:
+        await db.export_jobs.update_one(
+            {"_id": job["_id"]},
+            {"$set": {"status": ExportJobStatus.RUNNING.value, "started_at": datetime.utcnow()}}
+        )
+        try:
+            with open(partial, "wb") as f:
+                async for chunk in stream_export(request, progress):
+                    await asyncio.to_thread(f.write, chunk)
+            os.replace(partial, path)
+        except BaseException as e:
+            if os.path.exists(partial):
+                os.remove(partial)
+            error = "Export cancelled" if isinstance(e, asyncio.CancelledError) else str(e)
+            await asyncio.shield(db.export_jobs.update_one(
+                {"_id": job["_id"]},
+                {"$set": {
+                    "status": ExportJobStatus.FAILED.value,
+                    "rows": progress["rows"],
+                    "error": error,
+                    "completed_at": datetime.utcnow()
+                }}
+            ))
+            print(f"❌ Export {job['_id']} failed: {error}")
+            if isinstance(e, asyncio.CancelledError):
+                raise
+            return
+
+    await db.export_jobs.update_one(
+        {"_id": job["_id"]},
+        {"$set": {
+            "status": ExportJobStatus.COMPLETED.value,
+            "rows": progress["rows"],
+            "size_bytes": os.path.getsize(path),
+            "completed_at": datetime.utcnow()
+        }}
+    )
+
+
+async def get_export_job(job_id: str, user: dict) -> Optional[Dict[str, Any]]:
+    """Get an export job; users only see their own jobs, admins see all"""
+    db = get_database()
+
+    try:
+        query: Dict[str, Any] = {"_id": ObjectId(job_id)}
+    except Exception:
+        return None
+    if user["role"] != "admin":
+        query["created_by"] = user["id"]
+
+    return await db.export_jobs.find_one(query)
+
+
+async def delete_expired_exports() -> int:
+    """Delete expired export jobs and their files"""
+    db = get_database()
+
+    expired = await db.export_jobs.find(
+        {"expires_at": {"$lt": datetime.utcnow()}},
+        {"filename": 1}
+    ).to_list(None)
+
+    for job in expired:
+        path = export_file_path(job)
+        if os.path.exists(path):
+            os.remove(path)
+
+    if expired:
+        await db.export_jobs.delete_many({"_id": {"$in": [job["_id"] for job in expired]}})
+    return len(expired)
+
+
+async def fail_orphaned_exports() -> int:
+    """Mark failed the pending/running jobs whose worker stopped without finishing them"""
+    db = get_database()
+
+    query = {
+        "status": {"$in": [ExportJobStatus.PENDING.value, ExportJobStatus.RUNNING.value]},
+        "$or": [
+            {"heartbeat_at": {"$lt": datetime.utcnow() - timedelta(seconds=3 * settings.EXPORT_HEARTBEAT_SECONDS)}},
+            {"heartbeat_at": None}
+        ]
+    }
+    orphaned = await db.export_jobs.find(query, {"filename": 1}).to_list(None)
+    if not orphaned:
+        return 0
+
+    for job in orphaned:
+        partial = f"{export_file_path(job)}.part"
+        if os.path.exists(partial):
+            os.remove(partial)
+    result = await db.export_jobs.update_many(
+        {"_id": {"$in": [job["_id"] for job in orphaned]}, **query},
+        {"$set": {
+            "status": ExportJobStatus.FAILED.value,
+            "error": "Export interrupted by a server restart",
+            "completed_at": datetime.utcnow()
+        }}
+    )
+    return result.modified_count
+
+
+async def cleanup_exports() -> None:
+    """Fail orphaned export jobs and delete expired ones (startup, and before queueing a job)"""
+    orphaned = await fail_orphaned_exports()
+    expired = await delete_expired_exports()
+    if orphaned or expired:
+        print(f"🧹 Exports cleaned up: {orphaned} orphaned jobs failed, {expired} expired jobs deleted")
+
+
+async def stop_export_jobs() -> None:
+    """Cancel running export jobs (shutdown); they are marked failed"""
+    for task in list(_jobs):
+        task.cancel()
+    await asyncio.gather(*_jobs, return_exceptions=True)
@@ -1,17 +1,30 @@
+import asyncio
+import json
 from datetime import datetime
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, AsyncIterator
 from bson import ObjectId
 
+from app.config import settings
 from app.database import get_database
 from app.models.notification import NotificationCreate, NotificationType, NotificationCategory
-from app.utils.helpers import serialize_doc, serialize_docs, get_pagination
+from app.utils.helpers import serialize_doc, serialize_docs, paginate
+from app.utils.pubsub import PubSub, Subscription, CLOSED, RESYNC
+
+# Live notification streams, one topic per user id
+notification_pubsub = PubSub(
+    max_subscribers=settings.NOTIFICATION_STREAM_MAX_CONNECTIONS,
+    queue_size=settings.NOTIFICATION_STREAM_QUEUE_SIZE
+)
 
 
 async def get_notifications(
     user_id: str,
     page: int = 1,
     page_size: int = 20,
-    is_read: Optional[bool] = None
+    is_read: Optional[bool] = None,
+    after: Optional[str] = None,
+    cursor: bool = False,
+    include_total: bool = False
 ) -> Dict[str, Any]:
     """Get user notifications with pagination"""
     db = get_database()
@@ -21,17 +34,15 @@ async def get_notifications(
     if is_read is not None:
         query["is_read"] = is_read
     
-    # Get total count
-    total = await db.notifications.count_documents(query)
-    
     # Get paginated results
-    skip = (page - 1) * page_size
-    cursor = db.notifications.find(query).skip(skip).limit(page_size).sort("created_at", -1)
-    notifications = await cursor.to_list(length=page_size)
+    notifications, pagination = await paginate(
+        db.notifications, query, page, page_size,
+        after=after, cursor=cursor, include_total=include_total
+    )
     
     return {
         "data": serialize_docs(notifications),
-        "pagination": get_pagination(page, page_size, total)
+        "pagination": pagination
     }
 
 
@@ -41,19 +52,18 @@ async def get_unread_count(user_id: str) -> int:
     return await db.notifications.count_documents({"user_id": user_id, "is_read": False})
 
 
-async def create_notification(
+def build_notification(
     user_id: str,
     title: str,
     message: str,
     notification_type: str = "info",
     category: str = "system",
     link: Optional[str] = None,
-    metadata: Optional[Dict[str, Any]] = None
+    metadata: Optional[Dict[str, Any]] = None,
+    now: Optional[datetime] = None
 ) -> Dict[str, Any]:
-    """Create a new notification"""
-    db = get_database()
-    
-    notification_doc = {
+    """Build a notification document"""
+    return {
         "user_id": user_id,
         "title": title,
         "message": message,
@@ -62,15 +72,101 @@ async def create_notification(
         "is_read": False,
         "link": link,
         "metadata": metadata,
-        "created_at": datetime.utcnow()
+        "created_at": now or datetime.utcnow()
     }
+
+
+async def insert_notifications(docs: List[Dict[str, Any]]) -> int:
+    """Write notification documents with a single insert_many"""
+    if not docs:
+        return 0
     
-    result = await db.notifications.insert_one(notification_doc)
-    notification_doc["_id"] = result.inserted_id
+    db = get_database()
+    result = await db.notifications.insert_many(docs, ordered=False)
+    _publish_created(docs)
+    return len(result.inserted_ids)
+
+
+def _publish_created(docs: List[Dict[str, Any]]) -> None:
+    """Push new notifications and unread deltas to connected users"""
+    unread: Dict[str, int] = {}
+    for doc in docs:
+        if notification_pubsub.has_subscribers(doc["user_id"]):
+            notification_pubsub.publish(doc["user_id"], {"event": "notification", "data": serialize_doc(doc)})
+            unread[doc["user_id"]] = unread.get(doc["user_id"], 0) + 1
+    for user_id, delta in unread.items():
+        _publish_unread_delta(user_id, delta)
+
+
+def _publish_unread_delta(user_id: str, delta: int) -> None:
+    if delta:
+        notification_pubsub.publish(user_id, {"event": "unread_delta", "data": {"delta": delta}})
+
+
+async def create_notification(
+    user_id: str,
+    title: str,
+    message: str,
+    notification_type: str = "info",
+    category: str = "system",
+    link: Optional[str] = None,
+    metadata: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    """Create a new notification"""
+    notification_doc = build_notification(
+        user_id, title, message, notification_type, category, link, metadata
+    )
+    await insert_notifications([notification_doc])
     
     return serialize_doc(notification_doc)
 
 
+async def create_notifications(
+    user_ids: List[str],
+    title: str,
+    message: str,
+    notification_type: str = "info",
+    category: str = "system",
+    link: Optional[str] = None,
+    metadata: Optional[Dict[str, Any]] = None
+) -> List[Dict[str, Any]]:
+    """Create the same notification for many users with one insert_many"""
+    now = datetime.utcnow()
+    docs = [
+        build_notification(user_id, title, message, notification_type, category, link, metadata, now)
+        for user_id in user_ids
+    ]
+    await insert_notifications(docs)
+    
+    return serialize_docs(docs)
+
+
+async def dispatch_notifications(
+    user_ids: List[str],
+    title: str,
+    message: str,
+    notification_type: str = "info",
+    category: str = "system",
+    link: Optional[str] = None,
+    metadata: Optional[Dict[str, Any]] = None
+) -> int:
+    """
+    Queue the same notification for many users without waiting for the write.
+    
+    Falls back to writing inline when the background dispatcher is not
+    running (disabled, or outside the app lifespan).
+    """
+    now = datetime.utcnow()
+    docs = [
+        build_notification(user_id, title, message, notification_type, category, link, metadata, now)
+        for user_id in user_ids
+    ]
+    
+    if dispatcher.running:
+        return await dispatcher.enqueue(docs)
+    return await insert_notifications(docs)
+
+
 async def mark_as_read(notification_id: str, user_id: str) -> bool:
     """Mark notification as read"""
     db = get_database()
@@ -79,6 +175,7 @@ async def mark_as_read(notification_id: str, user_id: str) -> bool:
         {"_id": ObjectId(notification_id), "user_id": user_id},
         {"$set": {"is_read": True}}
     )
+    _publish_unread_delta(user_id, -result.modified_count)
     
     return result.modified_count > 0
 
@@ -91,6 +188,7 @@ async def mark_all_as_read(user_id: str) -> int:
         {"user_id": user_id, "is_read": False},
         {"$set": {"is_read": True}}
     )
+    _publish_unread_delta(user_id, -result.modified_count)
     
     return result.modified_count
 
@@ -99,11 +197,14 @@ async def delete_notification(notification_id: str, user_id: str) -> bool:
     """Delete notification"""
     db = get_database()
     
-    result = await db.notifications.delete_one(
-        {"_id": ObjectId(notification_id), "user_id": user_id}
+    deleted = await db.notifications.find_one_and_delete(
+        {"_id": ObjectId(notification_id), "user_id": user_id},
+        projection={"is_read": 1}
     )
+    if deleted and not deleted.get("is_read"):
+        _publish_unread_delta(user_id, -1)
     
-    return result.deleted_count > 0
+    return deleted is not None
 
 
 async def delete_old_notifications(days: int = 30) -> int:
@@ -116,6 +217,9 @@ async def delete_old_notifications(days: int = 30) -> int:
     result = await db.notifications.delete_many(
         {"created_at": {"$lt": cutoff_date}}
     )
+    if result.deleted_count:
+        # Unread counts of any user may have changed: let every stream reload
+        notification_pubsub.broadcast(RESYNC)
     
     return result.deleted_count
 
@@ -129,26 +233,165 @@ async def send_bulk_notification(
     link: Optional[str] = None
 ) -> int:
     """Send notification to multiple users"""
-    db = get_database()
+    notifications = await create_notifications(
+        user_ids, title, message, notification_type, category, link
+    )
+    return len(notifications)
+
+
+def subscribe(user_id: str) -> Subscription:
+    """Open a live notification stream for a user (raises SubscriberLimitError at the cap)"""
+    return notification_pubsub.subscribe(user_id)
+
+
+def unsubscribe(subscription: Subscription) -> None:
+    """Close a live notification stream"""
+    notification_pubsub.unsubscribe(subscription)
+
+
+def format_sse(event: str, data: Dict[str, Any]) -> str:
+    """Format one Server-Sent Events message"""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+async def stream_notifications(
+    subscription: Subscription,
+    heartbeat: float = settings.NOTIFICATION_STREAM_HEARTBEAT_SECONDS
+) -> AsyncIterator[str]:
+    """
+    Yield Server-Sent Events for a subscription.
     
-    notifications = []
-    now = datetime.utcnow()
+    Starts with the absolute unread count, then pushes `notification` and
+    `unread_delta` events as they happen, with a comment line every
+    `heartbeat` seconds to keep proxies from closing an idle connection.
+    A subscriber that fell behind gets `resync` with a fresh unread count.
+    """
+    user_id = subscription.topic
+    try:
+        yield "retry: 5000\n\n"
+        yield format_sse("unread_count", {"count": await get_unread_count(user_id)})
+        
+        while True:
+            event = await subscription.get(timeout=heartbeat)
+            if event is None:
+                yield ": heartbeat\n\n"
+            elif event is CLOSED:
+                break
+            elif event is RESYNC:
+                yield format_sse("resync", {"count": await get_unread_count(user_id)})
+            else:
+                yield format_sse(event["event"], event["data"])
+    finally:
+        unsubscribe(subscription)
+
+
+_STOP = object()
+
+
+class NotificationDispatcher:
+    """
+    Background writer for notifications.
     
-    for user_id in user_ids:
-        notifications.append({
-            "user_id": user_id,
-            "title": title,
-            "message": message,
-            "type": notification_type,
-            "category": category,
-            "is_read": False,
-            "link": link,
-            "metadata": None,
-            "created_at": now
-        })
-    
-    if notifications:
-        result = await db.notifications.insert_many(notifications)
-        return len(result.inserted_ids)
-    
-    return 0
+    Request handlers enqueue documents and return immediately; a single
+    worker task collects up to `batch_size` documents (or whatever arrived
+    within `flush_interval` seconds) and writes them with one insert_many.
+    The queue is bounded, so a slow database pushes back on producers
+    instead of growing memory without limit.
+    """
+    
+    def __init__(self, maxsize: int, batch_size: int, flush_interval: float):
+        self.maxsize = maxsize
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.delivered = 0
+        self.failed = 0
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._accepting = False
+        self._producers = 0
+        self._idle = asyncio.Event()
+    
+    @property
+    def running(self) -> bool:
+        return self._accepting and self._worker is not None and not self._worker.done()
+    
+    def start(self) -> None:
+        """Start the worker task on the running event loop"""
+        if self.running:
+            return
+        self._queue = asyncio.Queue(maxsize=self.maxsize)
+        self._idle.set()
+        self._worker = asyncio.create_task(self._run())
+        self._accepting = True
+    
+    async def stop(self) -> None:
+        """Stop accepting work and drain everything already queued"""
+        if self._worker is None:
+            return
+        # New notifications are written inline from here on; producers still
+        # blocked on a full queue finish before the stop marker is queued, so
+        # nothing can land behind it
+        self._accepting = False
+        await self._idle.wait()
+        worker = self._worker
+        self._worker = None
+        if not worker.done():
+            await self._queue.put(_STOP)
+        await worker
+    
+    async def enqueue(self, docs: List[Dict[str, Any]]) -> int:
+        """Queue documents for delivery, waiting only while the queue is full"""
+        if not self._accepting:
+            return await insert_notifications(docs)
+        self._producers += 1
+        self._idle.clear()
+        try:
+            for doc in docs:
+                await self._queue.put(doc)
+        finally:
+            self._producers -= 1
+            if self._producers == 0:
+                self._idle.set()
+        return len(docs)
+    
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        stopping = False
+        
+        while not stopping:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.flush_interval
+            while len(batch) < self.batch_size and batch[-1] is not _STOP:
+                try:
+                    batch.append(self._queue.get_nowait())
+                    continue
+                except asyncio.QueueEmpty:
+                    pass
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            
+            if batch[-1] is _STOP:
+                stopping = True
+                batch.pop()
+            await self._flush(batch)
+    
+    async def _flush(self, docs: List[Dict[str, Any]]) -> None:
+        if not docs:
+            return
+        try:
+            self.delivered += await insert_notifications(docs)
+        except Exception as e:
+            self.failed += len(docs)
+            print(f"❌ Failed to deliver {len(docs)} notifications: {e}")
+
+
+dispatcher = NotificationDispatcher(
+    maxsize=settings.NOTIFICATION_QUEUE_SIZE,
+    batch_size=settings.NOTIFICATION_BATCH_SIZE,
+    flush_interval=settings.NOTIFICATION_FLUSH_INTERVAL_SECONDS
+)
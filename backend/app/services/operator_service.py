@@ -1,10 +1,13 @@
 from datetime import datetime
 from typing import Optional, List, Dict, Any
 from bson import ObjectId
+from pymongo import ReturnDocument
 
 from app.database import get_database
 from app.models.operator import OperatorCreate, OperatorUpdate, OperatorStatus
-from app.utils.helpers import serialize_doc, serialize_docs, get_pagination, generate_operator_id
+from app.services.search_service import add_search_filter, search_fields, refresh_search_tokens
+from app.utils.concurrency import gather_bounded
+from app.utils.helpers import serialize_doc, serialize_docs, paginate, generate_operator_id
 
 
 async def get_operators(
@@ -12,7 +15,10 @@ async def get_operators(
     page_size: int = 20,
     assigned_to: Optional[str] = None,
     status: Optional[str] = None,
-    search: Optional[str] = None
+    search: Optional[str] = None,
+    after: Optional[str] = None,
+    cursor: bool = False,
+    include_total: bool = False
 ) -> Dict[str, Any]:
     """Get all operators with pagination and filters"""
     db = get_database()
@@ -24,24 +30,17 @@ async def get_operators(
     if status:
         query["status"] = status
     if search:
-        query["$or"] = [
-            {"name": {"$regex": search, "$options": "i"}},
-            {"phone": {"$regex": search, "$options": "i"}},
-            {"email": {"$regex": search, "$options": "i"}},
-            {"area": {"$regex": search, "$options": "i"}}
-        ]
-    
-    # Get total count
-    total = await db.operators.count_documents(query)
+        add_search_filter(query, "operators", search)
     
     # Get paginated results
-    skip = (page - 1) * page_size
-    cursor = db.operators.find(query).skip(skip).limit(page_size).sort("created_at", -1)
-    operators = await cursor.to_list(length=page_size)
+    operators, pagination = await paginate(
+        db.operators, query, page, page_size,
+        after=after, cursor=cursor, include_total=include_total
+    )
     
     return {
         "data": serialize_docs(operators),
-        "pagination": get_pagination(page, page_size, total)
+        "pagination": pagination
     }
 
 
@@ -78,6 +77,7 @@ async def create_operator(operator_data: OperatorCreate, created_by: Dict[str, A
         "updated_at": now
     }
     
+    operator_doc.update(search_fields("operators", operator_doc))
     result = await db.operators.insert_one(operator_doc)
     operator_doc["_id"] = result.inserted_id
     
@@ -101,12 +101,14 @@ async def update_operator(operator_id: str, operator_data: OperatorUpdate) -> Op
     
     update_dict["updated_at"] = datetime.utcnow()
     
-    result = await db.operators.update_one(
+    before = await db.operators.find_one_and_update(
         {"_id": ObjectId(operator_id)},
-        {"$set": update_dict}
+        {"$set": update_dict},
+        return_document=ReturnDocument.BEFORE
     )
     
-    if result.modified_count > 0 or result.matched_count > 0:
+    if before:
+        await refresh_search_tokens("operators", before, update_dict)
         return await get_operator_by_id(operator_id)
     return None
 
@@ -149,12 +151,8 @@ async def get_operator_stats(assigned_to: Optional[str] = None) -> Dict[str, int
     if assigned_to:
         query["assigned_to"] = assigned_to
     
-    total = await db.operators.count_documents(query)
-    active = await db.operators.count_documents({**query, "status": "active"})
-    inactive = await db.operators.count_documents({**query, "status": "inactive"})
-    
-    return {
-        "total": total,
-        "active": active,
-        "inactive": inactive
-    }
+    return await gather_bounded({
+        "total": db.operators.count_documents(query),
+        "active": db.operators.count_documents({**query, "status": "active"}),
+        "inactive": db.operators.count_documents({**query, "status": "inactive"})
+    })
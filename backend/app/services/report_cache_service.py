@@ -0,0 +1,160 @@
+import hashlib
+import json
+import time
+from abc import ABC, abstractmethod
+from typing import Optional, List, Dict, Any, Awaitable, Callable, Iterable, Tuple
+
+from app.config import settings
+from app.database import get_database, read_from_primary
+from app.utils.cache import TTLCache
+
+# Collections each report is computed from; a write to any of them invalidates it
+REPORT_DEPENDENCIES: Dict[str, List[str]] = {
+    "inventory": ["devices"],
+    "distribution_summary": ["distributions"],
+    "defect_summary": ["defects"],
+    "return_summary": ["returns"],
+    "user_activity": ["users", "device_history"],
+    "device_utilization": ["devices"]
+}
+
+
+class ReportCacheBackend(ABC):
+    """
+    Storage for cached reports.
+
+    Entries are (report, etag) pairs. Tags are per-collection versions, the
+    time of the collection's last invalidation: bumping a tag makes every key
+    built with the old version unreachable, so invalidation never has to scan
+    entries. A shared backend (e.g. Redis) can implement the same four
+    methods to share the entries as well.
+    """
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[Tuple[Any, str]]:
+        ...
+
+    @abstractmethod
+    async def set(self, key: str, value: Tuple[Any, str], ttl: float) -> None:
+        ...
+
+    @abstractmethod
+    async def get_tag_versions(self, tags: Iterable[str]) -> Dict[str, float]:
+        ...
+
+    @abstractmethod
+    async def bump_tags(self, tags: Iterable[str]) -> None:
+        ...
+
+
+class MemoryReportCacheBackend(ReportCacheBackend):
+    """
+    In-process LRU backend with per-entry TTL.
+
+    Tags live in this process too, so an invalidation only reaches this
+    worker; other workers keep serving their entries until the TTL expires.
+    Use it for a single worker, or MongoTagReportCacheBackend otherwise.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.entries = TTLCache(maxsize, ttl)
+        self.tags: Dict[str, float] = {}
+
+    async def get(self, key: str) -> Optional[Tuple[Any, str]]:
+        return self.entries.get(key)
+
+    async def set(self, key: str, value: Tuple[Any, str], ttl: float) -> None:
+        self.entries.set(key, value, ttl=ttl)
+
+    async def get_tag_versions(self, tags: Iterable[str]) -> Dict[str, float]:
+        return {tag: self.tags.get(tag, 0.0) for tag in tags}
+
+    async def bump_tags(self, tags: Iterable[str]) -> None:
+        now = time.time()
+        for tag in tags:
+            # Strictly increasing even when two bumps share a clock tick
+            self.tags[tag] = max(now, self.tags.get(tag, 0.0) + 1e-6)
+
+
+class MongoTagReportCacheBackend(MemoryReportCacheBackend):
+    """
+    In-process entries with tag versions stored in MongoDB.
+
+    Every worker reads the same tags (one _id lookup per report request), so
+    an invalidation in any worker makes the entries of all of them
+    unreachable.
+    """
+
+    async def get_tag_versions(self, tags: Iterable[str]) -> Dict[str, float]:
+        tags = list(tags)
+        versions = {tag: 0.0 for tag in tags}
+        async for doc in get_database().report_cache_tags.find({"_id": {"$in": tags}}):
+            versions[doc["_id"]] = doc["version"]
+        return versions
+
+    async def bump_tags(self, tags: Iterable[str]) -> None:
+        now = time.time()
+        db = get_database()
+        for tag in tags:
+            await db.report_cache_tags.update_one({"_id": tag}, {"$max": {"version": now}}, upsert=True)
+
+
+_backend: ReportCacheBackend = MongoTagReportCacheBackend(
+    settings.REPORT_CACHE_SIZE, settings.REPORT_CACHE_TTL_SECONDS
+)
+
+
+def set_backend(backend: ReportCacheBackend) -> None:
+    """Replace the cache backend (e.g. with a shared one)"""
+    global _backend
+    _backend = backend
+
+
+def compute_etag(report: Any) -> str:
+    """Strong ETag over the report's JSON representation"""
+    payload = json.dumps(report, sort_keys=True, default=str).encode("utf-8")
+    return f'"{hashlib.sha1(payload).hexdigest()}"'
+
+
+async def get_report(
+    name: str,
+    builder: Callable[[], Awaitable[Dict[str, Any]]],
+    params: Optional[Dict[str, Any]] = None,
+    ttl: Optional[float] = None
+) -> Tuple[Dict[str, Any], str]:
+    """
+    Get a report and its ETag from the cache, building it on a miss.
+
+    A report whose collections were invalidated within
+    ANALYTICS_MAX_STALENESS_SECONDS is built from the primary: a secondary
+    may not have the invalidating write yet, and the stale report would be
+    cached under a fresh ETag.
+    """
+    if not settings.REPORT_CACHE_ENABLED:
+        report = await builder()
+        return report, compute_etag(report)
+
+    versions = await _backend.get_tag_versions(REPORT_DEPENDENCIES.get(name, []))
+    key = json.dumps([name, params or {}, versions], sort_keys=True, default=str)
+
+    cached = await _backend.get(key)
+    if cached is not None:
+        return cached
+
+    recently_invalidated = any(
+        time.time() - version < settings.ANALYTICS_MAX_STALENESS_SECONDS
+        for version in versions.values()
+    )
+    if settings.ANALYTICS_READS_ENABLED and recently_invalidated:
+        with read_from_primary():
+            report = await builder()
+    else:
+        report = await builder()
+    etag = compute_etag(report)
+    await _backend.set(key, (report, etag), ttl or settings.REPORT_CACHE_TTL_SECONDS)
+    return report, etag
+
+
+async def invalidate(*collections: str) -> None:
+    """Invalidate every cached report computed from the given collections"""
+    await _backend.bump_tags(collections)
@@ -1,12 +1,15 @@
 from datetime import datetime
 from typing import Optional, List, Dict, Any
 from bson import ObjectId
+from pymongo import ReturnDocument
 
 from app.database import get_database
-from app.models.return_device import ReturnCreate, ReturnUpdate, ReturnStatus, ReturnReason
+from app.models.return_device import ReturnCreate, ReturnUpdate, ReturnStatus, ReturnReason, RETURN_TRANSITIONS
 from app.models.device import DeviceStatus
-from app.services import device_service, notification_service
-from app.utils.helpers import serialize_doc, serialize_docs, get_pagination, generate_return_id
+from app.services import approval_service, device_service, notification_service, report_cache_service, stats_counter_service
+from app.services.search_service import add_search_filter, search_fields
+from app.utils.helpers import serialize_doc, prepare_docs, paginate, generate_return_id
+from app.utils.transactions import ConflictError, UnitOfWork, run_in_transaction, transition_status
 
 
 async def get_returns(
@@ -15,7 +18,11 @@ async def get_returns(
     status: Optional[str] = None,
     reason: Optional[str] = None,
     requested_by: Optional[str] = None,
-    search: Optional[str] = None
+    search: Optional[str] = None,
+    after: Optional[str] = None,
+    cursor: bool = False,
+    include_total: bool = False,
+    fields: Optional[List[str]] = None
 ) -> Dict[str, Any]:
     """Get all return requests with pagination and filters"""
     db = get_database()
@@ -29,22 +36,17 @@ async def get_returns(
     if requested_by:
         query["requested_by"] = requested_by
     if search:
-        query["$or"] = [
-            {"return_id": {"$regex": search, "$options": "i"}},
-            {"device_serial": {"$regex": search, "$options": "i"}}
-        ]
-    
-    # Get total count
-    total = await db.returns.count_documents(query)
+        add_search_filter(query, "returns", search)
     
     # Get paginated results
-    skip = (page - 1) * page_size
-    cursor = db.returns.find(query).skip(skip).limit(page_size).sort("created_at", -1)
-    returns = await cursor.to_list(length=page_size)
+    returns, pagination = await paginate(
+        db.returns, query, page, page_size,
+        after=after, cursor=cursor, include_total=include_total, fields=fields
+    )
     
     return {
-        "data": serialize_docs(returns),
-        "pagination": get_pagination(page, page_size, total)
+        "data": prepare_docs(returns),
+        "pagination": pagination
     }
 
 
@@ -95,12 +97,16 @@ async def create_return(return_data: ReturnCreate, requester: Dict[str, Any]) ->
         "received_date": None,
         "approved_by": None,
         "approved_by_name": None,
+        "version": 0,
         "created_at": now,
         "updated_at": now
     }
     
+    return_doc.update(search_fields("returns", return_doc))
     result = await db.returns.insert_one(return_doc)
     return_doc["_id"] = result.inserted_id
+    await stats_counter_service.record_insert("returns", return_doc)
+    await report_cache_service.invalidate("returns")
     
     # Create approval entry
     approval_doc = {
@@ -117,10 +123,13 @@ async def create_return(return_data: ReturnCreate, requester: Dict[str, Any]) ->
         "approval_date": None,
         "rejection_reason": None,
         "notes": return_data.description,
+        "entity_snapshot": approval_service.build_entity_snapshot("return", return_doc),
+        "version": 0,
         "created_at": now,
         "updated_at": now
     }
     await db.approvals.insert_one(approval_doc)
+    await stats_counter_service.record_insert("approvals", approval_doc)
     
     # Notify return_to user
     await notification_service.create_notification(
@@ -139,81 +148,90 @@ async def update_return_status(
     return_id: str,
     status: str,
     user: Dict[str, Any],
-    notes: Optional[str] = None
+    notes: Optional[str] = None,
+    expected_version: Optional[int] = None
 ) -> Optional[Dict[str, Any]]:
-    """Update return request status"""
+    """
+    Update return request status.
+
+    The change only applies from the prior statuses allowed by
+    RETURN_TRANSITIONS (and at expected_version, if given); otherwise
+    ConflictError is raised. The return, its approval and the device holder
+    change are written as one transaction when transactions are enabled.
+    """
     db = get_database()
     
-    return_req = await db.returns.find_one({"_id": ObjectId(return_id)})
-    if not return_req:
-        return None
-    
-    update_data = {
-        "status": status,
-        "updated_at": datetime.utcnow()
-    }
-    
-    if status == ReturnStatus.APPROVED.value:
-        update_data["approval_date"] = datetime.utcnow()
-        update_data["approved_by"] = str(user["_id"])
-        update_data["approved_by_name"] = user["name"]
+    async def transition(uow: UnitOfWork) -> bool:
+        session = uow.session
+        now = datetime.utcnow()
+        update_data = {
+            "status": status,
+            "updated_at": now
+        }
         
-        # Update approval record
-        await db.approvals.update_one(
-            {"entity_id": return_id, "approval_type": "return"},
-            {
-                "$set": {
-                    "status": "approved",
-                    "approved_by": str(user["_id"]),
-                    "approved_by_name": user["name"],
-                    "approval_date": datetime.utcnow(),
-                    "updated_at": datetime.utcnow()
-                }
-            }
-        )
-    
-    elif status == ReturnStatus.RECEIVED.value:
-        update_data["received_date"] = datetime.utcnow()
+        if status == ReturnStatus.APPROVED.value:
+            update_data["approval_date"] = now
+            update_data["approved_by"] = str(user["_id"])
+            update_data["approved_by_name"] = user["name"]
+        elif status == ReturnStatus.RECEIVED.value:
+            update_data["received_date"] = now
         
-        # Update device status and holder
-        await device_service.update_device_holder(
-            device_id=return_req["device_id"],
-            holder_id=None,
-            holder_name=None,
-            holder_type="noc",
-            location="NOC",
-            status=DeviceStatus.RETURNED.value,
-            performed_by=str(user["_id"]),
-            performed_by_name=user["name"],
-            from_user_id=return_req["requested_by"],
-            from_user_name=return_req["requested_by_name"],
-            notes=f"Returned via {return_req['return_id']}"
+        return_req = await transition_status(
+            db.returns,
+            return_id,
+            RETURN_TRANSITIONS[status],
+            update_data,
+            expected_version=expected_version,
+            session=session
         )
-    
-    elif status == ReturnStatus.REJECTED.value:
-        # Update approval record
-        await db.approvals.update_one(
-            {"entity_id": return_id, "approval_type": "return"},
-            {
-                "$set": {
-                    "status": "rejected",
-                    "approved_by": str(user["_id"]),
-                    "approved_by_name": user["name"],
-                    "approval_date": datetime.utcnow(),
-                    "rejection_reason": notes,
-                    "updated_at": datetime.utcnow()
-                }
+        if not return_req:
+            return False
+        
+        uow.after_commit(stats_counter_service.record_update, "returns", return_req, update_data)
+        uow.after_commit(report_cache_service.invalidate, "returns")
+        
+        if status in [ReturnStatus.APPROVED.value, ReturnStatus.REJECTED.value]:
+            # Decide the pending approval record with it
+            approval_update = {
+                "status": status,
+                "approved_by": str(user["_id"]),
+                "approved_by_name": user["name"],
+                "approval_date": now,
+                "updated_at": now
             }
-        )
-    
-    result = await db.returns.update_one(
-        {"_id": ObjectId(return_id)},
-        {"$set": update_data}
-    )
-    
-    if result.modified_count > 0:
+            if status == ReturnStatus.REJECTED.value:
+                approval_update["rejection_reason"] = notes
+            
+            approval = await db.approvals.find_one_and_update(
+                {"entity_id": return_id, "approval_type": "return", "status": "pending"},
+                {"$set": approval_update, "$inc": {"version": 1}},
+                return_document=ReturnDocument.BEFORE,
+                session=session
+            )
+            uow.after_commit(stats_counter_service.record_update, "approvals", approval, {"status": status})
+        
+        elif status == ReturnStatus.RECEIVED.value:
+            # Update device status and holder
+            await device_service.update_device_holder(
+                device_id=return_req["device_id"],
+                holder_id=None,
+                holder_name=None,
+                holder_type="noc",
+                location="NOC",
+                status=DeviceStatus.RETURNED.value,
+                performed_by=str(user["_id"]),
+                performed_by_name=user["name"],
+                from_user_id=return_req["requested_by"],
+                from_user_name=return_req["requested_by_name"],
+                notes=f"Returned via {return_req['return_id']}",
+                uow=uow
+            )
+        
+        await approval_service.sync_entity_snapshot("return", {**return_req, **update_data}, uow=uow)
+        
         # Notify requester
-        await notification_service.create_notification(
+        uow.after_commit(
+            notification_service.create_notification,
             user_id=return_req["requested_by"],
             title=f"Return Request {status.capitalize()}",
             message=f"Your return request {return_req['return_id']} has been {status}",
@@ -221,42 +239,54 @@ async def update_return_status(
             category="return",
             link=f"/returns/{return_id}"
         )
-        
+        return True
+    
+    if await run_in_transaction(transition):
         return await get_return_by_id(return_id)
     return None
 
 
 async def cancel_return(return_id: str, user_id: str) -> bool:
-    """Cancel a return request (only by creator)"""
+    """Cancel a return request (only by creator, only while pending)"""
     db = get_database()
     
-    return_req = await db.returns.find_one({"_id": ObjectId(return_id)})
-    if not return_req:
-        return False
-    
-    # Check if user is the creator
-    if return_req["requested_by"] != user_id:
-        raise ValueError("Only the requester can cancel this return request")
-    
-    # Check if return is still pending
-    if return_req["status"] != ReturnStatus.PENDING.value:
-        raise ValueError("Only pending return requests can be cancelled")
-    
-    result = await db.returns.update_one(
-        {"_id": ObjectId(return_id)},
-        {
-            "$set": {
-                "status": ReturnStatus.CANCELLED.value,
-                "updated_at": datetime.utcnow()
-            }
+    async def transition(uow: UnitOfWork) -> bool:
+        session = uow.session
+        changes = {
+            "status": ReturnStatus.CANCELLED.value,
+            "updated_at": datetime.utcnow()
         }
-    )
-    
-    if result.modified_count > 0:
+        
+        try:
+            return_req = await transition_status(
+                db.returns,
+                return_id,
+                RETURN_TRANSITIONS[ReturnStatus.CANCELLED.value],
+                changes,
+                guard={"requested_by": user_id},
+                conflict_message="Only pending return requests can be cancelled",
+                session=session
+            )
+        except ConflictError as e:
+            # Check if user is the creator
+            if e.current.get("requested_by") != user_id:
+                raise ValueError("Only the requester can cancel this return request")
+            raise
+        if not return_req:
+            return False
+        
+        uow.after_commit(stats_counter_service.record_update, "returns", return_req, changes)
+        uow.after_commit(report_cache_service.invalidate, "returns")
+        
         # Update approval record
-        await db.approvals.delete_one({"entity_id": return_id, "approval_type": "return"})
+        approval = await db.approvals.find_one_and_delete(
+            {"entity_id": return_id, "approval_type": "return"},
+            session=session
+        )
+        uow.after_commit(stats_counter_service.record_delete, "approvals", approval)
         return True
-    return False
+    
+    return await run_in_transaction(transition)
 
 
 async def get_return_stats() -> Dict[str, Any]:
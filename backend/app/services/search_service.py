@@ -0,0 +1,113 @@
+import re
+from typing import Optional, List, Dict, Any, Set
+
+from pymongo import UpdateOne
+
+from app.database import get_database
+
+SEARCH_TOKENS_FIELD = "search_tokens"
+NGRAM_SIZE = 3
+
+# Searchable fields per collection, matching the fields each list endpoint searched before
+SEARCH_FIELDS: Dict[str, List[str]] = {
+    "devices": ["device_id", "serial_number", "mac_address", "model"],
+    "distributions": ["distribution_id", "from_user_name", "to_user_name"],
+    "defects": ["report_id", "device_serial", "description"],
+    "returns": ["return_id", "device_serial"],
+    "operators": ["name", "phone", "email", "area"],
+    "users": ["name", "email"]
+}
+
+
+def normalize(value: Any) -> str:
+    """Normalize a value for search: trimmed and lowercase"""
+    return str(value).strip().lower()
+
+
+def ngrams(text: str) -> Set[str]:
+    """Get every NGRAM_SIZE-character substring of a normalized string"""
+    return {text[i:i + NGRAM_SIZE] for i in range(len(text) - NGRAM_SIZE + 1)}
+
+
+def build_search_tokens(collection: str, doc: Dict[str, Any]) -> List[str]:
+    """Build the n-gram tokens for a document's searchable fields"""
+    tokens: Set[str] = set()
+    for field in SEARCH_FIELDS[collection]:
+        value = doc.get(field)
+        if value:
+            tokens |= ngrams(normalize(value))
+    return sorted(tokens)
+
+
+def search_fields(collection: str, doc: Dict[str, Any]) -> Dict[str, Any]:
+    """Get the search fields to store alongside a document"""
+    return {SEARCH_TOKENS_FIELD: build_search_tokens(collection, doc)}
+
+
+def touches_search_fields(collection: str, changes: Dict[str, Any]) -> bool:
+    """Check whether an update changes any searchable field"""
+    return any(field in changes for field in SEARCH_FIELDS[collection])
+
+
+def build_search_query(collection: str, search: str) -> Dict[str, Any]:
+    """
+    Build a case-insensitive substring filter over the searchable fields.
+
+    Terms of NGRAM_SIZE characters or more seek the multikey n-gram index
+    ($all of the term's n-grams) and the regex only re-checks the candidates.
+    Shorter terms have no n-gram to seek on and fall back to the regex alone.
+    """
+    pattern = re.escape(search.strip())
+    clauses = {"$or": [
+        {field: {"$regex": pattern, "$options": "i"}}
+        for field in SEARCH_FIELDS[collection]
+    ]}
+
+    grams = ngrams(normalize(search))
+    if not grams:
+        return clauses
+    return {SEARCH_TOKENS_FIELD: {"$all": sorted(grams)}, **clauses}
+
+
+def add_search_filter(query: Dict[str, Any], collection: str, search: Optional[str]) -> Dict[str, Any]:
+    """AND a search filter into an existing query"""
+    if search and search.strip():
+        query.setdefault("$and", []).append(build_search_query(collection, search))
+    return query
+
+
+async def refresh_search_tokens(collection: str, doc: Optional[Dict[str, Any]], changes: Dict[str, Any]) -> None:
+    """Recompute a document's tokens after an update touched searchable fields"""
+    if not doc or not touches_search_fields(collection, changes):
+        return
+
+    db = get_database()
+    await db[collection].update_one(
+        {"_id": doc["_id"]},
+        {"$set": search_fields(collection, {**doc, **changes})}
+    )
+
+
+async def backfill_search_tokens(batch_size: int = 1000) -> int:
+    """Populate search tokens for documents written before they existed"""
+    db = get_database()
+    updated = 0
+
+    for collection, fields in SEARCH_FIELDS.items():
+        projection = {field: 1 for field in fields}
+        cursor = db[collection].find({SEARCH_TOKENS_FIELD: {"$exists": False}}, projection).batch_size(batch_size)
+
+        operations = []
+        async for doc in cursor:
+            operations.append(UpdateOne({"_id": doc["_id"]}, {"$set": search_fields(collection, doc)}))
+            if len(operations) >= batch_size:
+                await db[collection].bulk_write(operations, ordered=False)
+                updated += len(operations)
+                operations = []
+        if operations:
+            await db[collection].bulk_write(operations, ordered=False)
+            updated += len(operations)
+
+    if updated:
+        print(f"✅ Search tokens backfilled for {updated} documents")
+    return updated
@@ -1,5 +1,6 @@
 from datetime import datetime
 from app.database import get_database
+from app.services import report_cache_service, stats_counter_service
 from app.utils.security import get_password_hash
 
 
@@ -34,6 +35,9 @@ async def seed_initial_data():
     }
     
     result = await db.users.insert_one(admin_user)
+    admin_user["_id"] = result.inserted_id
+    await stats_counter_service.record_insert("users", admin_user)
+    await report_cache_service.invalidate("users")
     print(f"✅ Admin account created: admin@dms.com / admin123")
     
     # Get admin for reference
@@ -0,0 +1,89 @@
+import asyncio
+from datetime import datetime
+from typing import Optional, Dict, Any
+
+from app.config import settings
+from app.database import create_indexes, get_database
+from app.services.approval_service import backfill_entity_snapshots
+from app.services.export_service import cleanup_exports
+from app.services.search_service import backfill_search_tokens
+from app.services.seed_service import seed_initial_data
+from app.services.stats_counter_service import ensure_counters
+
+# Background initialization progress, reported by /health/ready
+_state: Dict[str, Any] = {
+    "status": "pending",
+    "step": None,
+    "completed_steps": [],
+    "error": None,
+    "started_at": None,
+    "finished_at": None
+}
+_task: Optional[asyncio.Task] = None
+
+
+async def _index_audit() -> None:
+    if settings.INDEX_AUDIT_ON_STARTUP:
+        from app.index_audit import log_audit
+        await log_audit(get_database())
+
+
+# Run in order: seeding relies on the unique indexes, counters on the seed.
+# Writes served before the counters step are counted by its rebuild.
+INIT_STEPS = [
+    ("indexes", create_indexes),
+    ("index_audit", _index_audit),
+    ("seed", seed_initial_data),
+    ("counters", ensure_counters),
+    ("exports", cleanup_exports),
+    ("search_tokens", backfill_search_tokens),
+    ("entity_snapshots", backfill_entity_snapshots)
+]
+
+
+async def initialize() -> None:
+    """Run every initialization step, recording progress and failures"""
+    _state.update(status="running", started_at=datetime.utcnow(), completed_steps=[], error=None)
+    try:
+        for name, step in INIT_STEPS:
+            _state["step"] = name
+            await step()
+            _state["completed_steps"].append(name)
+    except asyncio.CancelledError:
+        _state.update(status="cancelled", finished_at=datetime.utcnow())
+        raise
+    except Exception as e:
+        _state.update(status="failed", error=f"{_state['step']}: {e}", finished_at=datetime.utcnow())
+        print(f"❌ Initialization failed at {_state['step']}: {e}")
+        return
+
+    _state.update(status="ready", step=None, finished_at=datetime.utcnow())
+    print("✅ Initialization complete")
+
+
+def start_initialization() -> asyncio.Task:
+    """Start initialization in the background so the app can serve liveness checks"""
+    global _task
+    _task = asyncio.create_task(initialize())
+    return _task
+
+
+async def stop_initialization() -> None:
+    """Cancel initialization if it is still running (shutdown)"""
+    if _task and not _task.done():
+        _task.cancel()
+        await asyncio.gather(_task, return_exceptions=True)
+
+
+def is_initialized() -> bool:
+    return _state["status"] == "ready"
+
+
+def get_initialization_state() -> Dict[str, Any]:
+    """Get a serializable snapshot of the initialization progress"""
+    return {
+        **_state,
+        "completed_steps": list(_state["completed_steps"]),
+        "started_at": _state["started_at"].isoformat() if _state["started_at"] else None,
+        "finished_at": _state["finished_at"].isoformat() if _state["finished_at"] else None
+    }
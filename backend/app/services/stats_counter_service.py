@@ -0,0 +1,223 @@
+from datetime import datetime
+from typing import Optional, List, Dict, Any, Iterable, Tuple
+
+from pymongo.errors import DuplicateKeyError
+
+from app.database import get_database
+from app.services.aggregation_service import collection_breakdowns
+from app.utils.transactions import ConflictError, version_filter
+
+COUNTERS_ID = "dashboard"
+# Rebuilds that lose the race with concurrent counter updates are retried this often
+REBUILD_ATTEMPTS = 3
+# Layout version of the counters document; bump it when COUNTED_DIMENSIONS
+# changes so ensure_counters rebuilds counters written with the old layout
+COUNTERS_SCHEMA_VERSION = 2
+
+# Counted dimensions per collection: counter name -> document field(s).
+# Multi-field dimensions are stored nested, e.g. approvals.type_status.<type>.<status>.
+# Only bounded value sets belong here: per-holder device counts would grow
+# this single document with every holder, so the dashboard counts those on
+# demand (see dashboard_service.get_holder_device_counts)
+COUNTED_DIMENSIONS: Dict[str, Dict[str, Tuple[str, ...]]] = {
+    "devices": {
+        "status": ("status",),
+        "type": ("device_type",)
+    },
+    "distributions": {
+        "status": ("status",)
+    },
+    "defects": {
+        "status": ("status",),
+        "severity": ("severity",)
+    },
+    "returns": {
+        "status": ("status",),
+        "reason": ("reason",)
+    },
+    "users": {
+        "status": ("status",),
+        "role": ("role",)
+    },
+    "approvals": {
+        "status": ("status",),
+        "type_status": ("approval_type", "status")
+    }
+}
+
+
+def _counter_key(value: Any) -> str:
+    """Make a field value safe to use as a counter key"""
+    if value is None:
+        return "none"
+    return str(value).replace(".", "_").lstrip("$") or "none"
+
+
+def _counter_paths(collection: str, doc: Dict[str, Any]) -> List[str]:
+    """Get every counter path a document contributes to"""
+    paths = [f"{collection}.total"]
+    for name, fields in COUNTED_DIMENSIONS[collection].items():
+        keys = ".".join(_counter_key(doc.get(field)) for field in fields)
+        paths.append(f"{collection}.{name}.{keys}")
+    return paths
+
+
+def _add(deltas: Dict[str, int], paths: Iterable[str], amount: int) -> None:
+    for path in paths:
+        deltas[path] = deltas.get(path, 0) + amount
+
+
+async def _apply(deltas: Dict[str, int]) -> None:
+    """
+    Apply counter deltas atomically with a single $inc.
+
+    Nothing is written until the counters have been built: the rebuild counts
+    those writes from the collections, and an upsert here would leave a
+    partial document behind. Every update bumps the version, so a rebuild can
+    tell whether deltas landed while it was counting.
+    """
+    deltas = {path: amount for path, amount in deltas.items() if amount}
+    if not deltas:
+        return
+
+    db = get_database()
+    await db.stats_counters.update_one(
+        {"_id": COUNTERS_ID},
+        {"$inc": {**deltas, "version": 1}, "$set": {"updated_at": datetime.utcnow()}}
+    )
+
+
+async def record_insert(collection: str, doc: Dict[str, Any]) -> None:
+    """Count a newly inserted document"""
+    await record_inserts(collection, [doc])
+
+
+async def record_inserts(collection: str, docs: Iterable[Dict[str, Any]]) -> None:
+    """Count newly inserted documents"""
+    deltas: Dict[str, int] = {}
+    for doc in docs:
+        _add(deltas, _counter_paths(collection, doc), 1)
+    await _apply(deltas)
+
+
+async def record_delete(collection: str, doc: Optional[Dict[str, Any]]) -> None:
+    """Uncount a deleted document"""
+    if doc:
+        deltas: Dict[str, int] = {}
+        _add(deltas, _counter_paths(collection, doc), -1)
+        await _apply(deltas)
+
+
+async def record_update(
+    collection: str,
+    before: Optional[Dict[str, Any]],
+    changes: Dict[str, Any]
+) -> None:
+    """Move a document between counters after some of its fields changed"""
+    if before:
+        await record_updates(collection, [(before, changes)])
+
+
+async def record_updates(
+    collection: str,
+    updates: Iterable[Tuple[Dict[str, Any], Dict[str, Any]]]
+) -> None:
+    """Move documents between counters, given (before, changes) pairs"""
+    deltas: Dict[str, int] = {}
+    for before, changes in updates:
+        after = {**before, **changes}
+        _add(deltas, _counter_paths(collection, before), -1)
+        _add(deltas, _counter_paths(collection, after), 1)
+    await _apply(deltas)
+
+
+async def get_counters() -> Dict[str, Any]:
+    """Get the materialized counters document"""
+    db = get_database()
+    counters = await db.stats_counters.find_one({"_id": COUNTERS_ID})
+    return counters or {}
+
+
+def get_count(counters: Dict[str, Any], path: str) -> int:
+    """Read a counter by dotted path, defaulting to 0"""
+    value: Any = counters
+    for part in path.split("."):
+        if not isinstance(value, dict):
+            return 0
+        value = value.get(part)
+    return value if isinstance(value, int) else 0
+
+
+async def _count_collections(db) -> Dict[str, Any]:
+    """Count every dimension from the source collections"""
+    counters: Dict[str, Any] = {"_id": COUNTERS_ID}
+    for collection, dimensions in COUNTED_DIMENSIONS.items():
+        # Reconcile against the primary, never a lagging secondary
+        result = await collection_breakdowns(
+            collection,
+            db=db,
+            pipelines={
+                name: [{"$group": {
+                    "_id": {field: f"${field}" for field in fields},
+                    "count": {"$sum": 1}
+                }}]
+                for name, fields in dimensions.items()
+            }
+        )
+
+        section: Dict[str, Any] = {"total": result["total"]}
+        for name, fields in dimensions.items():
+            node = section.setdefault(name, {})
+            for row in result[name]:
+                keys = [_counter_key(row["_id"].get(field)) for field in fields]
+                target = node
+                for key in keys[:-1]:
+                    target = target.setdefault(key, {})
+                target[keys[-1]] = target.get(keys[-1], 0) + row["count"]
+        counters[collection] = section
+
+    counters["updated_at"] = datetime.utcnow()
+    counters["rebuilt_at"] = counters["updated_at"]
+    counters["schema_version"] = COUNTERS_SCHEMA_VERSION
+    return counters
+
+
+async def rebuild_counters() -> Dict[str, Any]:
+    """
+    Reconcile: rebuild every counter from the source collections.
+
+    The counters' version is read before counting and the rebuild only
+    replaces that version; if counter updates landed while it was counting,
+    it counts again rather than overwrite them, and raises ConflictError
+    once REBUILD_ATTEMPTS are used up. A missing document is created empty
+    first, so updates made during the first count bump its version too.
+    """
+    db = get_database()
+
+    try:
+        await db.stats_counters.insert_one({"_id": COUNTERS_ID, "version": 0})
+    except DuplicateKeyError:
+        pass
+
+    for attempt in range(1, REBUILD_ATTEMPTS + 1):
+        current = await db.stats_counters.find_one({"_id": COUNTERS_ID}, {"version": 1})
+        version = current.get("version", 0)
+        counters = await _count_collections(db)
+        counters["version"] = version + 1
+        result = await db.stats_counters.replace_one(
+            {"_id": COUNTERS_ID, **version_filter(version)},
+            counters
+        )
+        if result.matched_count:
+            return counters
+        print(f"⚠️ Counters changed during rebuild, retrying ({attempt}/{REBUILD_ATTEMPTS})")
+
+    raise ConflictError("Counters kept changing during the rebuild; try again when writes are quieter")
+
+
+async def ensure_counters() -> None:
+    """Build the counters unless a full rebuild has already written them in the current layout"""
+    db = get_database()
+    if not await db.stats_counters.find_one({"_id": COUNTERS_ID, "schema_version": COUNTERS_SCHEMA_VERSION}, {"_id": 1}):
+        await rebuild_counters()
+        print("✅ Stats counters rebuilt")
@@ -0,0 +1,175 @@
+from datetime import datetime, timedelta, timezone
+from typing import Optional, List, Dict, Any, Tuple
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+from app.database import get_analytics_database
+
+GRANULARITIES = ("day", "week", "month")
+# Buckets shown when no explicit start is given
+DEFAULT_PERIODS = {"day": 30, "week": 12, "month": 12}
+# Upper bound on buckets per series, so a wide range cannot explode a response
+MAX_BUCKETS = 1000
+# $dateTrunc week buckets start on Monday, matching bucket_start()
+WEEK_START = "monday"
+
+
+def _check_granularity(granularity: str) -> None:
+    if granularity not in GRANULARITIES:
+        raise ValueError(f"Invalid granularity: {granularity}. Use one of: {', '.join(GRANULARITIES)}")
+
+
+def bucket_start(value: datetime, granularity: str) -> datetime:
+    """Truncate a datetime to the start of its day, week (Monday) or month"""
+    _check_granularity(granularity)
+    day = datetime(value.year, value.month, value.day)
+    if granularity == "day":
+        return day
+    if granularity == "week":
+        return day - timedelta(days=day.weekday())
+    return datetime(value.year, value.month, 1)
+
+
+def next_bucket(start: datetime, granularity: str) -> datetime:
+    """Get the start of the bucket after `start`"""
+    if granularity == "day":
+        return start + timedelta(days=1)
+    if granularity == "week":
+        return start + timedelta(weeks=1)
+    if start.month == 12:
+        return datetime(start.year + 1, 1, 1)
+    return datetime(start.year, start.month + 1, 1)
+
+
+def default_start(granularity: str, end: datetime, periods: Optional[int] = None) -> datetime:
+    """Get the start of the range covering the last N buckets up to `end`"""
+    periods = periods or DEFAULT_PERIODS[granularity]
+    start = bucket_start(end, granularity)
+    for _ in range(periods - 1):
+        start = bucket_start(start - timedelta(days=1), granularity)
+    return start
+
+
+def bucket_starts(start: datetime, end: datetime, granularity: str) -> List[datetime]:
+    """Get every bucket start overlapping [start, end), oldest first"""
+    _check_granularity(granularity)
+    if start >= end:
+        raise ValueError("Start date must be before end date")
+
+    buckets = []
+    current = bucket_start(start, granularity)
+    while current < end:
+        buckets.append(current)
+        if len(buckets) > MAX_BUCKETS:
+            raise ValueError(f"Date range too large: more than {MAX_BUCKETS} {granularity} buckets")
+        current = next_bucket(current, granularity)
+    return buckets
+
+
+def resolve_range(
+    start: Optional[datetime],
+    end: Optional[datetime],
+    granularity: str,
+    periods: Optional[int] = None
+) -> Tuple[datetime, datetime]:
+    """Fill in a missing end (now) and start (the last N buckets), as naive UTC"""
+    _check_granularity(granularity)
+    end = _naive_utc(end) if end else datetime.utcnow()
+    start = _naive_utc(start) if start else default_start(granularity, end, periods)
+    return start, end
+
+
+def _naive_utc(value: datetime) -> datetime:
+    """Stored dates are naive UTC; convert timezone-aware input to match"""
+    if value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def series_facet(
+    date_field: str,
+    start: datetime,
+    end: datetime,
+    granularity: str,
+    match: Optional[Dict[str, Any]] = None
+) -> List[Dict[str, Any]]:
+    """Build a sub-pipeline counting documents per $dateTrunc bucket"""
+    unit: Dict[str, Any] = {"date": f"${date_field}", "unit": granularity}
+    if granularity == "week":
+        unit["startOfWeek"] = WEEK_START
+    return [
+        {"$match": {**(match or {}), date_field: {"$gte": start, "$lt": end}}},
+        {"$group": {"_id": {"$dateTrunc": unit}, "count": {"$sum": 1}}}
+    ]
+
+
+def series_match(
+    series: Dict[str, Tuple[str, Optional[Dict[str, Any]]]],
+    start: datetime,
+    end: datetime
+) -> Dict[str, Any]:
+    """
+    Build the top-level filter covering every series' date range.
+
+    Filters inside $facet sub-pipelines cannot use indexes, so this runs as
+    a $match before the $facet: one branch per distinct (filter, date field)
+    pair, combined with $or when there is more than one.
+    """
+    branches: List[Dict[str, Any]] = []
+    for date_field, match in series.values():
+        branch = {**(match or {}), date_field: {"$gte": start, "$lt": end}}
+        if branch not in branches:
+            branches.append(branch)
+    return branches[0] if len(branches) == 1 else {"$or": branches}
+
+
+def fill_series(rows: List[Dict[str, Any]], buckets: List[datetime]) -> List[int]:
+    """Zero-fill bucket counts from a series_facet result, in bucket order"""
+    counts = {row["_id"]: row["count"] for row in rows if row["_id"] is not None}
+    return [counts.get(bucket, 0) for bucket in buckets]
+
+
+async def build_series(
+    collection: str,
+    series: Dict[str, Tuple[str, Optional[Dict[str, Any]]]],
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    granularity: str = "month",
+    label_key: str = "label",
+    label_format: str = "%Y-%m-%d",
+    periods: Optional[int] = None,
+    db: Optional[AsyncIOMotorDatabase] = None
+) -> List[Dict[str, Any]]:
+    """
+    Build zero-filled time series for a collection in one aggregation.
+
+    - series: output name -> (date field, extra match filter); each series
+      is bucketed on its own date field inside a single $facet, after an
+      index-backed $match on the union of the series' ranges
+    - start/end: range [start, end); defaults to the last N buckets up to now
+    - db: database handle; defaults to the analytics (read-routed) handle
+
+    Returns one row per bucket: {label_key: <formatted start>, "start": <iso>, <name>: count, ...}
+    """
+    start, end = resolve_range(start, end, granularity, periods)
+    buckets = bucket_starts(start, end, granularity)
+
+    if db is None:
+        db = get_analytics_database()
+    facets = {
+        name: series_facet(date_field, start, end, granularity, match)
+        for name, (date_field, match) in series.items()
+    }
+    pipeline = [{"$match": series_match(series, start, end)}, {"$facet": facets}]
+    results = await db[collection].aggregate(pipeline).to_list(length=1)
+    facet_doc = results[0] if results else {}
+
+    counts = {name: fill_series(facet_doc.get(name, []), buckets) for name in series}
+    return [
+        {
+            label_key: bucket.strftime(label_format),
+            "start": bucket.isoformat(),
+            **{name: counts[name][i] for name in series}
+        }
+        for i, bucket in enumerate(buckets)
+    ]
@@ -1,11 +1,15 @@
 from datetime import datetime
 from typing import Optional, List, Dict, Any
 from bson import ObjectId
+from pymongo import ReturnDocument
 
 from app.database import get_database
 from app.models.user import UserCreate, UserUpdate, UserRole, UserStatus
+from app.services import report_cache_service, stats_counter_service
+from app.services.auth_service import invalidate_cached_user
+from app.services.search_service import add_search_filter, search_fields, refresh_search_tokens
 from app.utils.security import get_password_hash
-from app.utils.helpers import serialize_doc, serialize_docs, get_pagination
+from app.utils.helpers import serialize_doc, serialize_docs, paginate
 
 
 async def get_users(
@@ -13,7 +17,10 @@ async def get_users(
     page_size: int = 20,
     role: Optional[str] = None,
     status: Optional[str] = None,
-    search: Optional[str] = None
+    search: Optional[str] = None,
+    after: Optional[str] = None,
+    cursor: bool = False,
+    include_total: bool = False
 ) -> Dict[str, Any]:
     """Get all users with pagination and filters"""
     db = get_database()
@@ -25,18 +32,13 @@ async def get_users(
     if status:
         query["status"] = status
     if search:
-        query["$or"] = [
-            {"name": {"$regex": search, "$options": "i"}},
-            {"email": {"$regex": search, "$options": "i"}}
-        ]
-    
-    # Get total count
-    total = await db.users.count_documents(query)
+        add_search_filter(query, "users", search)
     
     # Get paginated results
-    skip = (page - 1) * page_size
-    cursor = db.users.find(query).skip(skip).limit(page_size).sort("created_at", -1)
-    users = await cursor.to_list(length=page_size)
+    users, pagination = await paginate(
+        db.users, query, page, page_size,
+        after=after, cursor=cursor, include_total=include_total
+    )
     
     # Remove password hashes and serialize
     for user in users:
@@ -44,7 +46,7 @@ async def get_users(
     
     return {
         "data": serialize_docs(users),
-        "pagination": get_pagination(page, page_size, total)
+        "pagination": pagination
     }
 
 
@@ -96,8 +98,11 @@ async def create_user(user_data: UserCreate) -> Dict[str, Any]:
         "last_login": None
     }
     
+    user_doc.update(search_fields("users", user_doc))
     result = await db.users.insert_one(user_doc)
     user_doc["_id"] = result.inserted_id
+    await stats_counter_service.record_insert("users", user_doc)
+    await report_cache_service.invalidate("users")
     user_doc.pop("password_hash")
     
     return serialize_doc(user_doc)
@@ -118,12 +123,17 @@ async def update_user(user_id: str, user_data: UserUpdate) -> Optional[Dict[str,
     
     update_dict["updated_at"] = datetime.utcnow()
     
-    result = await db.users.update_one(
+    before = await db.users.find_one_and_update(
         {"_id": ObjectId(user_id)},
-        {"$set": update_dict}
+        {"$set": update_dict},
+        return_document=ReturnDocument.BEFORE
     )
     
-    if result.modified_count > 0 or result.matched_count > 0:
+    invalidate_cached_user(user_id)
+    if before:
+        await stats_counter_service.record_update("users", before, update_dict)
+        await report_cache_service.invalidate("users")
+        await refresh_search_tokens("users", before, update_dict)
         return await get_user_by_id(user_id)
     return None
 
@@ -132,25 +142,34 @@ async def delete_user(user_id: str) -> bool:
     """Delete user"""
     db = get_database()
     
-    result = await db.users.delete_one({"_id": ObjectId(user_id)})
-    return result.deleted_count > 0
+    deleted = await db.users.find_one_and_delete({"_id": ObjectId(user_id)})
+    invalidate_cached_user(user_id)
+    if deleted:
+        await stats_counter_service.record_delete("users", deleted)
+        await report_cache_service.invalidate("users")
+        return True
+    return False
 
 
 async def update_user_status(user_id: str, status: str) -> Optional[Dict[str, Any]]:
     """Update user status"""
     db = get_database()
     
-    result = await db.users.update_one(
+    before = await db.users.find_one_and_update(
         {"_id": ObjectId(user_id)},
         {
             "$set": {
                 "status": status,
                 "updated_at": datetime.utcnow()
             }
-        }
+        },
+        return_document=ReturnDocument.BEFORE
     )
     
-    if result.modified_count > 0:
+    invalidate_cached_user(user_id)
+    if before:
+        await stats_counter_service.record_update("users", before, {"status": status})
+        await report_cache_service.invalidate("users")
         return await get_user_by_id(user_id)
     return None
 
@@ -0,0 +1,49 @@
+import asyncio
+from typing import Any, Awaitable, Dict, Optional
+
+from app.config import settings
+
+
+async def gather_bounded(
+    calls: Dict[str, Awaitable[Any]],
+    limit: Optional[int] = None,
+    timeout: Optional[float] = None,
+    defaults: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    """
+    Run independent awaitables concurrently and return their results by name.
+
+    - limit: at most this many calls in flight (default DB_CONCURRENCY_LIMIT)
+    - timeout: per-call timeout in seconds
+    - defaults: name -> fallback value; a call listed here that fails or
+      times out yields its fallback instead of failing the whole batch
+
+    Any other failure cancels the remaining calls and is re-raised.
+    """
+    defaults = defaults or {}
+    semaphore = asyncio.Semaphore(limit or settings.DB_CONCURRENCY_LIMIT)
+
+    async def run(name: str, call: Awaitable[Any]) -> Any:
+        try:
+            async with semaphore:
+                return await asyncio.wait_for(call, timeout)
+        except asyncio.CancelledError:
+            if asyncio.iscoroutine(call):
+                call.close()
+            raise
+        except Exception as e:
+            if name not in defaults:
+                raise
+            print(f"⚠️ {name} failed, using fallback: {e!r}")
+            return defaults[name]
+
+    tasks = [asyncio.ensure_future(run(name, call)) for name, call in calls.items()]
+    try:
+        results = await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
+
+    return dict(zip(calls, results))
@@ -0,0 +1,177 @@
+import os
+from threading import Lock
+from typing import Any, Dict, Tuple
+
+from pymongo import monitoring
+
+# Cap on distinct (collection, command) latency series
+MAX_COMMAND_SERIES = 500
+# Cap on commands tracked between their started and finished events
+MAX_PENDING_COMMANDS = 10000
+
+
+class _Timing:
+    """Count, total and max of a latency series, in milliseconds"""
+
+    __slots__ = ("count", "total_ms", "max_ms", "failures")
+
+    def __init__(self):
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.failures = 0
+
+    def add(self, ms: float, failed: bool = False) -> None:
+        self.count += 1
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+        if failed:
+            self.failures += 1
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "mean_ms": round(self.total_ms / self.count, 3) if self.count else 0.0,
+            "max_ms": round(self.max_ms, 3),
+            "failures": self.failures
+        }
+
+
+class PoolMetrics(monitoring.ConnectionPoolListener):
+    """CMAP listener: connection counts and checkout wait time per server"""
+
+    def __init__(self):
+        self._lock = Lock()
+        self._servers: Dict[str, Dict[str, Any]] = {}
+
+    def _server(self, address: Tuple[str, int]) -> Dict[str, Any]:
+        key = f"{address[0]}:{address[1]}"
+        server = self._servers.get(key)
+        if server is None:
+            server = self._servers[key] = {
+                "open": 0,
+                "in_use": 0,
+                "max_in_use": 0,
+                "created": 0,
+                "closed": 0,
+                "checkout_failures": 0,
+                "checkout_wait": _Timing()
+            }
+        return server
+
+    def pool_created(self, event):
+        with self._lock:
+            self._server(event.address)
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        pass
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_created(self, event):
+        with self._lock:
+            server = self._server(event.address)
+            server["created"] += 1
+            server["open"] += 1
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        with self._lock:
+            server = self._server(event.address)
+            server["closed"] += 1
+            server["open"] = max(server["open"] - 1, 0)
+
+    def connection_check_out_started(self, event):
+        pass
+
+    def connection_check_out_failed(self, event):
+        with self._lock:
+            server = self._server(event.address)
+            server["checkout_failures"] += 1
+            duration = getattr(event, "duration", None)
+            if duration is not None:
+                server["checkout_wait"].add(duration * 1000, failed=True)
+
+    def connection_checked_out(self, event):
+        with self._lock:
+            server = self._server(event.address)
+            server["in_use"] += 1
+            server["max_in_use"] = max(server["max_in_use"], server["in_use"])
+            duration = getattr(event, "duration", None)  # pymongo >= 4.7
+            if duration is not None:
+                server["checkout_wait"].add(duration * 1000)
+
+    def connection_checked_in(self, event):
+        with self._lock:
+            server = self._server(event.address)
+            server["in_use"] = max(server["in_use"] - 1, 0)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                address: {
+                    **{k: v for k, v in server.items() if k != "checkout_wait"},
+                    "checkout_wait": server["checkout_wait"].as_dict()
+                }
+                for address, server in self._servers.items()
+            }
+
+
+class CommandMetrics(monitoring.CommandListener):
+    """Command listener: latency per collection and command name"""
+
+    def __init__(self):
+        self._lock = Lock()
+        self._pending: Dict[Tuple[Any, int], Tuple[str, str]] = {}
+        self._series: Dict[Tuple[str, str], _Timing] = {}
+
+    def started(self, event):
+        target = event.command.get(event.command_name)
+        collection = target if isinstance(target, str) else "-"
+        with self._lock:
+            if len(self._pending) < MAX_PENDING_COMMANDS:
+                self._pending[(event.connection_id, event.request_id)] = (collection, event.command_name)
+
+    def _finished(self, event, failed: bool):
+        with self._lock:
+            key = self._pending.pop((event.connection_id, event.request_id), None)
+            if key is None:
+                return
+            series = self._series.get(key)
+            if series is None:
+                if len(self._series) >= MAX_COMMAND_SERIES:
+                    return
+                series = self._series[key] = _Timing()
+            series.add(event.duration_micros / 1000, failed=failed)
+
+    def succeeded(self, event):
+        self._finished(event, False)
+
+    def failed(self, event):
+        self._finished(event, True)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                f"{collection}.{command}": timing.as_dict()
+                for (collection, command), timing in sorted(self._series.items())
+            }
+
+
+pool_metrics = PoolMetrics()
+command_metrics = CommandMetrics()
+
+
+def get_db_metrics() -> Dict[str, Any]:
+    """Get pool and command metrics for this worker process"""
+    return {
+        "pid": os.getpid(),
+        "pools": pool_metrics.snapshot(),
+        "commands": command_metrics.snapshot()
+    }
@@ -1,9 +1,25 @@
 from datetime import datetime
-from typing import Any, Dict, List, Optional
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
 from bson import ObjectId
+from bson.errors import InvalidId
+from motor.motor_asyncio import AsyncIOMotorCollection
+import base64
+import codecs
+import json
 import random
+import re
 import string
 
+# Stable sort used by every list endpoint; keyset cursors follow the same order
+LIST_SORT = [("created_at", -1), ("_id", -1)]
+
+# Fields maintained for internal use only, never returned by the API
+INTERNAL_FIELDS = ("search_tokens",)
+INTERNAL_PROJECTION = {field: 0 for field in INTERNAL_FIELDS}
+
+# Field names accepted by the `fields` query parameter (dotted paths allowed)
+FIELD_NAME = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*(\.[A-Za-z_][A-Za-z0-9_]*)*$")
+
 
 def generate_id(prefix: str, length: int = 4) -> str:
     """Generate a unique ID with prefix (e.g., ONU-2024-0001)"""
@@ -12,7 +28,7 @@ def generate_id(prefix: str, length: int = 4) -> str:
     return f"{prefix}-{year}-{random_num}"
 
 
-def generate_device_id(device_type: str) -> str:
+def generate_device_id(device_type: str, length: int = 4) -> str:
     """Generate device ID based on type"""
     prefix_map = {
         "ONU": "ONU",
@@ -24,7 +40,7 @@ def generate_device_id(device_type: str) -> str:
         "Other": "DEV"
     }
     prefix = prefix_map.get(device_type, "DEV")
-    return generate_id(prefix)
+    return generate_id(prefix, length)
 
 
 def generate_distribution_id() -> str:
@@ -53,6 +69,8 @@ def serialize_doc(doc: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
         return None
     
     doc = dict(doc)
+    for field in INTERNAL_FIELDS:
+        doc.pop(field, None)
     
     # Convert ObjectId to string
     if "_id" in doc:
@@ -76,6 +94,53 @@ def serialize_docs(docs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
     return [serialize_doc(doc) for doc in docs if doc is not None]
 
 
+def prepare_doc(doc: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """
+    Prepare a MongoDB document for FastJSONResponse in place.
+
+    Unlike serialize_doc, values are left as-is (the response encoder handles
+    ObjectId and datetime), so the document is neither copied nor walked.
+    """
+    if doc is None:
+        return None
+    
+    for field in INTERNAL_FIELDS:
+        doc.pop(field, None)
+    if "_id" in doc:
+        doc["id"] = doc["_id"]
+    return doc
+
+
+def prepare_docs(docs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Prepare a list of MongoDB documents for FastJSONResponse"""
+    return [prepare_doc(doc) for doc in docs if doc is not None]
+
+
+def parse_fields(fields: Optional[str]) -> Optional[List[str]]:
+    """Parse a comma-separated `fields` query parameter; None selects every field"""
+    if not fields:
+        return None
+    
+    names = [name.strip() for name in fields.split(",") if name.strip()]
+    for name in names:
+        if not FIELD_NAME.match(name) or name.split(".")[0] in INTERNAL_FIELDS:
+            raise ValueError(f"Invalid field: {name}")
+    return names or None
+
+
+def fields_projection(fields: Optional[List[str]]) -> Dict[str, Any]:
+    """Projection for a field selection; _id and created_at are always kept for cursors"""
+    if not fields:
+        return INTERNAL_PROJECTION
+    
+    projection = {"_id": 1, "created_at": 1}
+    for name in fields:
+        # A parent path and its subpath cannot both be projected
+        if not any(name.startswith(f"{other}.") for other in fields):
+            projection[name] = 1
+    return projection
+
+
 def get_pagination(page: int, page_size: int, total: int) -> Dict[str, int]:
     """Calculate pagination info"""
     total_pages = (total + page_size - 1) // page_size if page_size > 0 else 0
@@ -87,6 +152,107 @@ def get_pagination(page: int, page_size: int, total: int) -> Dict[str, int]:
     }
 
 
+def encode_cursor(doc: Dict[str, Any]) -> str:
+    """Encode an opaque keyset cursor from a document's (created_at, _id)"""
+    payload = json.dumps({"c": doc["created_at"].isoformat(), "i": str(doc["_id"])})
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token: str) -> Tuple[datetime, ObjectId]:
+    """Decode a keyset cursor back into (created_at, _id)"""
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        return datetime.fromisoformat(payload["c"]), ObjectId(payload["i"])
+    except (ValueError, KeyError, TypeError, InvalidId):
+        raise ValueError("Invalid pagination cursor")
+
+
+def apply_cursor(query: Dict[str, Any], after: str) -> Dict[str, Any]:
+    """Restrict a query to documents that sort after the cursor"""
+    created_at, last_id = decode_cursor(after)
+    keyset = {
+        "$or": [
+            {"created_at": {"$lt": created_at}},
+            {"created_at": created_at, "_id": {"$lt": last_id}}
+        ]
+    }
+    return {"$and": [query, keyset]} if query else keyset
+
+
+async def paginate(
+    collection: AsyncIOMotorCollection,
+    query: Dict[str, Any],
+    page: int = 1,
+    page_size: int = 20,
+    after: Optional[str] = None,
+    cursor: bool = False,
+    include_total: bool = False,
+    projection: Optional[Dict[str, Any]] = INTERNAL_PROJECTION,
+    fields: Optional[List[str]] = None
+) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+    """
+    Fetch one page of a list query sorted by (created_at, _id) descending.
+
+    Offset mode (default) uses page/page_size and always counts the total.
+    Cursor mode (cursor=True or an `after` token) seeks past the last seen
+    (created_at, _id) instead of skipping, and only counts when include_total
+    is set; otherwise an unfiltered list gets the collection's estimated count.
+    A `fields` selection replaces the projection (see fields_projection).
+    """
+    if fields:
+        projection = fields_projection(fields)
+    
+    if not cursor and after is None:
+        total = await collection.count_documents(query)
+        skip = (page - 1) * page_size
+        docs = await collection.find(query, projection).sort(LIST_SORT).skip(skip).limit(page_size).to_list(length=page_size)
+        return docs, get_pagination(page, page_size, total)
+    
+    page_query = apply_cursor(query, after) if after else query
+    docs = await collection.find(page_query, projection).sort(LIST_SORT).limit(page_size + 1).to_list(length=page_size + 1)
+    
+    has_more = len(docs) > page_size
+    docs = docs[:page_size]
+    
+    total = None
+    total_is_estimate = False
+    if include_total:
+        total = await collection.count_documents(query)
+    elif not query:
+        total = await collection.estimated_document_count()
+        total_is_estimate = True
+    
+    return docs, {
+        "page_size": page_size,
+        "has_more": has_more,
+        "next_cursor": encode_cursor(docs[-1]) if has_more else None,
+        "total": total,
+        "total_is_estimate": total_is_estimate
+    }
+
+
+async def iter_text_lines(
+    read: Callable[[int], Awaitable[bytes]],
+    chunk_size: int = 64 * 1024,
+    encoding: str = "utf-8-sig"
+) -> AsyncIterator[str]:
+    """Stream decoded lines from an async read(size) function in fixed-size chunks"""
+    decoder = codecs.getincrementaldecoder(encoding)()
+    pending = ""
+    while True:
+        chunk = await read(chunk_size)
+        pending += decoder.decode(chunk, final=not chunk)
+        lines = pending.split("\n")
+        pending = lines.pop()
+        for line in lines:
+            yield line.rstrip("\r")
+        if not chunk:
+            break
+    if pending:
+        yield pending.rstrip("\r")
+
+
 def validate_object_id(id_str: str) -> bool:
     """Check if string is valid ObjectId"""
     try:
@@ -0,0 +1,133 @@
+import asyncio
+from typing import Any, Dict, Hashable, Optional, Set
+
+
+class SubscriberLimitError(Exception):
+    """Raised when the broker already has its maximum number of subscribers"""
+    pass
+
+
+# Returned by Subscription.get() when events were dropped for a slow consumer
+RESYNC = {"event": "resync", "data": {}}
+# Returned by Subscription.get() once the broker has been closed
+CLOSED = {"event": "close", "data": {}}
+
+
+class Subscription:
+    """A single subscriber's bounded event queue"""
+
+    def __init__(self, topic: Hashable, queue_size: int):
+        self.topic = topic
+        self.lagged = False
+        self.closed = False
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+
+    def offer(self, event: Dict[str, Any]) -> bool:
+        """Queue an event without blocking; mark the subscriber lagged when full"""
+        if self.lagged:
+            return False
+        try:
+            self._queue.put_nowait(event)
+            return True
+        except asyncio.QueueFull:
+            self.lagged = True
+            return False
+
+    async def get(self, timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """
+        Wait for the next event, or None after `timeout` seconds.
+
+        A lagged subscriber gets RESYNC once, with its stale backlog dropped,
+        so it can reload state instead of replaying a partial stream.
+        """
+        if self.closed:
+            return CLOSED
+        if self.lagged:
+            while not self._queue.empty():
+                self._queue.get_nowait()
+            self.lagged = False
+            return RESYNC
+        try:
+            return await asyncio.wait_for(self._queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return CLOSED if self.closed else None
+
+    def close(self) -> None:
+        """Wake the consumer and make every later get() return CLOSED"""
+        self.closed = True
+        self.lagged = False
+        while not self._queue.empty():
+            self._queue.get_nowait()
+        self._queue.put_nowait(CLOSED)
+
+
+class PubSub:
+    """
+    In-process publish/subscribe keyed by topic.
+
+    Publishing never blocks: each subscriber has a bounded queue, and a
+    subscriber that falls behind is marked lagged rather than slowing the
+    publisher down. The number of concurrent subscribers is capped.
+    """
+
+    def __init__(self, max_subscribers: int, queue_size: int):
+        self.max_subscribers = max_subscribers
+        self.queue_size = queue_size
+        self.published = 0
+        self.dropped = 0
+        self._topics: Dict[Hashable, Set[Subscription]] = {}
+        self._count = 0
+        self._closed = False
+
+    def subscribe(self, topic: Hashable) -> Subscription:
+        """Register a subscriber, raising SubscriberLimitError at the cap"""
+        if self._closed or self._count >= self.max_subscribers:
+            raise SubscriberLimitError("Too many open streams")
+        subscription = Subscription(topic, self.queue_size)
+        self._topics.setdefault(topic, set()).add(subscription)
+        self._count += 1
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        """Remove a subscriber"""
+        subscribers = self._topics.get(subscription.topic)
+        if subscribers and subscription in subscribers:
+            subscribers.remove(subscription)
+            self._count -= 1
+            if not subscribers:
+                del self._topics[subscription.topic]
+
+    def publish(self, topic: Hashable, event: Dict[str, Any]) -> int:
+        """Deliver an event to every subscriber of a topic"""
+        delivered = 0
+        for subscription in self._topics.get(topic, ()):
+            if subscription.offer(event):
+                delivered += 1
+            else:
+                self.dropped += 1
+        self.published += 1
+        return delivered
+
+    def broadcast(self, event: Dict[str, Any]) -> int:
+        """Deliver an event to every subscriber of every topic"""
+        return sum(self.publish(topic, event) for topic in list(self._topics))
+
+    def close(self) -> None:
+        """Refuse new subscribers and end every open subscription"""
+        self._closed = True
+        for subscribers in self._topics.values():
+            for subscription in subscribers:
+                subscription.close()
+
+    def has_subscribers(self, topic: Hashable) -> bool:
+        return topic in self._topics
+
+    def stats(self) -> Dict[str, Any]:
+        """Get subscriber and delivery counters"""
+        return {
+            "subscribers": self._count,
+            "max_subscribers": self.max_subscribers,
+            "topics": len(self._topics),
+            "published": self.published,
+            "dropped": self.dropped
+        }
@@ -0,0 +1,68 @@
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from enum import Enum
+from typing import Any, Dict, Optional
+
+from bson import ObjectId
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is optional
+    orjson = None
+
+
+def _default(value: Any) -> Any:
+    """Encode the non-JSON types found in MongoDB documents"""
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    """Serialize content to JSON bytes, encoding ObjectId and datetime values natively"""
+    if orjson is not None:
+        return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(
+        content, default=_default, ensure_ascii=False, allow_nan=False, separators=(",", ":")
+    ).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSON response rendered in one pass by orjson (stdlib json without it).
+
+    Raw MongoDB documents can be returned as-is: ObjectId, datetime and enum
+    values are encoded by the serializer, so neither serialize_doc nor
+    FastAPI's jsonable_encoder has to walk the payload first. Endpoints get
+    that benefit only when they return the response instance themselves.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def api_response(
+    data: Any,
+    message: str,
+    pagination: Optional[Dict[str, Any]] = None,
+    status_code: int = 200
+) -> FastJSONResponse:
+    """Build the standard {success, message, data[, pagination]} response"""
+    content: Dict[str, Any] = {
+        "success": True,
+        "message": message,
+        "data": data
+    }
+    if pagination is not None:
+        content["pagination"] = pagination
+    return FastJSONResponse(status_code=status_code, content=content)
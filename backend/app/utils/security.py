@@ -1,9 +1,14 @@
+import time
 from datetime import datetime, timedelta
 from typing import Optional
 from jose import JWTError, jwt
 import bcrypt
 from app.config import settings
 from app.models.auth import TokenData
+from app.utils.cache import TTLCache
+
+# Verified tokens -> TokenData, so hot tokens skip HMAC verification
+token_cache = TTLCache(settings.TOKEN_CACHE_SIZE, settings.TOKEN_CACHE_TTL_SECONDS)
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
@@ -56,7 +61,34 @@ def create_refresh_token(data: dict) -> str:
     return encoded_jwt
 
 
+def create_stream_token(data: dict) -> str:
+    """Create a short-lived JWT that only authenticates the notification stream"""
+    to_encode = data.copy()
+    expire = datetime.utcnow() + timedelta(seconds=settings.STREAM_TOKEN_EXPIRE_SECONDS)
+    
+    to_encode.update({
+        "exp": expire,
+        "iat": datetime.utcnow(),
+        "type": "stream"
+    })
+    
+    encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+    return encoded_jwt
+
+
 def decode_token(token: str) -> Optional[TokenData]:
+    """Decode and validate JWT token, reusing earlier verifications"""
+    cached = token_cache.get(token)
+    if cached is not None:
+        return cached
+    
+    token_data = _decode_token(token)
+    if token_data is not None and token_data.expires_at is not None:
+        token_cache.set(token, token_data, ttl=token_data.expires_at - time.time())
+    return token_data
+
+
+def _decode_token(token: str) -> Optional[TokenData]:
     """Decode and validate JWT token"""
     try:
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
@@ -68,7 +100,14 @@ def decode_token(token: str) -> Optional[TokenData]:
         if user_id is None:
             return None
             
-        return TokenData(user_id=user_id, email=email, role=role, name=name)
+        return TokenData(
+            user_id=user_id,
+            email=email,
+            role=role,
+            name=name,
+            expires_at=payload.get("exp"),
+            token_type=payload.get("type")
+        )
     except JWTError:
         return None
 
@@ -0,0 +1,208 @@
+import asyncio
+import random
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple, TypeVar
+
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorClientSession, AsyncIOMotorCollection
+from pymongo import ReturnDocument
+from pymongo.errors import PyMongoError
+from pymongo.read_concern import ReadConcern
+from pymongo.write_concern import WriteConcern
+
+from app.config import settings
+from app.database import get_database
+
+T = TypeVar("T")
+
+TRANSIENT_TRANSACTION_ERROR = "TransientTransactionError"
+UNKNOWN_COMMIT_RESULT = "UnknownTransactionCommitResult"
+
+
+class UnitOfWork:
+    """
+    The writes of one state transition and the side effects to run once they commit.
+
+    Pass `uow.session` to every read and write of the transition. Work that
+    must not be repeated or rolled back - counter updates, cache
+    invalidation, notifications - is registered with `after_commit` and runs
+    exactly once, after the transaction committed. Without transactions the
+    session is None and hooks run when the work function returns.
+    """
+
+    def __init__(self, session: Optional[AsyncIOMotorClientSession] = None):
+        self.session = session
+        self._hooks: List[Tuple[Callable[..., Awaitable[Any]], tuple, dict]] = []
+
+    def after_commit(self, fn: Callable[..., Awaitable[Any]], *args, **kwargs) -> None:
+        """Run fn(*args, **kwargs) once the unit of work has committed"""
+        self._hooks.append((fn, args, kwargs))
+
+    async def run_hooks(self) -> None:
+        hooks, self._hooks = self._hooks, []
+        for fn, args, kwargs in hooks:
+            try:
+                await fn(*args, **kwargs)
+            except Exception as e:
+                # The transition is committed; a failed side effect must not undo it
+                print(f"⚠️ After-commit hook {getattr(fn, '__name__', fn)} failed: {e!r}")
+
+
+async def after_commit(uow: Optional[UnitOfWork], fn: Callable[..., Awaitable[Any]], *args, **kwargs) -> None:
+    """Run fn now, or after the unit of work commits when there is one"""
+    if uow is None:
+        await fn(*args, **kwargs)
+    else:
+        uow.after_commit(fn, *args, **kwargs)
+
+
+def _is_transient(error: PyMongoError) -> bool:
+    """
+    Whether the transaction was aborted and the work can safely run again.
+
+    pymongo labels in-transaction network errors TransientTransactionError
+    itself. A commit whose outcome is unknown may have been applied, so it is
+    never transient: rerunning the work would repeat a committed transition.
+    """
+    return error.has_error_label(TRANSIENT_TRANSACTION_ERROR) and not error.has_error_label(UNKNOWN_COMMIT_RESULT)
+
+
+async def _commit(session: AsyncIOMotorClientSession, attempts: int) -> None:
+    """Commit, retrying when the outcome of the commit is unknown"""
+    for attempt in range(1, attempts + 1):
+        try:
+            await session.commit_transaction()
+            return
+        except PyMongoError as e:
+            if e.has_error_label(UNKNOWN_COMMIT_RESULT) and attempt < attempts:
+                continue
+            raise
+
+
+async def run_in_transaction(
+    work: Callable[[UnitOfWork], Awaitable[T]],
+    use_transaction: Optional[bool] = None,
+    max_attempts: Optional[int] = None
+) -> T:
+    """
+    Run work(uow) as one multi-document transaction and return its result.
+
+    Errors labelled TransientTransactionError (write conflicts, primary
+    step-downs, network errors inside the transaction) abort and rerun the
+    whole work function with a fresh UnitOfWork, up to
+    MONGODB_TRANSACTION_MAX_ATTEMPTS times with jittered backoff; hooks of
+    aborted attempts are dropped. Commits with an unknown outcome are
+    retried as commits only, never by rerunning the work; if the outcome is
+    still unknown the error is raised. After-commit hooks run once the
+    transaction commits.
+
+    When transactions are disabled (single-node deployments) work runs
+    without a session and its writes are applied one by one as before.
+    """
+    if use_transaction is None:
+        use_transaction = settings.MONGODB_TRANSACTIONS_ENABLED
+    attempts = max_attempts or settings.MONGODB_TRANSACTION_MAX_ATTEMPTS
+
+    if not use_transaction:
+        uow = UnitOfWork()
+        result = await work(uow)
+        await uow.run_hooks()
+        return result
+
+    db = get_database()
+    async with await db.client.start_session() as session:
+        for attempt in range(1, attempts + 1):
+            uow = UnitOfWork(session)
+            session.start_transaction(
+                read_concern=ReadConcern("snapshot"),
+                write_concern=WriteConcern("majority")
+            )
+            try:
+                result = await work(uow)
+                await _commit(session, attempts)
+                break
+            except PyMongoError as e:
+                if session.in_transaction:
+                    await session.abort_transaction()
+                if _is_transient(e) and attempt < attempts:
+                    await asyncio.sleep(random.uniform(0, 0.01 * 2 ** attempt))
+                    continue
+                if e.has_error_label(UNKNOWN_COMMIT_RESULT):
+                    print(f"⚠️ Transaction commit outcome unknown after {attempts} attempts: {e!r}")
+                raise
+            except BaseException:
+                if session.in_transaction:
+                    await session.abort_transaction()
+                raise
+
+    await uow.run_hooks()
+    return result
+
+
+class ConflictError(ValueError):
+    """
+    A conditional write found the document in another state than expected.
+
+    Raised when a concurrent request changed the document first; `current`
+    holds the document as it is now. Mapped to 409 Conflict.
+    """
+
+    def __init__(self, message: str, current: Optional[Dict[str, Any]] = None):
+        super().__init__(message)
+        self.current = current
+
+
+def version_filter(expected_version: int) -> Dict[str, Any]:
+    """Match a document version; documents written before versioning count as version 0"""
+    if expected_version == 0:
+        return {"version": {"$in": [0, None]}}
+    return {"version": expected_version}
+
+
+async def transition_status(
+    collection: AsyncIOMotorCollection,
+    doc_id: str,
+    allowed_from: Iterable[str],
+    changes: Dict[str, Any],
+    expected_version: Optional[int] = None,
+    guard: Optional[Dict[str, Any]] = None,
+    conflict_message: Optional[str] = None,
+    session: Optional[AsyncIOMotorClientSession] = None
+) -> Optional[Dict[str, Any]]:
+    """
+    Apply a status change only if the document is still in an allowed prior status.
+
+    A single find_one_and_update checks the prior status (plus `guard` and
+    the expected version, if given), applies `changes` and increments
+    `version`, so two requests racing on the same document cannot both win.
+    Returns the document as it was before the change, or None if it does
+    not exist. Raises ConflictError when it exists in another state; only
+    that path costs a second read.
+    """
+    query: Dict[str, Any] = {"_id": ObjectId(doc_id), "status": {"$in": list(allowed_from)}, **(guard or {})}
+    if expected_version is not None:
+        query.update(version_filter(expected_version))
+
+    before = await collection.find_one_and_update(
+        query,
+        {"$set": changes, "$inc": {"version": 1}},
+        return_document=ReturnDocument.BEFORE,
+        session=session
+    )
+    if before is not None:
+        return before
+
+    current = await collection.find_one({"_id": ObjectId(doc_id)}, session=session)
+    if current is None:
+        return None
+
+    version = current.get("version", 0)
+    if expected_version is not None and version != expected_version:
+        message = f"This record was modified by someone else (version {version}, expected {expected_version})"
+    else:
+        message = conflict_message or f"Cannot change status from {current.get('status')} to {changes.get('status')}"
+    raise ConflictError(message, current)
+
+
+def next_version(before: Dict[str, Any]) -> int:
+    """Version of a document after one transition_status call"""
+    return before.get("version", 0) + 1
@@ -0,0 +1,80 @@
+"""Shared helpers for the benchmark scripts.
+
+Benchmarks run against a real MongoDB (``BENCH_MONGODB_URL``, default
+``mongodb://localhost:27017``) and use a throwaway database so they never
+touch application data.
+"""
+import os
+import statistics
+import time
+from typing import Any, Awaitable, Callable, Dict, List
+
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import monitoring
+
+from app.database import database
+
+BENCH_MONGODB_URL = os.getenv("BENCH_MONGODB_URL", "mongodb://localhost:27017")
+BENCH_DATABASE_NAME = os.getenv("BENCH_DATABASE_NAME", "dms_benchmark")
+
+
+class CommandCounter(monitoring.CommandListener):
+    """Counts commands sent to the server (one command = one round trip)"""
+
+    def __init__(self):
+        self.count = 0
+
+    def started(self, event):
+        self.count += 1
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+    def reset(self):
+        self.count = 0
+
+
+def connect(drop: bool = False, **client_kwargs) -> CommandCounter:
+    """Point the application database at the benchmark database"""
+    counter = CommandCounter()
+    database.client = AsyncIOMotorClient(BENCH_MONGODB_URL, event_listeners=[counter], **client_kwargs)
+    database.db = database.client[BENCH_DATABASE_NAME]
+    database.analytics_db = None
+    return counter
+
+
+async def drop_benchmark_database():
+    """Drop the benchmark database"""
+    await database.client.drop_database(BENCH_DATABASE_NAME)
+
+
+async def measure(
+    fn: Callable[[], Awaitable[Any]],
+    counter: CommandCounter,
+    repeat: int = 5
+) -> Dict[str, float]:
+    """Run fn repeatedly and report latency and round trips per call"""
+    await fn()  # warm up
+    timings: List[float] = []
+    counter.reset()
+    for _ in range(repeat):
+        start = time.perf_counter()
+        await fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return {
+        "round_trips": counter.count / repeat,
+        "mean_ms": statistics.mean(timings),
+        "p50_ms": statistics.median(timings),
+        "max_ms": max(timings)
+    }
+
+
+def print_table(title: str, rows: Dict[str, Dict[str, float]]):
+    """Print benchmark results"""
+    print(f"\n{title}")
+    print(f"{'case':<40}{'round trips':>12}{'mean ms':>10}{'p50 ms':>10}{'max ms':>10}")
+    for name, r in rows.items():
+        print(f"{name:<40}{r['round_trips']:>12.1f}{r['mean_ms']:>10.2f}{r['p50_ms']:>10.2f}{r['max_ms']:>10.2f}")
@@ -0,0 +1,127 @@
+"""Compare approval queue enrichment with one find_one per row, batched $in
+lookups (approvals without an entity snapshot) and entity snapshots read from
+the approvals collection alone.
+
+Usage (from the backend directory, with a local mongod running):
+
+    python -m benchmarks.bench_approvals --approvals 20000
+"""
+import argparse
+import asyncio
+import random
+from datetime import datetime, timedelta
+
+from bson import ObjectId
+
+from app.database import get_database
+from app.services import approval_service
+from app.utils.helpers import paginate, serialize_doc
+from benchmarks._common import connect, drop_benchmark_database, measure, print_table
+
+ENTITY_COLLECTIONS = {"distribution": "distributions", "return": "returns", "defect": "defects"}
+
+
+async def seed(approvals: int):
+    """Seed entities and one pending approval per entity"""
+    db = get_database()
+    now = datetime.utcnow()
+    per_type = approvals // len(ENTITY_COLLECTIONS)
+
+    entities = {
+        "distributions": [{
+            "distribution_id": f"DIST-2024-{i:06d}",
+            "device_count": random.randint(1, 50),
+            "from_user_name": "NOC Admin",
+            "to_user_name": "Distributor One",
+            "notes": "x" * 200
+        } for i in range(per_type)],
+        "returns": [{
+            "return_id": f"RET-2024-{i:06d}",
+            "device_serial": f"SN{i:08d}",
+            "reason": random.choice(["defective", "unused", "upgrade"]),
+            "requested_by_name": "Operator One",
+            "description": "x" * 200
+        } for i in range(per_type)],
+        "defects": [{
+            "report_id": f"DEF-2024-{i:06d}",
+            "device_serial": f"SN{i:08d}",
+            "defect_type": random.choice(["hardware", "software"]),
+            "severity": random.choice(["critical", "high", "medium", "low"]),
+            "description": "x" * 200
+        } for i in range(per_type)]
+    }
+
+    docs = []
+    for approval_type, collection in ENTITY_COLLECTIONS.items():
+        result = await db[collection].insert_many(entities[collection])
+        docs.extend({
+            "approval_type": approval_type,
+            "entity_id": str(entity_id),
+            "entity_type": approval_type,
+            "requested_by_name": "Requester",
+            "status": "pending",
+            "created_at": now - timedelta(seconds=random.randint(0, 86400 * 30))
+        } for entity_id in result.inserted_ids)
+    await db.approvals.insert_many(docs)
+    await db.approvals.create_index([("status", 1), ("created_at", -1), ("_id", -1)])
+
+
+async def per_row_page(page_size: int):
+    """Previous implementation: one find_one per approval"""
+    db = get_database()
+    approvals, _ = await paginate(db.approvals, {"status": "pending"}, 1, page_size)
+    enriched = []
+    for approval in approvals:
+        approval_data = serialize_doc(approval)
+        collection, fields = approval_service.ENTITY_DETAIL_FIELDS[approval["approval_type"]]
+        entity = await db[collection].find_one({"_id": ObjectId(approval["entity_id"])})
+        if entity:
+            approval_data["entity_details"] = {field: entity.get(field) for field in fields}
+        enriched.append(approval_data)
+    return enriched
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--approvals", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    counter = connect()
+    await drop_benchmark_database()
+    await seed(args.approvals)
+
+    def cases(page_size: int):
+        async def queue():
+            return await approval_service.get_approvals(page=1, page_size=page_size)
+
+        async def per_row():
+            return await per_row_page(page_size)
+
+        return queue, per_row
+
+    rows = {}
+    expected = {}
+    for page_size in (20, 100):
+        queue, per_row = cases(page_size)
+        expected[page_size] = await per_row()
+        assert (await queue())["data"] == expected[page_size]
+        rows[f"page_size={page_size} find_one per row"] = await measure(per_row, counter, args.repeat)
+        rows[f"page_size={page_size} batched $in"] = await measure(queue, counter, args.repeat)
+
+    await approval_service.backfill_entity_snapshots()
+    for page_size in (20, 100):
+        queue, _ = cases(page_size)
+        snapshot_page = [
+            {key: value for key, value in approval.items() if key != "entity_snapshot"}
+            for approval in (await queue())["data"]
+        ]
+        assert snapshot_page == expected[page_size]
+        rows[f"page_size={page_size} entity snapshot"] = await measure(queue, counter, args.repeat)
+    print_table(f"Approval queue page ({args.approvals} pending approvals)", rows)
+
+    await drop_benchmark_database()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
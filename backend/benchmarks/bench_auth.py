@@ -0,0 +1,95 @@
+"""Measure the per-request overhead of the auth dependency with and without
+the verified-token and authenticated-user caches.
+
+Usage (from the backend directory, with a local mongod running):
+
+    python -m benchmarks.bench_auth --requests 2000
+"""
+import argparse
+import asyncio
+from datetime import datetime
+
+from fastapi.security import HTTPAuthorizationCredentials
+
+from app.database import get_database
+from app.middleware.auth_middleware import get_current_user
+from app.services import auth_service
+from app.utils import security
+from benchmarks._common import connect, drop_benchmark_database, measure, print_table
+
+
+async def seed() -> str:
+    """Create a user and return an access token for it"""
+    db = get_database()
+    user = {
+        "email": "bench@dms.com",
+        "name": "Bench User",
+        "role": "admin",
+        "status": "active",
+        "password_hash": "x",
+        "created_at": datetime.utcnow()
+    }
+    result = await db.users.insert_one(user)
+    user["_id"] = result.inserted_id
+    token = await auth_service.create_user_token(user)
+    return token["access_token"]
+
+
+def batch(fn, requests: int):
+    """Wrap fn so one measured call runs it `requests` times"""
+    async def run():
+        for _ in range(requests):
+            await fn()
+    return run
+
+
+def per_request(row: dict, requests: int) -> dict:
+    return {key: value / requests for key, value in row.items()}
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    counter = connect()
+    await drop_benchmark_database()
+    token = await seed()
+    credentials = HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+
+    async def decode_uncached():
+        security.token_cache.clear()
+        security.decode_token(token)
+
+    async def decode_cached():
+        security.decode_token(token)
+
+    async def dependency_uncached():
+        security.token_cache.clear()
+        auth_service.user_cache.clear()
+        await get_current_user(credentials)
+
+    async def dependency_cached():
+        await get_current_user(credentials)
+
+    cases = {
+        "decode_token (no cache)": decode_uncached,
+        "decode_token (token cache)": decode_cached,
+        "get_current_user (no caches)": dependency_uncached,
+        "get_current_user (both caches)": dependency_cached,
+    }
+
+    rows = {}
+    for name, fn in cases.items():
+        row = await measure(batch(fn, args.requests), counter, args.repeat)
+        rows[name] = per_request(row, args.requests)
+    print_table(f"Auth overhead per request ({args.requests} requests per run)", rows)
+    print(f"\ntoken cache: {security.token_cache.stats()}")
+    print(f"user cache:  {auth_service.user_cache.stats()}")
+
+    await drop_benchmark_database()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,118 @@
+"""Compare dashboard endpoints awaiting their independent queries one after
+another against the bounded concurrent fan-out in dashboard_service.
+
+Usage (from the backend directory, with a local mongod running):
+
+    python -m benchmarks.bench_dashboard --documents 100000
+"""
+import argparse
+import asyncio
+import random
+from datetime import datetime, timedelta
+
+from bson import ObjectId
+
+from app.database import get_database
+from app.services import dashboard_service
+from benchmarks._common import connect, drop_benchmark_database, measure, print_table
+
+
+async def seed(documents: int, distributor_id: str):
+    """Seed the benchmark database with synthetic documents"""
+    db = get_database()
+    now = datetime.utcnow()
+
+    def created():
+        return now - timedelta(days=random.randint(0, 365))
+
+    await db.devices.insert_many([{
+        "status": random.choice(["available", "distributed", "in_use", "defective"]),
+        "created_at": created()
+    } for _ in range(documents)])
+    await db.defects.insert_many([{
+        "severity": random.choice(["critical", "high", "medium", "low"]),
+        "status": random.choice(["reported", "under_review", "resolved"]),
+        "created_at": created(),
+        "resolved_at": created()
+    } for _ in range(documents)])
+    await db.distributions.insert_many([{
+        "status": random.choice(["pending", "approved", "delivered"]),
+        "from_user_id": random.choice([distributor_id, str(ObjectId())]),
+        "to_user_id": random.choice([distributor_id, str(ObjectId())]),
+        "created_at": created()
+    } for _ in range(documents)])
+    await db.approvals.insert_many([{
+        "status": random.choice(["pending", "approved", "rejected"]),
+        "created_at": created()
+    } for _ in range(documents // 10)])
+
+
+async def sequential_alerts():
+    """Previous implementation: three counts awaited in turn"""
+    db = get_database()
+    await db.defects.count_documents({"severity": "critical", "status": {"$ne": "resolved"}})
+    await db.approvals.count_documents({"status": "pending"})
+    await db.devices.count_documents({"status": "available"})
+
+
+async def sequential_defect_chart():
+    """Previous implementation: 24 counts awaited in turn"""
+    db = get_database()
+    now = datetime.utcnow()
+    for i in range(11, -1, -1):
+        month_start = datetime(now.year, now.month, 1) - timedelta(days=i*30)
+        window = {"$gte": month_start, "$lt": month_start + timedelta(days=30)}
+        await db.defects.count_documents({"created_at": window})
+        await db.defects.count_documents({"status": "resolved", "resolved_at": window})
+
+
+async def sequential_distributor_stats(user_id: str):
+    """Previous implementation: counters then three counts awaited in turn"""
+    db = get_database()
+    await db.stats_counters.find_one({"_id": "dashboard"})
+    await db.distributions.count_documents({"from_user_id": user_id})
+    await db.distributions.count_documents({"to_user_id": user_id})
+    await db.distributions.count_documents({"from_user_id": user_id, "status": "pending"})
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--documents", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--keep", action="store_true", help="keep the benchmark database")
+    args = parser.parse_args()
+
+    counter = connect()
+    await drop_benchmark_database()
+    distributor = {"_id": ObjectId(), "role": "distributor"}
+    admin = {"_id": ObjectId(), "role": "admin"}
+    print(f"Seeding {args.documents} documents per collection...")
+    await seed(args.documents, str(distributor["_id"]))
+
+    cases = {
+        "system_alerts": (
+            sequential_alerts,
+            lambda: dashboard_service.get_system_alerts(admin)
+        ),
+        "defect_chart": (
+            sequential_defect_chart,
+            dashboard_service.get_defect_chart_data
+        ),
+        "distributor_stats": (
+            lambda: sequential_distributor_stats(str(distributor["_id"])),
+            lambda: dashboard_service.get_dashboard_stats(distributor)
+        ),
+    }
+
+    rows = {}
+    for name, (sequential, concurrent) in cases.items():
+        rows[f"{name} (sequential)"] = await measure(sequential, counter, args.repeat)
+        rows[f"{name} (concurrent)"] = await measure(concurrent, counter, args.repeat)
+    print_table(f"Dashboard latency, {args.documents} documents per collection", rows)
+
+    if not args.keep:
+        await drop_benchmark_database()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,156 @@
+"""Compare report generation with per-value count_documents against the
+single-pass $facet aggregation in report_service.
+
+Usage (from the backend directory, with a local mongod running):
+
+    python -m benchmarks.bench_reports --devices 200000
+"""
+import argparse
+import asyncio
+import random
+from datetime import datetime, timedelta
+
+from app.database import get_database
+from app.services import report_service
+from benchmarks._common import connect, drop_benchmark_database, measure, print_table
+
+
+async def seed(devices: int):
+    """Seed the benchmark database with synthetic documents"""
+    db = get_database()
+    now = datetime.utcnow()
+    device_types = ["ONU", "ONT", "Router", "Switch", "Modem", "Access Point"]
+    holder_types = ["noc", "distributor", "sub_distributor", "operator"]
+
+    batch = []
+    for i in range(devices):
+        batch.append({
+            "device_id": f"DEV-{i}",
+            "serial_number": f"SN{i:09d}",
+            "device_type": random.choice(device_types),
+            "status": random.choice(report_service.DEVICE_STATUSES),
+            "current_holder_type": random.choice(holder_types),
+            "created_at": now - timedelta(days=random.randint(0, 365))
+        })
+        if len(batch) == 10000:
+            await db.devices.insert_many(batch)
+            batch = []
+    if batch:
+        await db.devices.insert_many(batch)
+
+    small = max(devices // 20, 100)
+    await db.distributions.insert_many([{
+        "status": random.choice(report_service.DISTRIBUTION_STATUSES),
+        "to_user_name": f"User {random.randint(1, 50)}",
+        "device_count": random.randint(1, 50),
+        "created_at": now - timedelta(days=random.randint(0, 365))
+    } for _ in range(small)])
+    await db.defects.insert_many([{
+        "status": random.choice(report_service.DEFECT_STATUSES),
+        "severity": random.choice(report_service.DEFECT_SEVERITIES),
+        "defect_type": random.choice(report_service.DEFECT_TYPES),
+        "created_at": now - timedelta(days=random.randint(0, 365))
+    } for _ in range(small)])
+    await db.returns.insert_many([{
+        "status": random.choice(report_service.RETURN_STATUSES),
+        "reason": random.choice(report_service.RETURN_REASONS),
+        "created_at": now - timedelta(days=random.randint(0, 365))
+    } for _ in range(small)])
+    await db.users.insert_many([{
+        "role": random.choice(report_service.USER_ROLES),
+        "last_login": now - timedelta(days=random.randint(0, 90)),
+        "created_at": now
+    } for _ in range(1000)])
+
+    for field in ["status", "device_type", "current_holder_type"]:
+        await db.devices.create_index(field)
+    for collection in ["distributions", "defects", "returns"]:
+        await db[collection].create_index("status")
+        await db[collection].create_index("created_at")
+
+
+async def legacy_counts(collection: str, fields: dict, month_field: bool) -> dict:
+    """Previous implementation: one count_documents per value and per month"""
+    db = get_database()
+    result = {"total": await db[collection].count_documents({})}
+    for field, values in fields.items():
+        if values is None:
+            values = [v for v in await db[collection].distinct(field) if v]
+        result[field] = {v: await db[collection].count_documents({field: v}) for v in values}
+    if month_field:
+        now = datetime.utcnow()
+        result["by_month"] = []
+        for i in range(5, -1, -1):
+            month_start = datetime(now.year, now.month, 1) - timedelta(days=i*30)
+            month_end = month_start + timedelta(days=30)
+            result["by_month"].append(await db[collection].count_documents({
+                "created_at": {"$gte": month_start, "$lt": month_end}
+            }))
+    return result
+
+
+async def legacy_user_activity() -> dict:
+    db = get_database()
+    by_role = {r: await db.users.count_documents({"role": r}) for r in report_service.USER_ROLES}
+    active = await db.users.count_documents({"last_login": {"$gte": datetime.utcnow() - timedelta(days=30)}})
+    total = await db.users.count_documents({})
+    recent = await db.device_history.find({}).sort("timestamp", -1).limit(50).to_list(length=50)
+    return {"by_role": by_role, "active": active, "total": total, "recent": recent}
+
+
+CASES = {
+    "inventory": (
+        lambda: legacy_counts("devices", {
+            "status": report_service.DEVICE_STATUSES,
+            "device_type": None,
+            "current_holder_type": None
+        }, False),
+        report_service.get_inventory_report
+    ),
+    "distribution_summary": (
+        lambda: legacy_counts("distributions", {"status": report_service.DISTRIBUTION_STATUSES}, True),
+        report_service.get_distribution_summary
+    ),
+    "defect_summary": (
+        lambda: legacy_counts("defects", {
+            "status": report_service.DEFECT_STATUSES,
+            "severity": report_service.DEFECT_SEVERITIES,
+            "defect_type": report_service.DEFECT_TYPES
+        }, True),
+        report_service.get_defect_summary
+    ),
+    "return_summary": (
+        lambda: legacy_counts("returns", {
+            "status": report_service.RETURN_STATUSES,
+            "reason": report_service.RETURN_REASONS
+        }, True),
+        report_service.get_return_summary
+    ),
+    "user_activity": (legacy_user_activity, report_service.get_user_activity_report),
+}
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--devices", type=int, default=200000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--keep", action="store_true", help="keep the benchmark database")
+    args = parser.parse_args()
+
+    counter = connect()
+    await drop_benchmark_database()
+    print(f"Seeding {args.devices} devices...")
+    await seed(args.devices)
+
+    rows = {}
+    for name, (legacy, aggregated) in CASES.items():
+        rows[f"{name} (count_documents)"] = await measure(legacy, counter, args.repeat)
+        rows[f"{name} ($facet)"] = await measure(aggregated, counter, args.repeat)
+    print_table(f"Report generation, {args.devices} devices", rows)
+
+    if not args.keep:
+        await drop_benchmark_database()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,127 @@
+"""Compare the response serialization paths of a device list page.
+
+    current:  serialize_docs -> jsonable_encoder -> JSONResponse (stdlib json)
+    fast:     prepare_docs -> FastJSONResponse (orjson, one pass)
+
+No database is needed: pages are built from synthetic device documents
+shaped like the ones the list endpoints return.
+
+Usage (from the backend directory):
+
+    python -m benchmarks.bench_serialization --rows 100
+"""
+import argparse
+import asyncio
+import random
+from datetime import datetime, timedelta
+
+from bson import ObjectId
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from app.utils import responses
+from app.utils.helpers import fields_projection, prepare_docs, serialize_docs
+from app.utils.responses import FastJSONResponse
+from benchmarks._common import CommandCounter, measure, print_table
+
+SELECTED_FIELDS = ["device_id", "device_type", "serial_number", "status", "current_holder_name"]
+
+
+def make_devices(rows: int) -> list:
+    """Device documents as returned by the devices list query"""
+    now = datetime.utcnow()
+    return [
+        {
+            "_id": ObjectId(),
+            "device_id": f"ONU-2024-{i:06d}",
+            "device_type": "ONU",
+            "model": "HG8546M",
+            "serial_number": f"SN{i:08d}",
+            "mac_address": f"00:1A:2B:{i % 256:02X}:{i // 256 % 256:02X}:00",
+            "manufacturer": "Huawei",
+            "status": random.choice(["available", "distributed", "in_use"]),
+            "current_location": "NOC",
+            "current_holder_id": str(ObjectId()),
+            "current_holder_name": "Distributor One",
+            "current_holder_type": "distributor",
+            "reserved_by": None,
+            "purchase_date": now - timedelta(days=400),
+            "warranty_expiry": now + timedelta(days=330),
+            "metadata": {"batch": "B-17", "firmware": "V5R019"},
+            "created_at": now - timedelta(minutes=i),
+            "updated_at": now
+        }
+        for i in range(rows)
+    ]
+
+
+def select(docs: list, fields: list) -> list:
+    """What the database returns for a `fields` projection"""
+    keep = fields_projection(fields)
+    return [{key: value for key, value in doc.items() if key in keep} for doc in docs]
+
+
+def page(data: list) -> dict:
+    return {
+        "success": True,
+        "message": "Devices retrieved successfully",
+        "data": data,
+        "pagination": {"page": 1, "page_size": len(data), "total": 10000, "total_pages": 100}
+    }
+
+
+def batch(fn, requests: int):
+    """Wrap fn so one measured call renders `requests` responses"""
+    async def run():
+        for _ in range(requests):
+            fn()
+    return run
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    docs = make_devices(args.rows)
+    selected = select(docs, SELECTED_FIELDS)
+    counter = CommandCounter()
+
+    def current():
+        return JSONResponse(jsonable_encoder(page(serialize_docs(docs)))).body
+
+    def fast():
+        return FastJSONResponse(page(prepare_docs(docs))).body
+
+    def fast_selected():
+        return FastJSONResponse(page(prepare_docs(selected))).body
+
+    def fast_stdlib():
+        orjson, responses.orjson = responses.orjson, None
+        try:
+            return FastJSONResponse(page(prepare_docs(docs))).body
+        finally:
+            responses.orjson = orjson
+
+    cases = {
+        "current path": current,
+        "FastJSONResponse": fast,
+        f"FastJSONResponse ({len(SELECTED_FIELDS)} fields)": fast_selected,
+        "FastJSONResponse (stdlib fallback)": fast_stdlib,
+    }
+    if responses.orjson is None:
+        print("orjson is not installed: FastJSONResponse uses the stdlib fallback")
+
+    rows = {}
+    for name, fn in cases.items():
+        row = await measure(batch(fn, args.requests), counter, args.repeat)
+        rows[name] = {key: value / args.requests for key, value in row.items()}
+    print_table(f"Render one {args.rows}-row device page (per response)", rows)
+    print(f"\nbody size: current {len(current())} B, fast {len(fast())} B, "
+          f"selected {len(fast_selected())} B")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,255 @@
+"""Check distribution transitions for consistency under injected failures and
+compare their throughput with and without multi-document transactions.
+
+Each transition approves a pending distribution (approval_service.approve_request)
+and then delivers it (distribution_service.update_distribution_status), which
+touches approvals, distributions, devices, device_history, the stats counters
+and notifications. Failures are injected with the server's `failCommand`
+failpoint; afterwards every distribution is checked against its approval,
+its devices and their history, and the incremental counters are compared
+with counters rebuilt from the collections.
+
+Needs a replica-set mongod started with test commands enabled, e.g.:
+
+    mongod --replSet rs0 --setParameter enableTestCommands=1
+    mongosh --eval 'rs.initiate()'
+
+Usage (from the backend directory):
+
+    BENCH_MONGODB_URL='mongodb://localhost:27017/?replicaSet=rs0' \\
+        python -m benchmarks.bench_transactions --distributions 200
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import statistics
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from bson import ObjectId
+from pymongo.errors import PyMongoError
+
+from app.config import settings
+from app.database import get_database
+from app.services import approval_service, distribution_service, stats_counter_service
+from benchmarks._common import CommandCounter, connect, drop_benchmark_database, print_table
+
+ADMIN = {"_id": ObjectId(), "name": "NOC Admin"}
+CREATED_COLLECTIONS = ["approvals", "distributions", "devices", "device_history", "notifications", "stats_counters"]
+
+# Write commands the failpoint interrupts: approval/entity findAndModify and
+# history/notification inserts, so a non-transactional transition can stop halfway
+FAILURES = {
+    "transient": {"errorCode": 112, "errorLabels": ["TransientTransactionError"]},  # WriteConflict
+    "non-transient": {"errorCode": 2}  # BadValue
+}
+
+
+async def seed(distributions: int, devices_per: int) -> List[Tuple[str, str]]:
+    """Seed pending distributions with reserved devices and pending approvals"""
+    db = get_database()
+    await drop_benchmark_database()
+    for collection in CREATED_COLLECTIONS:
+        # Collections are created up front, outside any transaction
+        await db.create_collection(collection)
+
+    now = datetime.utcnow()
+    pairs = []
+    for i in range(distributions):
+        distribution_id = ObjectId()
+        device_ids = (await db.devices.insert_many([{
+            "device_id": f"ONU-2024-{i:05d}{j:02d}",
+            "device_type": "ONU",
+            "serial_number": f"SN{i:05d}{j:02d}",
+            "status": "available",
+            "current_holder_id": None,
+            "current_holder_type": "noc",
+            "current_location": "NOC",
+            "reserved_by": str(distribution_id),
+            "created_at": now
+        } for j in range(devices_per)])).inserted_ids
+        distribution = {
+            "_id": distribution_id,
+            "distribution_id": f"DIST-2024-{i:06d}",
+            "device_ids": [str(device_id) for device_id in device_ids],
+            "device_count": devices_per,
+            "from_user_id": "noc",
+            "from_user_name": "NOC",
+            "from_user_type": "noc",
+            "to_user_id": f"distributor-{i % 10}",
+            "to_user_name": f"Distributor {i % 10}",
+            "to_user_type": "distributor",
+            "status": "pending",
+            "created_by": "noc",
+            "created_at": now
+        }
+        await db.distributions.insert_one(distribution)
+        approval = await db.approvals.insert_one({
+            "approval_type": "distribution",
+            "entity_id": str(distribution_id),
+            "entity_type": "distribution",
+            "requested_by": "noc",
+            "requested_by_name": "NOC",
+            "status": "pending",
+            "entity_snapshot": approval_service.build_entity_snapshot("distribution", distribution),
+            "created_at": now
+        })
+        pairs.append((str(approval.inserted_id), str(distribution_id)))
+
+    await stats_counter_service.rebuild_counters()
+    return pairs
+
+
+async def transition(approval_id: str, distribution_id: str) -> None:
+    """Approve and deliver one distribution"""
+    await approval_service.approve_request(approval_id, ADMIN)
+    await distribution_service.update_distribution_status(distribution_id, "delivered", ADMIN)
+
+
+async def set_failpoint(failure: Optional[str], probability: float) -> None:
+    admin = get_database().client.admin
+    if failure is None:
+        await admin.command({"configureFailPoint": "failCommand", "mode": "off"})
+        return
+    await admin.command({
+        "configureFailPoint": "failCommand",
+        "mode": {"activationProbability": probability},
+        "data": {"failCommands": ["findAndModify", "insert"], **FAILURES[failure]}
+    })
+
+
+def _nonzero(counters: Any) -> Any:
+    """Drop zero leaves, which incremental counters keep and rebuilt ones omit"""
+    if not isinstance(counters, dict):
+        return counters
+    pruned = {key: _nonzero(value) for key, value in counters.items()}
+    return {key: value for key, value in pruned.items() if value not in (0, {})}
+
+
+async def check_invariants() -> Dict[str, int]:
+    """Count distributions, devices and counters left in an inconsistent state"""
+    db = get_database()
+    approvals = {
+        approval["entity_id"]: approval["status"]
+        async for approval in db.approvals.find({}, {"entity_id": 1, "status": 1})
+    }
+    devices = {str(device["_id"]): device async for device in db.devices.find({})}
+    history: Dict[str, int] = {}
+    async for entry in db.device_history.find({}, {"device_id": 1}):
+        history[entry["device_id"]] = history.get(entry["device_id"], 0) + 1
+
+    violations = {"approval_vs_distribution": 0, "device_holders": 0, "device_history": 0, "counters": 0}
+    async for distribution in db.distributions.find({}):
+        status = distribution["status"]
+        expected_approval = "pending" if status == "pending" else "approved"
+        if approvals.get(str(distribution["_id"])) != expected_approval:
+            violations["approval_vs_distribution"] += 1
+
+        delivered = status == "delivered"
+        for device_id in distribution["device_ids"]:
+            device = devices[device_id]
+            holder = distribution["to_user_id"] if delivered else None
+            if device["current_holder_id"] != holder or (device["reserved_by"] is None) != delivered:
+                violations["device_holders"] += 1
+            if history.get(device_id, 0) != (1 if delivered else 0):
+                violations["device_history"] += 1
+
+    incremental = _nonzero(await stats_counter_service.get_counters())
+    rebuilt = _nonzero(await stats_counter_service.rebuild_counters())
+    for collection in ("approvals", "distributions", "devices"):
+        if incremental.get(collection) != rebuilt.get(collection):
+            violations["counters"] += 1
+    return violations
+
+
+async def run_failures(
+    pairs: List[Tuple[str, str]],
+    use_transaction: bool,
+    failure: str,
+    probability: float
+) -> Dict[str, int]:
+    """Run every transition with failures injected, then check the invariants"""
+    settings.MONGODB_TRANSACTIONS_ENABLED = use_transaction
+    failed = 0
+    log = io.StringIO()
+    await set_failpoint(failure, probability)
+    try:
+        with contextlib.redirect_stdout(log):
+            for approval_id, distribution_id in pairs:
+                try:
+                    await transition(approval_id, distribution_id)
+                except (PyMongoError, ValueError):
+                    failed += 1
+    finally:
+        await set_failpoint(None, 0)
+
+    violations = await check_invariants()
+    return {
+        "failed_transitions": failed,
+        "hook_failures": log.getvalue().count("After-commit hook"),
+        **violations
+    }
+
+
+async def run_throughput(pairs: List[Tuple[str, str]], use_transaction: bool, counter: CommandCounter) -> Dict[str, float]:
+    """Time each transition without failures"""
+    settings.MONGODB_TRANSACTIONS_ENABLED = use_transaction
+    timings = []
+    counter.reset()
+    start = time.perf_counter()
+    for approval_id, distribution_id in pairs:
+        began = time.perf_counter()
+        await transition(approval_id, distribution_id)
+        timings.append((time.perf_counter() - began) * 1000)
+    elapsed = time.perf_counter() - start
+    print(f"transactions {'on ' if use_transaction else 'off'}: {len(pairs) / elapsed:.1f} transitions/s")
+    return {
+        "round_trips": counter.count / len(pairs),
+        "mean_ms": statistics.mean(timings),
+        "p50_ms": statistics.median(timings),
+        "max_ms": max(timings)
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--distributions", type=int, default=200)
+    parser.add_argument("--devices-per", type=int, default=5)
+    parser.add_argument("--failure-rate", type=float, default=0.05)
+    args = parser.parse_args()
+
+    counter = connect()
+    hello = await get_database().client.admin.command("hello")
+    if "setName" not in hello:
+        raise SystemExit("bench_transactions needs a replica set (set BENCH_MONGODB_URL with ?replicaSet=...)")
+
+    results = {}
+    for failure in FAILURES:
+        for use_transaction in (False, True):
+            pairs = await seed(args.distributions, args.devices_per)
+            name = f"{failure}, transactions {'on' if use_transaction else 'off'}"
+            results[name] = await run_failures(pairs, use_transaction, failure, args.failure_rate)
+
+    print(f"\nInjected failures ({args.failure_rate:.0%} of findAndModify/insert commands, "
+          f"{args.distributions} distributions)")
+    columns = list(next(iter(results.values())))
+    print(f"{'case':<34}" + "".join(f"{column:>26}" for column in columns))
+    for name, row in results.items():
+        print(f"{name:<34}" + "".join(f"{row[column]:>26}" for column in columns))
+
+    rows = {}
+    for use_transaction in (False, True):
+        pairs = await seed(args.distributions, args.devices_per)
+        rows[f"transactions {'on' if use_transaction else 'off'}"] = await run_throughput(
+            pairs, use_transaction, counter
+        )
+        assert not any((await check_invariants()).values())
+    print_table(f"Approve + deliver one distribution ({args.devices_per} devices)", rows)
+
+    await drop_benchmark_database()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
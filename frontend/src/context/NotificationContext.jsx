@@ -1,8 +1,11 @@
-import { createContext, useContext, useState, useCallback } from 'react';
+import { createContext, useContext, useState, useCallback, useEffect } from 'react';
+import { notificationsAPI } from '../services/api';
+import { useAuth } from './AuthContext';
 
 const NotificationContext = createContext(null);
 
 export const NotificationProvider = ({ children }) => {
+  const { user } = useAuth();
   const [notifications, setNotifications] = useState([
     {
       id: '1',
@@ -42,6 +45,23 @@ export const NotificationProvider = ({ children }) => {
     setNotifications(prev => [newNotification, ...prev]);
   }, []);
 
+  // Push notifications from the server as they are created
+  useEffect(() => {
+    const source = notificationsAPI.openStream({
+      notification: (data) => {
+        setNotifications(prev => [{
+          id: data.id,
+          title: data.title,
+          message: data.message,
+          type: data.type,
+          read: data.is_read,
+          timestamp: data.created_at
+        }, ...prev]);
+      }
+    });
+    return () => source?.close();
+  }, [user?.token]);
+
   const markAsRead = useCallback((id) => {
     setNotifications(prev =>
       prev.map(n => (n.id === id ? { ...n, read: true } : n))
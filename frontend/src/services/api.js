@@ -1,6 +1,9 @@
 // API Configuration
 const API_BASE_URL = import.meta.env.VITE_API_URL || 'http://localhost:8000/api';
 
+// Wait before reopening a notification stream the browser gave up on
+const STREAM_RECONNECT_DELAY_MS = 5000;
+
 // Get auth token from localStorage
 const getAuthToken = () => {
   const user = localStorage.getItem('dms_user');
@@ -417,6 +420,54 @@ export const notificationsAPI = {
     });
     return response;
   },
+
+  createStreamToken: async () => {
+    const response = await apiRequest('/notifications/stream-token', {
+      method: 'POST',
+    });
+    return response;
+  },
+
+  // Live notifications over Server-Sent Events. EventSource cannot send an
+  // Authorization header, so the query string carries a short-lived
+  // stream-only token. Once the browser gives up reconnecting (e.g. that
+  // token expired), a fresh one is fetched and the stream reopened.
+  openStream: (handlers = {}) => {
+    if (!getAuthToken()) return null;
+
+    let source = null;
+    let closed = false;
+
+    const connect = async () => {
+      let response;
+      try {
+        response = await notificationsAPI.createStreamToken();
+      } catch {
+        return;
+      }
+      if (closed) return;
+
+      source = new EventSource(
+        `${API_BASE_URL}/notifications/stream?token=${encodeURIComponent(response.data.token)}`
+      );
+      Object.entries(handlers).forEach(([event, handler]) => {
+        source.addEventListener(event, (e) => handler(JSON.parse(e.data)));
+      });
+      source.onerror = () => {
+        if (source.readyState === EventSource.CLOSED && !closed) {
+          setTimeout(connect, STREAM_RECONNECT_DELAY_MS);
+        }
+      };
+    };
+
+    connect();
+    return {
+      close: () => {
+        closed = true;
+        source?.close();
+      },
+    };
+  },
 };
 
 // Reports API